@@ -0,0 +1,76 @@
+"""
+Compare the pairwise common ancestor analysis with the linear subtree counting on synthetic deep DOMs.
+
+    python benchmarks/common_ancestors.py --depth 40 --candidates 50 100 200 400
+"""
+
+import argparse
+import random
+import time
+from collections import Counter
+
+from bs4 import BeautifulSoup, Tag
+
+from truffles.tools.list_detector.utils import (
+    count_common_ancestor_attributes,
+    find_lowest_common_ancestor,
+    get_attr_list,
+)
+
+
+def pairwise_attribute_counts(element_candidates):
+    """The previous O(k^2 * depth) implementation"""
+    attrs = []
+    for el1, _ in element_candidates:
+        for el2, _ in element_candidates:
+            common_ancestor = find_lowest_common_ancestor(el1, el2)
+            if isinstance(common_ancestor, Tag):
+                attrs.extend(get_attr_list(common_ancestor))
+    return Counter(attrs)
+
+
+def synthetic_page(depth: int, leaves: int, seed: int = 0) -> BeautifulSoup:
+    """A nested DOM of `depth` levels that branches randomly, with `leaves` text nodes"""
+    rng = random.Random(seed)
+    soup = BeautifulSoup("<html><body></body></html>", "html.parser")
+    containers = [soup.body]
+    for level in range(depth):
+        new_containers = []
+        for container in containers:
+            for _ in range(rng.choice([1, 1, 1, 2])):
+                child = soup.new_tag("div", attrs={"class": f"level-{level} {rng.choice(['card', 'row', 'box'])}"})
+                container.append(child)
+                new_containers.append(child)
+        containers = new_containers[:leaves]
+
+    for index in range(leaves):
+        rng.choice(containers).append(soup.new_string(f"item {index}"))
+    return soup
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--depth", type=int, default=40)
+    parser.add_argument("--candidates", type=int, nargs="+", default=[50, 100, 200, 400])
+    args = parser.parse_args()
+
+    print(f"{'candidates':>10}{'pairwise ms':>14}{'linear ms':>12}{'speedup':>10}{'equal':>8}")
+    for k in args.candidates:
+        soup = synthetic_page(args.depth, k)
+        candidates = [(string, id(string)) for string in soup.find_all(string=True)]
+
+        start = time.perf_counter()
+        expected = pairwise_attribute_counts(candidates)
+        pairwise = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = count_common_ancestor_attributes(candidates, get_attr_list)
+        linear = time.perf_counter() - start
+
+        print(
+            f"{len(candidates):>10}{pairwise * 1000:>14.1f}{linear * 1000:>12.2f}{pairwise / linear:>10.0f}x{str(result == expected):>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
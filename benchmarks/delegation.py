@@ -0,0 +1,123 @@
+"""
+Measure the cost of attribute access through TLocator and the memory of wrapped locators, against the previous
+closure based delegation.
+
+    python benchmarks/delegation.py --accesses 200000 --locators 10000
+"""
+
+import argparse
+import asyncio
+import gc
+import time
+import tracemalloc
+from inspect import iscoroutinefunction
+from typing import Any, Callable, List, Optional
+from weakref import proxy
+
+from fakes import FakeLocator
+from playwright.async_api import Locator
+
+from truffles.enhanced.locator import TLocator
+
+
+class LegacyToolManager:
+    def __init__(self, enhanced_obj: Any):
+        self._enhanced = proxy(enhanced_obj)
+        self._tool_instances = {}
+
+
+class LegacyLocator:
+    """The previous implementation: a closure per access and a tool manager per instance"""
+
+    def __init__(self, locator: Any):
+        self._wrapped = locator
+        self.tools = LegacyToolManager(self)
+
+    def _wrap_result(self, result: Any) -> Any:
+        if isinstance(result, Locator):
+            return LegacyLocator(result)
+        return result
+
+    def __getattr__(self, name: str):
+        output = getattr(self._wrapped, name)
+
+        if iscoroutinefunction(output):
+
+            async def wrapped(*args, **kwargs):
+                return self._wrap_result(await output(*args, **kwargs))
+
+            return wrapped
+
+        elif callable(output):
+
+            def wrapped(*args, **kwargs):
+                return self._wrap_result(output(*args, **kwargs))
+
+            return wrapped
+
+        return self._wrap_result(output)
+
+
+def per_access(function: Callable[[], Any], accesses: int) -> float:
+    """Mean seconds per call of `function`"""
+    function()  # install the delegators before measuring
+    start = time.perf_counter()
+    for _ in range(accesses):
+        function()
+    return (time.perf_counter() - start) / accesses
+
+
+def per_await(function: Callable[[], Any], accesses: int) -> float:
+    async def run():
+        await function()
+        start = time.perf_counter()
+        for _ in range(accesses):
+            await function()
+        return (time.perf_counter() - start) / accesses
+
+    return asyncio.run(run())
+
+
+def memory(wrapper: type, locators: int) -> int:
+    """Bytes allocated to wrap `locators` locators, the wrapped locators excluded"""
+    inner = [FakeLocator(index) for index in range(locators)]
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    wrapped = [wrapper(locator) for locator in inner]
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del wrapped
+    return allocated
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--accesses", type=int, default=200000, help="Attribute accesses per measurement")
+    parser.add_argument("--locators", type=int, default=10000, help="Wrapped locators for the memory measurement")
+    args = parser.parse_args(argv)
+
+    print(f"{'access':<22} {'legacy ns':>10} {'current ns':>11} {'speedup':>8}")
+    for wrapper_name, legacy_call, current_call, measure in (
+        ("property .first", lambda w: w.first, lambda w: w.first, per_access),
+        ("sync .nth(1)", lambda w: w.nth(1), lambda w: w.nth(1), per_access),
+        ("async .count()", lambda w: w.count(), lambda w: w.count(), per_await),
+        ("bound .nth", lambda w: w.nth, lambda w: w.nth, per_access),
+    ):
+        legacy, current = LegacyLocator(FakeLocator()), TLocator(FakeLocator())
+        legacy_time = measure(lambda: legacy_call(legacy), args.accesses)
+        current_time = measure(lambda: current_call(current), args.accesses)
+        print(
+            f"{wrapper_name:<22} {legacy_time * 1e9:>10.0f} {current_time * 1e9:>11.0f} {legacy_time / current_time:>7.1f}x"
+        )
+
+    legacy_bytes = memory(LegacyLocator, args.locators)
+    current_bytes = memory(TLocator, args.locators)
+    print()
+    print(
+        f"memory per {args.locators} locators: legacy {legacy_bytes / 1024:.0f} KiB, current {current_bytes / 1024:.0f} KiB"
+    )
+
+
+if __name__ == "__main__":
+    main()
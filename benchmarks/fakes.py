@@ -0,0 +1,119 @@
+"""Deterministic stand-ins for the LLM and the browser, shared by the benchmark scripts"""
+
+import re
+from typing import Any, List, get_args
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import RunnableLambda
+from playwright.async_api import Locator
+
+from truffles.models.scheduler import estimate_message_tokens
+
+SAMPLE_VALUES = {"string": "x", "boolean": True, "number": 1, "integer": 1}
+
+# the item headers of `struct_locator_batch_message`
+BATCH_ITEM = re.compile(r"^### Item (\d+)\n", re.MULTILINE)
+
+
+def sample_output(schema: dict) -> dict:
+    """Fill every property of a JSON schema with a sample value of its type"""
+    return {key: SAMPLE_VALUES.get(field.get("type"), None) for key, field in schema.get("properties", {}).items()}
+
+
+def last_text(messages: List[BaseMessage]) -> str:
+    content = messages[-1].content
+    if isinstance(content, str):
+        return content
+    return " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Chat model answering structured output calls without any network access.
+
+    List detection calls are answered with `list_texts`, every other schema with its string fields set to the
+    start of the prompt text, so results differ by item. Batch schemas (`to_structure` with a `batch_size`) get
+    one entry per numbered item of the prompt. Calls and estimated prompt tokens are counted.
+    """
+
+    list_texts: List[str] = []
+    calls: int = 0
+    prompt_tokens: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=""))])
+
+    def _answer(self, schema: Any, messages: List[BaseMessage]) -> Any:
+        self.calls += 1
+        self.prompt_tokens += estimate_message_tokens(messages)
+
+        if schema.__name__ == "ListDetectionOutput":
+            return schema.model_validate({"items": [{"selector": text} for text in self.list_texts]})
+
+        if schema.__name__.endswith("Batch"):
+            (item_schema,) = get_args(schema.model_fields["items"].annotation)
+            parts = BATCH_ITEM.split(last_text(messages))[1:]
+            items = [
+                {**self._sample(item_schema, text), "index": int(index)} for index, text in zip(parts[::2], parts[1::2])
+            ]
+            return schema.model_validate({"items": items})
+
+        return schema.model_validate(self._sample(schema, last_text(messages)))
+
+    @staticmethod
+    def _sample(schema: Any, text: str) -> dict:
+        values = sample_output(schema.model_json_schema())
+        text = " ".join(text.split())[:80]
+        return {key: text if value == "x" else value for key, value in values.items()}
+
+    def with_structured_output(self, schema, **kwargs):
+        return RunnableLambda(lambda messages: self._answer(schema, messages))
+
+    def reset_counts(self) -> None:
+        self.calls = 0
+        self.prompt_tokens = 0
+
+
+class _FakeLocatorImpl:
+    _loop = None
+
+
+_FAKE_LOCATOR_IMPL = _FakeLocatorImpl()
+
+
+class FakeLocator(Locator):
+    """Playwright locator answering from memory, to measure the overhead of the wrappers around it"""
+
+    def __init__(self, index: int = 0, count: int = 3, evaluate_result: Any = None):
+        super().__init__(_FAKE_LOCATOR_IMPL)
+        self.index = index
+        self._count = count
+        self.evaluate_result = evaluate_result
+
+    @property
+    def first(self) -> "FakeLocator":
+        return FakeLocator(0, self._count)
+
+    def nth(self, index: int) -> "FakeLocator":
+        return FakeLocator(index, self._count)
+
+    def locator(self, selector_or_locator: Any, **kwargs: Any) -> "FakeLocator":
+        return FakeLocator(0, self._count)
+
+    async def count(self) -> int:
+        return self._count
+
+    async def all(self) -> List["FakeLocator"]:
+        return [FakeLocator(index, self._count) for index in range(self._count)]
+
+    async def text_content(self, **kwargs: Any) -> str:
+        return f"item {self.index}"
+
+    async def evaluate(self, expression: str, arg: Any = None, **kwargs: Any) -> Any:
+        return self.evaluate_result
@@ -0,0 +1,69 @@
+"""
+Measure ContextStore hit rate and lookup latency for the page fingerprint modes.
+
+The corpus is a directory with one sub-directory per page template, each holding saved HTML variants of that page
+(e.g. the same listing saved on several reloads). The first variant of every template is stored, all other variants
+are looked up.
+
+    python benchmarks/fingerprint_hit_rate.py path/to/corpus
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from pathlib import Path
+
+from truffles.context import AttributeMarker, MemoryContextStore
+
+CONFIGURATIONS = {
+    "exact": {"fingerprint_mode": "exact"},
+    "structural": {"fingerprint_mode": "structural"},
+    "structural+near-duplicate": {"fingerprint_mode": "structural", "near_duplicate_distance": 8},
+}
+
+
+def load_corpus(path: Path):
+    corpus = {}
+    for template_dir in sorted(p for p in path.iterdir() if p.is_dir()):
+        variants = [f.read_text(encoding="utf-8", errors="replace") for f in sorted(template_dir.glob("*.html"))]
+        if len(variants) > 1:
+            corpus[template_dir.name] = variants
+    return corpus
+
+
+async def run(corpus, store_kwargs):
+    store = MemoryContextStore(**store_kwargs)
+    for template, variants in corpus.items():
+        await store.store_marker(variants[0], "list_detector", AttributeMarker({"data-template": template}))
+
+    hits, wrong, latencies = 0, 0, []
+    for template, variants in corpus.items():
+        for variant in variants[1:]:
+            start = time.perf_counter()
+            marker = await store.get_marker(variant, "list_detector")
+            latencies.append((time.perf_counter() - start) * 1000)
+
+            if marker is not None:
+                hits += 1
+                wrong += marker.attribute_dict["data-template"] != template
+
+    return hits / len(latencies), wrong, statistics.mean(latencies), statistics.quantiles(latencies, n=20)[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("corpus", type=Path)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    lookups = sum(len(v) - 1 for v in corpus.values())
+    print(f"{len(corpus)} templates, {lookups} lookups")
+    print(f"{'mode':<28}{'hit rate':>10}{'wrong':>8}{'mean ms':>10}{'p95 ms':>10}")
+    for name, store_kwargs in CONFIGURATIONS.items():
+        hit_rate, wrong, mean, p95 = asyncio.run(run(corpus, store_kwargs))
+        print(f"{name:<28}{hit_rate:>10.1%}{wrong:>8}{mean:>10.2f}{p95:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
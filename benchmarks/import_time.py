@@ -0,0 +1,78 @@
+"""
+Check the cold import time of truffles against its budget, and that the heavy optional dependencies stay unloaded.
+
+    python benchmarks/import_time.py --repeat 5
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+# budgets in milliseconds of the cumulative import time, the lowest of the runs is compared
+IMPORT_BUDGETS_MS = {
+    # `import truffles` loads no dependency at all
+    "import truffles": 50,
+    # first tool lookup: playwright, langchain_core and the tools, no provider package
+    "load tools": 1500,
+}
+
+STATEMENTS = {
+    "import truffles": "import truffles",
+    "load tools": "import truffles; truffles.tools.load_builtin_tools()",
+}
+
+# loaded only when a model of the provider, the LLM list detection or a screenshot is used
+LAZY_MODULES = ["langchain_openai", "langchain_anthropic", "openai", "anthropic", "bs4", "PIL"]
+
+_IMPORT_LINE = re.compile(r"import time:\s+\d+ \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def _top_level_imports(statement: str) -> Dict[str, int]:
+    """Cumulative microseconds of each top level import run by `statement` in a fresh interpreter"""
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement], capture_output=True, text=True, check=True
+    ).stderr
+    return {module: int(cumulative) for cumulative, indent, module in _IMPORT_LINE.findall(output) if not indent}
+
+
+def import_time_ms(statement: str) -> float:
+    """Milliseconds spent importing for `statement`, the imports of the interpreter startup excluded"""
+    startup = _top_level_imports("pass")
+    imports = _top_level_imports(statement)
+    return sum(cumulative for module, cumulative in imports.items() if module not in startup) / 1000
+
+
+def loaded_lazy_modules(statement: str) -> List[str]:
+    check = f"{statement}; import sys; print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    output = subprocess.run([sys.executable, "-c", check], capture_output=True, text=True, check=True).stdout
+    return [module for module in output.strip().split(",") if module]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per measurement")
+    args = parser.parse_args(argv)
+
+    failures = []
+    results: Dict[str, float] = {}
+    print(f"{'statement':<18} {'best ms':>9} {'budget ms':>10}  loaded lazy modules")
+    for name, statement in STATEMENTS.items():
+        results[name] = min(import_time_ms(statement) for _ in range(args.repeat))
+        loaded = loaded_lazy_modules(statement)
+        print(f"{name:<18} {results[name]:>9.1f} {IMPORT_BUDGETS_MS[name]:>10}  {', '.join(loaded) or '-'}")
+
+        if results[name] > IMPORT_BUDGETS_MS[name]:
+            failures.append(f"{name} took {results[name]:.1f} ms, over its budget of {IMPORT_BUDGETS_MS[name]} ms")
+        if loaded:
+            failures.append(f"{name} loaded {', '.join(loaded)}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
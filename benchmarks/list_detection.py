@@ -0,0 +1,82 @@
+"""
+Compare the accuracy and latency of the list detection strategies on saved HTML fixtures.
+
+The expected list wrapper of every fixture carries a `data-expected-list` attribute. A detection is correct
+if its marker selects exactly that element. The "llm" strategy needs a configured model, e.g. OPENAI_API_KEY.
+
+    python benchmarks/list_detection.py --fixtures benchmarks/fixtures --strategies statistical llm
+"""
+
+import argparse
+import asyncio
+import glob
+import os
+import time
+from typing import List, Optional
+
+from playwright.async_api import Page, async_playwright
+
+from truffles.tools.list_detector.strategies.llm_strategy import LLMStrategy
+from truffles.tools.list_detector.strategies.statistical_strategy import StatisticalStrategy
+
+STRATEGIES = {"statistical": StatisticalStrategy, "llm": LLMStrategy}
+
+IS_EXPECTED_JS = "elements => elements.length === 1 && elements[0].hasAttribute('data-expected-list')"
+
+
+async def detect(page: Page, strategy: str):
+    detector = STRATEGIES[strategy]()
+    start = time.perf_counter()
+    marker = await detector.detect(page)
+    elapsed = time.perf_counter() - start
+
+    correct = marker is not None and await page.locator(marker.get_selector()).evaluate_all(IS_EXPECTED_JS)
+    return correct, elapsed, getattr(detector, "last_confidence", None)
+
+
+async def run(fixtures: List[str], strategies: List[str]) -> None:
+    if "llm" in strategies:
+        from langchain_openai import ChatOpenAI
+
+        from truffles.models import DefaultModel
+
+        DefaultModel.initialize(ChatOpenAI(model="gpt-4o"))
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch()
+        page = await browser.new_page()
+
+        print(f"{'fixture':<28} {'strategy':<12} {'correct':>8} {'seconds':>8} {'confidence':>11}")
+        totals = {strategy: [0, 0.0] for strategy in strategies}
+        for path in fixtures:
+            with open(path, encoding="utf-8") as f:
+                await page.set_content(f.read())
+
+            for strategy in strategies:
+                correct, elapsed, confidence = await detect(page, strategy)
+                totals[strategy][0] += correct
+                totals[strategy][1] += elapsed
+                confidence = f"{confidence:.2f}" if confidence is not None else "-"
+                print(f"{os.path.basename(path):<28} {strategy:<12} {str(correct):>8} {elapsed:>8.3f} {confidence:>11}")
+
+        for strategy, (correct, elapsed) in totals.items():
+            print(f"{strategy}: {correct}/{len(fixtures)} correct, {elapsed / len(fixtures):.3f}s mean latency")
+
+        await browser.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--fixtures", default=os.path.join(os.path.dirname(__file__), "fixtures"))
+    parser.add_argument("--strategies", nargs="+", choices=list(STRATEGIES), default=["statistical"])
+    args = parser.parse_args(argv)
+
+    fixtures = sorted(glob.glob(os.path.join(args.fixtures, "*.html")))
+    if not fixtures:
+        parser.error(f"No .html fixtures found in {args.fixtures}")
+
+    asyncio.run(run(fixtures, args.strategies))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Measure the event loop lag while the "soup" list analysis scores large frames, parsed on the loop, in a worker
+thread (the default) and in the opt-in process pool.
+
+    python benchmarks/loop_lag.py --items 5000 --frames 3
+"""
+
+import argparse
+import asyncio
+import time
+from typing import List, Optional
+
+from truffles.tools.list_detector.strategies.llm_strategy import LLMStrategy, score_frame_html
+
+
+class Identifier:
+    def __init__(self, selector: str):
+        self.selector = selector
+
+
+class FakeFrame:
+    def __init__(self, html: str):
+        self.html = html
+
+    async def content(self) -> str:
+        await asyncio.sleep(0.01)  # the round trip to the browser
+        return self.html
+
+
+class FakePage:
+    def __init__(self, frames: List[FakeFrame]):
+        self.frames = frames
+
+
+def synthetic_page(items: int) -> str:
+    cards = "".join(
+        f'<div class="card c-{i % 7}"><h2 class="title">Product {i}</h2><span class="price">{i}.99</span></div>'
+        for i in range(items)
+    )
+    return f'<html><body><header><a href="/">Home</a></header><div class="grid">{cards}</div></body></html>'
+
+
+async def sequential_on_loop(page: FakePage, identifiers: List[Identifier]) -> dict:
+    """The previous implementation: fetch frame by frame and parse on the event loop"""
+    counts = {}
+    for frame in page.frames:
+        counts.update(score_frame_html(await frame.content(), [identifier.selector for identifier in identifiers]))
+    return counts
+
+
+async def measure(analysis, interval: float = 0.005):
+    """Run `analysis` while a ticker records how late it wakes up"""
+    lags = []
+    done = False
+
+    async def ticker():
+        while not done:
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            lags.append(time.perf_counter() - start - interval)
+
+    ticker_task = asyncio.create_task(ticker())
+    await asyncio.sleep(interval)  # let the ticker start
+
+    start = time.perf_counter()
+    result = await analysis()
+    elapsed = time.perf_counter() - start
+
+    done = True
+    await ticker_task
+    return result, elapsed, max(lags)
+
+
+async def run(items: int, frames: int) -> None:
+    page = FakePage([FakeFrame(synthetic_page(items)) for _ in range(frames)])
+    identifiers = [Identifier(f"Product {i}") for i in (1, items // 2, items - 1)]
+    strategy = LLMStrategy()
+
+    before, before_time, before_lag = await measure(lambda: sequential_on_loop(page, identifiers))
+
+    LLMStrategy.set_parse_executor(None)
+    thread, thread_time, thread_lag = await measure(lambda: strategy._string_to_wrap_selectors(page, identifiers))
+    assert before == thread, "the worker thread analysis must give the same scores"
+
+    # start the worker processes before measuring
+    pool = LLMStrategy.use_process_pool()
+    await asyncio.get_running_loop().run_in_executor(pool, score_frame_html, "", [])
+    after, after_time, after_lag = await measure(lambda: strategy._string_to_wrap_selectors(page, identifiers))
+    assert before == after, "the process pool analysis must give the same scores"
+
+    print(f"{'mode':<22} {'seconds':>10} {'max loop lag':>14}")
+    print(f"{'on loop, sequential':<22} {before_time:>10.3f} {before_lag:>14.3f}")
+    print(f"{'worker thread':<22} {thread_time:>10.3f} {thread_lag:>14.3f}")
+    print(f"{'process pool':<22} {after_time:>10.3f} {after_lag:>14.3f}")
+
+    LLMStrategy.set_parse_executor(None)
+    pool.shutdown()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=5000, help="Product cards per frame")
+    parser.add_argument("--frames", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    asyncio.run(run(args.items, args.frames))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Measure the cached-path page key on large pages: the outerHTML transferred and hashed in Python versus the key
+computed inside the page.
+
+Pages are served from a route on an https URL, so `crypto.subtle` is available and no network is needed.
+
+    python benchmarks/page_key.py --items 1000 10000 50000 --repeat 5
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List, Optional
+
+from playwright.async_api import Page, async_playwright
+
+from truffles.context import MemoryContextStore, SimpleMarker
+from truffles.tools.list_detector.browser_analysis import compute_page_key
+
+PAGE_URL = "https://benchmark.truffles.local/"
+
+
+def synthetic_page(items: int) -> str:
+    cards = "".join(
+        f'<div class="card c-{i % 7}" data-id="{i}"><img src="/img/{i}.png" alt="">'
+        f'<h2 class="title">Product {i}</h2><p class="text">{"Lorem ipsum dolor sit amet. " * 4}</p>'
+        f'<span class="price">{i}.99</span></div>'
+        for i in range(items)
+    )
+    return f'<html><head><title>Shop</title></head><body><div class="grid">{cards}</div></body></html>'
+
+
+async def outer_html_key(page: Page, store: MemoryContextStore) -> str:
+    """The previous cached path: transfer the document and hash it in the store"""
+    page_state = await page.evaluate("document.documentElement.outerHTML")
+    await store.get_marker(page_state, "list_detector")
+    return store._process_page_state(page_state)
+
+
+async def in_browser_key(page: Page, store: MemoryContextStore) -> str:
+    page_key = await compute_page_key(page, store.fingerprint_mode, store.near_duplicate_matching)
+    await store.get_marker(page_key, "list_detector")
+    return str(page_key)
+
+
+async def timed(function, page: Page, store: MemoryContextStore, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        key = await function(page, store)
+        timings.append(time.perf_counter() - start)
+    return key, statistics.median(timings)
+
+
+async def run(item_counts: List[int], repeat: int) -> None:
+    async with async_playwright() as p:
+        browser = await p.chromium.launch()
+        page = await browser.new_page()
+
+        print(
+            f"{'items':>7} {'MB':>6} {'mode':<11} {'outerHTML ms':>13} {'in browser ms':>14} {'speedup':>8} {'same':>5}"
+        )
+        for items in item_counts:
+            html = synthetic_page(items)
+            await page.route(PAGE_URL, lambda route, html=html: route.fulfill(body=html, content_type="text/html"))
+            await page.goto(PAGE_URL)
+            await page.unroute(PAGE_URL)
+            size = len(await page.evaluate("document.documentElement.outerHTML")) / 1e6
+
+            for mode in ("exact", "structural"):
+                store = MemoryContextStore(fingerprint_mode=mode)
+                await store.store_marker(await compute_page_key(page, mode), "list_detector", SimpleMarker(".grid"))
+
+                before_key, before = await timed(outer_html_key, page, store, repeat)
+                after_key, after = await timed(in_browser_key, page, store, repeat)
+                print(
+                    f"{items:>7} {size:>6.1f} {mode:<11} {before * 1000:>13.1f} {after * 1000:>14.1f} "
+                    f"{before / after:>7.1f}x {str(before_key == after_key):>5}"
+                )
+
+        await browser.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, nargs="+", default=[1000, 10000, 50000], help="Product cards per page")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement, the median is reported")
+    args = parser.parse_args(argv)
+
+    asyncio.run(run(args.items, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
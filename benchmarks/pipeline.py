@@ -0,0 +1,211 @@
+"""
+Offline benchmark of list detection and structuring on saved HTML fixtures.
+
+Pages are loaded into headless Chromium with `set_content` and every LLM call goes to a deterministic fake
+model, so no network is needed. Reports per stage: wall time, calls to the playwright page, frame and locator
+API, JSON bytes sent to and received from them, LLM calls and estimated prompt tokens, the size of the screenshot sent with the LLM
+detection, and the cache hit rates.
+
+    python benchmarks/pipeline.py --fixtures benchmarks/fixtures --repeat 3 --screenshot-format jpeg
+"""
+
+import argparse
+import asyncio
+import functools
+import glob
+import inspect
+import json
+import os
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, fields
+from typing import AsyncIterator, Dict, List, Optional
+
+from bs4 import BeautifulSoup
+from fakes import FakeChatModel
+from playwright.async_api import Frame, Locator, Page, async_playwright
+from pydantic import BaseModel
+
+import truffles
+from truffles.context import CacheStats, MemoryContextStore, StoreManager
+from truffles.models import DefaultModel
+from truffles.tools.list_detector.screenshot import SCREENSHOT_FORMATS, ScreenshotConfig
+from truffles.tools.structure_locator.cache import MemoryStructureCache, StructureCacheManager
+from truffles.tools.structure_locator.structure_locator import LocatorToDictTool
+
+
+class Item(BaseModel):
+    title: str
+    details: str
+
+
+@dataclass
+class StageMetrics:
+    seconds: float = 0.0
+    browser_calls: int = 0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    llm_calls: int = 0
+    prompt_tokens: int = 0
+    screenshot_bytes: int = 0
+
+
+class BrowserCallCounter:
+    """
+    Counts the calls to the public async API of pages, frames and locators, and the JSON size of their arguments
+    and results, the data exchanged with the browser.
+
+    A CDP session or `page.on()` only sees the network traffic of the page, which `set_content` fixtures do not
+    have, so the public methods are wrapped instead.
+    """
+
+    CLASSES = (Page, Frame, Locator)
+
+    def __init__(self):
+        self.calls = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def install(self) -> None:
+        for cls in self.CLASSES:
+            for name, method in list(vars(cls).items()):
+                if not name.startswith("_") and inspect.iscoroutinefunction(method):
+                    setattr(cls, name, self._counting(method))
+
+    def _counting(self, method):
+        counter = self
+
+        @functools.wraps(method)
+        async def counting_method(*args, **kwargs):
+            counter.calls += 1
+            counter.bytes_sent += json_size([args[1:], kwargs])
+            result = await method(*args, **kwargs)
+            counter.bytes_received += json_size(result)
+            return result
+
+        return counting_method
+
+
+def json_size(value) -> int:
+    """Size of `value` as JSON, handles and locators count as their repr"""
+    if isinstance(value, bytes):
+        return len(value)
+    return len(json.dumps(value, default=repr))
+
+
+class Meter:
+    def __init__(self, model: FakeChatModel):
+        self.model = model
+        self.browser = BrowserCallCounter()
+        self.browser.install()
+        self.stages: Dict[str, StageMetrics] = defaultdict(StageMetrics)
+        self.context_stats: Optional[CacheStats] = None
+        self.structure_stats: Optional[CacheStats] = None
+
+    @asynccontextmanager
+    async def stage(self, name: str) -> AsyncIterator[None]:
+        browser = self.browser
+        before = (browser.calls, browser.bytes_sent, browser.bytes_received)
+        calls, tokens = self.model.calls, self.model.prompt_tokens
+        start = time.perf_counter()
+        yield
+        metrics = self.stages[name]
+        metrics.seconds += time.perf_counter() - start
+        metrics.browser_calls += browser.calls - before[0]
+        metrics.bytes_sent += browser.bytes_sent - before[1]
+        metrics.bytes_received += browser.bytes_received - before[2]
+        metrics.llm_calls += self.model.calls - calls
+        metrics.prompt_tokens += self.model.prompt_tokens - tokens
+
+
+def expected_list_texts(html: str, count: int = 3) -> List[str]:
+    """The first text of the first items of the `data-expected-list` wrapper, what a good LLM would answer"""
+    wrapper = BeautifulSoup(html, "html.parser").select_one("[data-expected-list]")
+    if wrapper is None:
+        return []
+    texts = [next(child.stripped_strings, None) for child in wrapper.find_all(recursive=False)]
+    return [text for text in texts if text][:count]
+
+
+async def run_fixture(page, html: str, meter: Meter, screenshot_config: ScreenshotConfig) -> None:
+    meter.model.list_texts = expected_list_texts(html)
+    await page.set_content(html)
+    detector = page.tools.get_tool("get_main_list")
+
+    for engine in ("soup", "browser"):
+        stage = f"detect llm ({engine})"
+        async with meter.stage(stage):
+            await page.tools.get_main_list(
+                strategy="llm", force_detect=True, analysis_engine=engine, screenshot_config=screenshot_config
+            )
+        meter.stages[stage].screenshot_bytes += detector.last_screenshot_stats.bytes
+    async with meter.stage("detect statistical"):
+        await page.tools.get_main_list(strategy="statistical", force_detect=True)
+    async with meter.stage("detect cached"):
+        items = await page.tools.get_main_list(strategy="llm")
+
+    # batched first and without the cache, so the other stages still start with a cold cache
+    cache = StructureCacheManager.get_cache()
+    StructureCacheManager.reset()
+    async with meter.stage("structure batched"):
+        await LocatorToDictTool.execute_many(items or [], Item, batch_size=10)
+    StructureCacheManager.initialize(cache)
+
+    async with meter.stage("structure"):
+        await asyncio.gather(*[item.tools.to_structure(Item) for item in items or []])
+    async with meter.stage("structure cached"):
+        await asyncio.gather(*[item.tools.to_structure(Item) for item in items or []])
+
+
+async def run(fixtures: List[str], repeat: int, screenshot_config: ScreenshotConfig) -> Meter:
+    model = FakeChatModel()
+    DefaultModel.initialize(model, size_overrides={size: model for size in ("small", "standard", "large")})
+    context_store = MemoryContextStore()
+    StoreManager.initialize(context_store)
+    StructureCacheManager.initialize(MemoryStructureCache())
+    meter = Meter(model)
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch()
+        page = await truffles.wrap(await browser.new_page())
+        for _ in range(repeat):
+            for path in fixtures:
+                with open(path, encoding="utf-8") as f:
+                    await run_fixture(page, f.read(), meter, screenshot_config)
+        await browser.close()
+
+    meter.context_stats = context_store.stats
+    meter.structure_stats = StructureCacheManager.get_stats()
+    return meter
+
+
+def report(meter: Meter, runs: int) -> None:
+    columns = [field.name for field in fields(StageMetrics)]
+    print(f"{'stage':<22}" + "".join(f"{column:>16}" for column in columns) + "   (mean per page)")
+    for name, metrics in meter.stages.items():
+        print(f"{name:<22}" + "".join(f"{getattr(metrics, column) / runs:>16.3f}" for column in columns))
+
+    for name, stats in (("context store", meter.context_stats), ("structure cache", meter.structure_stats)):
+        print(f"{name}: {stats.hits} hits, {stats.misses} misses, hit rate {stats.hit_rate:.0%}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--fixtures", default=os.path.join(os.path.dirname(__file__), "fixtures"))
+    parser.add_argument("--repeat", type=int, default=1, help="Runs over all fixtures")
+    parser.add_argument("--screenshot-format", default="png", choices=SCREENSHOT_FORMATS)
+    parser.add_argument("--screenshot-quality", type=int, default=None, help="JPEG/WebP quality")
+    args = parser.parse_args(argv)
+
+    fixtures = sorted(glob.glob(os.path.join(args.fixtures, "*.html")))
+    if not fixtures:
+        parser.error(f"No .html fixtures found in {args.fixtures}")
+
+    screenshot_config = ScreenshotConfig(format=args.screenshot_format, quality=args.screenshot_quality)
+    meter = asyncio.run(run(fixtures, args.repeat, screenshot_config))
+    report(meter, len(fixtures) * args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Measure the time and memory of wrapping large evaluate results and locator lists, eagerly copied, as lazy views
+and, for evaluate, not wrapped at all.
+
+    python benchmarks/result_wrapping.py --rows 50000 --read 10
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+from typing import Any, Callable, List, Optional
+
+from fakes import FakeLocator
+
+from truffles.enhanced.locator import TLocator
+from truffles.utils.wrap import wrap_collection
+
+
+def evaluate_payload(rows: int) -> List[dict]:
+    """Rows as returned by an evaluate call scraping a table"""
+    return [
+        {"index": index, "title": f"Product {index}", "price": index * 1.5, "tags": ["new", "sale"][: index % 3]}
+        for index in range(rows)
+    ]
+
+
+def read(result: Any, count: int) -> None:
+    """Access the first `count` entries, like a caller looking at the top results"""
+    for index in range(min(count, len(result))):
+        item = result[index]
+        if isinstance(item, dict) or hasattr(item, "keys"):
+            for key in item:
+                item[key]
+
+
+def measure(function: Callable[[], Any]) -> tuple:
+    """Seconds and peak bytes allocated by `function`, timed without tracemalloc which slows allocations down"""
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50000, help="Rows of the evaluate result and locators in the list")
+    parser.add_argument("--read", type=int, default=10, help="Entries read from each result")
+    args = parser.parse_args(argv)
+
+    payload = evaluate_payload(args.rows)
+    locator = TLocator(FakeLocator(evaluate_result=payload))
+    locators = [FakeLocator(index) for index in range(args.rows)]
+
+    def evaluate_unwrapped():
+        read(asyncio.run(locator.evaluate("rows => rows")), args.read)
+
+    cases = (
+        ("evaluate, eager copy", lambda: read(wrap_collection(payload), args.read)),
+        ("evaluate, lazy view", lambda: read(wrap_collection(payload, lazy=True), args.read)),
+        ("evaluate, not wrapped", evaluate_unwrapped),
+        ("locators, eager copy", lambda: read(wrap_collection(locators), args.read)),
+        ("locators, lazy view", lambda: read(wrap_collection(locators, lazy=True), args.read)),
+    )
+
+    print(f"{'result':<24} {'ms':>9} {'peak KiB':>10}")
+    for name, function in cases:
+        elapsed, peak = measure(function)
+        print(f"{name:<24} {elapsed * 1000:>9.2f} {peak / 1024:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
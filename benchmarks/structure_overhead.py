@@ -0,0 +1,134 @@
+"""
+Measure the per-item overhead of `to_structure` with and without the cached clients and runnables.
+
+The "fake" backend answers in-process, the "http" backend runs a local OpenAI compatible stub and counts the
+TCP connections opened against it.
+
+    python benchmarks/structure_overhead.py --items 200 --backend fake http
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, List, Optional
+
+from fakes import FakeChatModel, sample_output
+from pydantic import BaseModel
+
+from truffles.models.default_model import DefaultModel
+from truffles.tools.structure_locator import structure_locator
+from truffles.tools.structure_locator.structure_locator import LocatorToDictTool
+
+
+class Product(BaseModel):
+    name: str
+    price: str
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers chat completions with a tool call filled with sample values"""
+
+    protocol_version = "HTTP/1.1"
+    connections = set()
+
+    def do_POST(self):
+        StubHandler.connections.add(self.client_address)
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        function = request["tools"][0]["function"]
+        tool_call = {
+            "id": "call_0",
+            "type": "function",
+            "function": {"name": function["name"], "arguments": json.dumps(sample_output(function["parameters"]))},
+        }
+        body = json.dumps(
+            {
+                "id": "chatcmpl-0",
+                "object": "chat.completion",
+                "created": 0,
+                "model": request["model"],
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": None, "tool_calls": [tool_call]},
+                        "finish_reason": "tool_calls",
+                    }
+                ],
+                "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+            }
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+
+def clear_caches() -> None:
+    """Forget the cached clients and runnables, like the implementation before they existed"""
+    DefaultModel._specific_models = {}
+    DefaultModel._structured_runnables = {}
+    structure_locator._relevance_model.cache_clear()
+
+
+async def run_items(items: int, cached: bool) -> float:
+    tool = LocatorToDictTool(locator=None)
+    start = time.perf_counter()
+    for i in range(items):
+        if not cached:
+            clear_caches()
+        await tool._exec_impl(f"Product {i} for {i} EUR", Product)
+    per_item = (time.perf_counter() - start) / items
+
+    # let dropped clients close their connections while the loop still runs
+    clear_caches()
+    gc.collect()
+    await asyncio.sleep(0.1)
+    return per_item
+
+
+def setup_backend(backend: str) -> Optional[ThreadingHTTPServer]:
+    if backend == "fake":
+        model = FakeChatModel()
+        DefaultModel.initialize(model, size_overrides={"small": model})
+        return None
+
+    from langchain_openai import ChatOpenAI
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{server.server_port}/v1"
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+    DefaultModel.initialize(ChatOpenAI())
+    return server
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=200)
+    parser.add_argument("--backend", nargs="+", choices=["fake", "http"], default=["fake", "http"])
+    args = parser.parse_args(argv)
+
+    print(f"{'backend':>8} {'mode':>8} {'ms/item':>10} {'connections':>12}")
+    for backend in args.backend:
+        server = setup_backend(backend)
+        for cached in (False, True):
+            StubHandler.connections = set()
+            per_item = asyncio.run(run_items(args.items, cached))
+            connections = len(StubHandler.connections) if server is not None else "-"
+            mode = "cached" if cached else "rebuilt"
+            print(f"{backend:>8} {mode:>8} {per_item * 1000:>10.3f} {connections:>12}")
+        if server is not None:
+            server.shutdown()
+        DefaultModel.reset()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,72 @@
-from langchain_core.language_models.chat_models import BaseChatModel
-from langchain_openai import ChatOpenAI
-from playwright.async_api import Page
+import importlib
+from typing import TYPE_CHECKING, Any, Optional
 
-from truffles.context import ContextStore, MemoryContextStore, StoreManager
-from truffles.enhanced.page import TPage
-from truffles.models import DefaultModel
-from truffles.tools.list_detector.list_detector import ListDetector
-from truffles.tools.structure_locator.structure_locator import LocatorToDictTool
+if TYPE_CHECKING:
+    from langchain_core.language_models.chat_models import BaseChatModel
+    from playwright.async_api import Page
+
+    from truffles.context import ContextStore
+    from truffles.enhanced.page import TPage
+    from truffles.tools.list_detector.list_detector import ListDetector
+    from truffles.tools.structure_locator.structure_locator import LocatorToDictTool
 
 __all__ = ["ListDetector", "LocatorToDictTool", "wrap", "__version__"]
 
 __version__ = "0.1.1"
 
+# attributes imported on first access, so `import truffles` does not load playwright, langchain and the tools
+_LAZY_ATTRIBUTES = {
+    "ListDetector": "truffles.tools.list_detector.list_detector",
+    "LocatorToDictTool": "truffles.tools.structure_locator.structure_locator",
+}
+_LAZY_SUBMODULES = {"context", "enhanced", "models", "tasks", "tools", "tracing"}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+    elif name in _LAZY_SUBMODULES:
+        value = importlib.import_module(f"truffles.{name}")
+    else:
+        raise AttributeError(f"module 'truffles' has no attribute '{name}'")
+
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES) | _LAZY_SUBMODULES)
+
 
-async def wrap(page: Page):
+async def wrap(page: "Page") -> "TPage":
     """Wrap a playwright Page object in a TPage object."""
+    from truffles.enhanced.page import TPage
+
     return TPage(page)
 
 
 async def start(
-    context_store: ContextStore = MemoryContextStore(),
-    model: BaseChatModel = ChatOpenAI(model="gpt-4o"),
+    context_store: Optional["ContextStore"] = None,
+    model: Optional["BaseChatModel"] = None,
 ):
-    """Initialize the StoreManager and LLMManager."""
+    """
+    Initialize the StoreManager and LLMManager.
+
+    Args:
+        context_store: Store of the detected markers, defaults to a `MemoryContextStore`
+        model: The default model, defaults to OpenAI `gpt-4o`
+    """
+    from truffles.context import MemoryContextStore, StoreManager
+    from truffles.models import DefaultModel
+
+    if context_store is None:
+        context_store = MemoryContextStore()
+
+    if model is None:
+        from langchain_openai import ChatOpenAI
+
+        model = ChatOpenAI(model="gpt-4o")
+
     StoreManager.initialize(context_store)
     DefaultModel.initialize(model)
 
@@ -1,13 +1,20 @@
 from truffles.context.base import ContextStore
+from truffles.context.fingerprint import PageKey
 from truffles.context.implementations.memory import MemoryContextStore
-from truffles.context.marker import AttributeMarker, Marker, SimpleMarker
+from truffles.context.implementations.sqlite import SQLiteContextStore
+from truffles.context.marker import AttributeMarker, Marker, MarkerValidation, SimpleMarker
 from truffles.context.state import StoreManager
+from truffles.context.stats import CacheStats
 
 __all__ = [
     "StoreManager",
     "ContextStore",
     "MemoryContextStore",
+    "SQLiteContextStore",
     "Marker",
     "SimpleMarker",
     "AttributeMarker",
+    "MarkerValidation",
+    "CacheStats",
+    "PageKey",
 ]
@@ -2,15 +2,35 @@ import hashlib
 from abc import ABC, abstractmethod
 from typing import Optional
 
+from truffles.context.exceptions import ContextError
+from truffles.context.fingerprint import PageKey, structural_fingerprint
 from truffles.context.marker import Marker
 
 
 class ContextStore(ABC):
     """Abstract base class for selector hash store"""
 
+    # "exact" hashes the full page state, "structural" only hashes the DOM skeleton
+    fingerprint_mode: str = "exact"
+
+    @property
+    def near_duplicate_matching(self) -> bool:
+        """Whether the store looks up near-duplicate pages, it then needs the SimHash of precomputed page keys"""
+        return False
+
     def _process_page_state(self, page_state: str) -> str:
-        """Process the page state to generate a key"""
-        # For now, hash the page state
+        """Process the page state to generate a key, a `PageKey` is used as is"""
+        if isinstance(page_state, PageKey):
+            if page_state.fingerprint_mode != self.fingerprint_mode:
+                raise ContextError(
+                    f"Page key computed with fingerprint_mode '{page_state.fingerprint_mode}', "
+                    f"the store uses '{self.fingerprint_mode}'"
+                )
+            return str(page_state)
+
+        if self.fingerprint_mode == "structural":
+            return structural_fingerprint(page_state)
+
         return hashlib.sha256(page_state.encode("utf-8")).hexdigest()
 
     @abstractmethod
@@ -37,5 +57,9 @@ class ContextStore(ABC):
         marker: Marker,
         marker_id: Optional[str] = None,
     ) -> None:
-        """Remove marker for a given page hash and action if it matches the provided marker"""
+        """
+        Remove marker for a given page hash and action if it matches the provided marker.
+
+        A marker returned by `get_marker` is removed from the entry it was found under, see `Marker.page_key`.
+        """
         pass
@@ -0,0 +1,225 @@
+import hashlib
+import re
+from html.parser import HTMLParser
+from typing import Dict, Iterable, List, Optional, Set
+
+FINGERPRINT_MODES = ("exact", "structural")
+
+SIMHASH_BITS = 64
+
+# elements without an end tag, they are never pushed on the tag stack
+VOID_ELEMENTS = {
+    "area",
+    "base",
+    "br",
+    "col",
+    "embed",
+    "hr",
+    "img",
+    "input",
+    "link",
+    "meta",
+    "param",
+    "source",
+    "track",
+    "wbr",
+}
+
+# elements that change between loads without changing the page layout
+IGNORED_ELEMENTS = {"script", "style", "noscript", "link", "meta"}
+
+# attributes whose value is kept in the skeleton, all other attributes only contribute their name
+VALUE_ATTRIBUTES = {"role", "type"}
+
+# tokens containing long digit runs or hash-like hex strings (ids, timestamps, css-in-js classes)
+VOLATILE_TOKEN = re.compile(r"\d{3,}|[0-9a-f]{8,}")
+
+
+def is_stable_token(token: str) -> bool:
+    """Check if a class/id token is likely to survive a page reload"""
+    return bool(token) and not VOLATILE_TOKEN.search(token.lower())
+
+
+class _SkeletonParser(HTMLParser):
+    """Collects one token per element: its tag path and its normalized attributes"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.stack: List[str] = []
+        self.tokens: Set[str] = set()
+
+    def _element_token(self, tag: str, attrs: List) -> str:
+        classes = set()
+        element_id = ""
+        attr_names = set()
+        for key, value in attrs:
+            if key == "class":
+                classes.update(token for token in (value or "").split() if is_stable_token(token))
+            elif key == "id":
+                element_id = value if is_stable_token(value or "") else ""
+            elif key in VALUE_ATTRIBUTES and is_stable_token(value or ""):
+                attr_names.add(f"{key}={value}")
+            else:
+                attr_names.add(key)
+
+        signature = tag + "".join(f".{c}" for c in sorted(classes))
+        if element_id:
+            signature += f"#{element_id}"
+        if attr_names:
+            signature += f"[{','.join(sorted(attr_names))}]"
+
+        return f"{'/'.join(self.stack)}|{signature}"
+
+    def _ignored(self, tag: str) -> bool:
+        # browsers with scripting enabled parse the content of <noscript> as text, it has no elements
+        return tag in IGNORED_ELEMENTS or "noscript" in self.stack
+
+    def handle_starttag(self, tag, attrs):
+        if not self._ignored(tag):
+            self.tokens.add(self._element_token(tag, attrs))
+        if tag not in VOID_ELEMENTS:
+            self.stack.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        if not self._ignored(tag):
+            self.tokens.add(self._element_token(tag, attrs))
+
+    def handle_endtag(self, tag):
+        if tag not in self.stack:
+            return  # stray end tag, ignore it
+        while self.stack and self.stack.pop() != tag:
+            pass
+
+
+def page_skeleton(html: str) -> Set[str]:
+    """
+    Reduce an HTML document to the set of its structural tokens.
+
+    Text, attribute values and volatile class/id tokens are dropped, so CSRF tokens, timestamps or prices
+    do not change the skeleton. Repeated elements (e.g. list items) collapse into a single token. The content of
+    `<noscript>` is dropped as well, like in the DOM of a browser with scripting enabled.
+    """
+    parser = _SkeletonParser()
+    parser.feed(html)
+    parser.close()
+    return parser.tokens
+
+
+def skeleton_digest(tokens: Iterable[str]) -> str:
+    """Hash a page skeleton independent of token order"""
+    return hashlib.sha256("\n".join(sorted(tokens)).encode("utf-8")).hexdigest()
+
+
+def structural_fingerprint(html: str) -> str:
+    """Hash the DOM skeleton of an HTML document"""
+    return skeleton_digest(page_skeleton(html))
+
+
+class PageKey(str):
+    """
+    Precomputed key of a page state, e.g. computed inside the browser.
+
+    The stores use it as the page hash instead of hashing the page state, it has to be computed with the
+    `fingerprint_mode` of the store. `simhash` is the skeleton SimHash for near-duplicate matching, if computed.
+    """
+
+    def __new__(cls, key: str, fingerprint_mode: str = "exact", simhash: Optional[int] = None) -> "PageKey":
+        if fingerprint_mode not in FINGERPRINT_MODES:
+            raise ValueError(f"fingerprint_mode must be one of: {FINGERPRINT_MODES}")
+
+        page_key = super().__new__(cls, key)
+        page_key.fingerprint_mode = fingerprint_mode
+        page_key.simhash = simhash
+        return page_key
+
+
+def page_key_from_html(html: str, fingerprint_mode: str = "exact", with_simhash: bool = False) -> PageKey:
+    """Compute the key a store with `fingerprint_mode` derives from `html`"""
+    skeleton = page_skeleton(html) if fingerprint_mode == "structural" or with_simhash else None
+    if fingerprint_mode == "structural":
+        key = skeleton_digest(skeleton)
+    else:
+        key = hashlib.sha256(html.encode("utf-8")).hexdigest()
+
+    return PageKey(key, fingerprint_mode, simhash(skeleton) if with_simhash else None)
+
+
+def _feature_hash(feature: str) -> int:
+    return int.from_bytes(hashlib.sha256(feature.encode("utf-8")).digest()[:8], "big")
+
+
+def simhash(tokens: Iterable[str]) -> int:
+    """Compute a 64 bit SimHash, similar token sets have a small hamming distance"""
+    weights = [0] * SIMHASH_BITS
+    for token in tokens:
+        feature = _feature_hash(token)
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if feature >> bit & 1 else -1
+
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class SimHashIndex:
+    """
+    Near-duplicate lookup of SimHashes.
+
+    The hash is split into `max_distance + 1` bands, two hashes within `max_distance` bits of each other
+    share at least one band (pigeonhole), so only keys in the same band buckets have to be compared.
+    """
+
+    def __init__(self, max_distance: int = 8):
+        if not 0 <= max_distance < SIMHASH_BITS:
+            raise ValueError(f"max_distance must be between 0 and {SIMHASH_BITS - 1}")
+
+        self.max_distance = max_distance
+        band_count = max_distance + 1
+        bounds = [SIMHASH_BITS * i // band_count for i in range(band_count + 1)]
+        self._bands = [(start, (1 << (end - start)) - 1) for start, end in zip(bounds, bounds[1:])]
+        self._buckets: List[Dict[int, Set[str]]] = [{} for _ in self._bands]
+        self._hashes: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._hashes
+
+    @property
+    def hashes(self) -> Dict[str, int]:
+        return dict(self._hashes)
+
+    def add(self, key: str, value: int) -> None:
+        if key in self._hashes:
+            self.remove(key)
+
+        self._hashes[key] = value
+        for buckets, (shift, mask) in zip(self._buckets, self._bands):
+            buckets.setdefault(value >> shift & mask, set()).add(key)
+
+    def remove(self, key: str) -> None:
+        value = self._hashes.pop(key, None)
+        if value is None:
+            return
+
+        for buckets, (shift, mask) in zip(self._buckets, self._bands):
+            band = value >> shift & mask
+            bucket = buckets.get(band)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del buckets[band]
+
+    def query(self, value: int) -> Optional[str]:
+        """Get the closest key within `max_distance` bits, or None"""
+        best_key, best_distance = None, self.max_distance + 1
+        for buckets, (shift, mask) in zip(self._buckets, self._bands):
+            for key in buckets.get(value >> shift & mask, ()):
+                distance = hamming_distance(value, self._hashes[key])
+                if distance < best_distance:
+                    best_key, best_distance = key, distance
+
+        return best_key
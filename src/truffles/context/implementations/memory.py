@@ -1,47 +1,117 @@
 import json
-from typing import Dict, Optional
+from dataclasses import replace
+from typing import Optional, Tuple
 
 from truffles.context.base import ContextStore
-from truffles.context.exceptions import ContextError
-from truffles.context.marker import AttributeMarker, Marker, SimpleMarker
+from truffles.context.fingerprint import (
+    FINGERPRINT_MODES,
+    PageKey,
+    SimHashIndex,
+    page_skeleton,
+    simhash,
+    skeleton_digest,
+)
+from truffles.context.lru import LRUStore
+from truffles.context.marker import Marker, marker_from_dict
+from truffles.context.stats import CacheStats
 
 
 class MemoryContextStore(ContextStore):
     """In-memory implementation of context store"""
 
-    def __init__(self):
-        self._store: Dict[str, Dict[str, Dict]] = {}
-        self._manual_id_store: Dict[str, Dict[str, Dict]] = {}
+    def __init__(
+        self,
+        fingerprint_mode: str = "exact",
+        near_duplicate_distance: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        ttl: Optional[float] = None,
+    ):
+        """
+        Args:
+            fingerprint_mode: "exact" hashes the full page state, "structural" only the DOM skeleton
+            near_duplicate_distance: If set, a page without a stored entry reuses the entry of the most similar
+                stored page whose skeleton SimHash is at most this many bits away (~8 works well for pages
+                sharing ~95% of their template)
+            max_entries: Maximum number of stored pages and, separately, of stored marker ids.
+                The least recently used entries are evicted first.
+            max_bytes: Maximum approximate size of the stored pages and, separately, of the stored marker ids
+            ttl: Seconds after which a stored entry expires
+        """
+        if fingerprint_mode not in FINGERPRINT_MODES:
+            raise ValueError(f"fingerprint_mode must be one of: {FINGERPRINT_MODES}")
+
+        self.fingerprint_mode = fingerprint_mode
+        self._near_duplicates = (
+            SimHashIndex(max_distance=near_duplicate_distance) if near_duplicate_distance is not None else None
+        )
+
+        self._stats = CacheStats()
+        limits = {"max_entries": max_entries, "max_bytes": max_bytes, "ttl": ttl}
+        self._store = LRUStore(
+            self._stats,
+            on_evict=self._near_duplicates.remove if self._near_duplicates is not None else None,
+            **limits,
+        )
+        self._manual_id_store = LRUStore(self._stats, **limits)
+
+    @property
+    def stats(self) -> CacheStats:
+        """Hit, miss and eviction counters, `entries` counts stored pages and marker ids"""
+        return replace(self._stats, entries=len(self._store) + len(self._manual_id_store))
+
+    @property
+    def near_duplicate_matching(self) -> bool:
+        return self._near_duplicates is not None
+
+    def _page_keys(self, page_state: str) -> Tuple[str, Optional[int]]:
+        """Get the page hash and, if near-duplicate matching is enabled, the skeleton SimHash"""
+        if self._near_duplicates is None:
+            return self._process_page_state(page_state), None
+
+        if isinstance(page_state, PageKey):
+            # without a precomputed SimHash the page is only matched exactly
+            return self._process_page_state(page_state), page_state.simhash
+
+        skeleton = page_skeleton(page_state)
+        if self.fingerprint_mode == "structural":
+            page_hash = skeleton_digest(skeleton)
+        else:
+            page_hash = self._process_page_state(page_state)
+
+        return page_hash, simhash(skeleton)
 
     async def get_marker(self, page_state: str, action_name: str, marker_id: Optional[str] = None) -> Optional[Marker]:
         """Get marker for a given page state and action"""
 
         marker_data = None
+        page_hash = None
 
         if marker_id:
-            marker_data = self._manual_id_store.get(marker_id, None)
+            marker_data = self._manual_id_store.get(marker_id)
 
         if not marker_data:  # not found so far, check the big page state
-            page_hash = self._process_page_state(page_state)
-            if page_hash not in self._store:
-                return None
-
-            marker_data = self._store[page_hash].get(action_name)
+            page_hash, page_simhash = self._page_keys(page_state)
+            page_markers = self._store.get(page_hash)
+            if page_markers is None and page_simhash is not None:
+                near_duplicate_hash = self._near_duplicates.query(page_simhash)
+                if near_duplicate_hash is not None:
+                    page_markers = self._store.get(near_duplicate_hash)
+                    page_hash = near_duplicate_hash
+
+            marker_data = page_markers.get(action_name) if page_markers else None
             if not marker_data:
+                self._stats.misses += 1
                 return None
 
             # store it for next time, since it was requested and not found
             if marker_id:
-                self._manual_id_store[marker_id] = marker_data
-
-        # Create appropriate marker type based on stored data
-        marker_type = marker_data["type"]
-        if marker_type == "simple":
-            return SimpleMarker.from_dict(marker_data)
-        elif marker_type == "attribute":
-            return AttributeMarker.from_dict(marker_data)
-        else:
-            raise ContextError(f"Unknown marker type: {marker_type}")
+                self._manual_id_store.set(marker_id, marker_data)
+
+        self._stats.hits += 1
+        marker = marker_from_dict(marker_data)
+        marker.page_key = page_hash
+        return marker
 
     async def store_marker(
         self,
@@ -51,13 +121,16 @@ class MemoryContextStore(ContextStore):
         marker_id: Optional[str] = None,
     ) -> None:
         """Store marker for a given page state and action"""
-        page_hash = self._process_page_state(page_state)
-        if page_hash not in self._store:
-            self._store[page_hash] = {}
+        page_hash, page_simhash = self._page_keys(page_state)
+        page_markers = dict(self._store.get(page_hash) or {})
+        page_markers[action_name] = marker.to_dict()
+
+        self._store.set(page_hash, page_markers)
+        if page_simhash is not None:
+            self._near_duplicates.add(page_hash, page_simhash)
 
-        self._store[page_hash][action_name] = marker.to_dict()
         if marker_id:
-            self._manual_id_store[marker_id] = marker.to_dict()
+            self._manual_id_store.set(marker_id, marker.to_dict())
 
     async def remove_marker(
         self,
@@ -66,25 +139,51 @@ class MemoryContextStore(ContextStore):
         marker: Marker,
         marker_id: Optional[str] = None,
     ) -> None:
-        """Remove marker for a given page state and action if it matches the provided marker"""
-        page_hash = self._process_page_state(page_state)
-        if page_hash in self._store and action_name in self._store[page_hash]:
-            stored_marker_data = self._store[page_hash][action_name]
-            stored_marker = Marker.from_dict(stored_marker_data)
+        """
+        Remove marker for a given page state and action if it matches the provided marker.
+
+        A marker returned by `get_marker` is removed from the page entry it was found under, which may be a near
+        duplicate of `page_state`.
+        """
+        page_hash = marker.page_key or self._page_keys(page_state)[0]
+        page_markers = self._store.get(page_hash)
+        if page_markers and action_name in page_markers:
+            stored_marker = marker_from_dict(page_markers[action_name])
             if stored_marker == marker:
-                del self._store[page_hash][action_name]
+                # drop only this action, the other markers of the page keep their age
+                page_markers = {key: value for key, value in page_markers.items() if key != action_name}
+                if page_markers:
+                    self._store.replace(page_hash, page_markers)
+                else:
+                    self._store.pop(page_hash)
+                    if self._near_duplicates is not None:
+                        self._near_duplicates.remove(page_hash)
 
         if marker_id:
-            del self._manual_id_store[marker_id]
+            stored_marker_data = self._manual_id_store.get(marker_id)
+            if stored_marker_data is not None and marker_from_dict(stored_marker_data) == marker:
+                self._manual_id_store.pop(marker_id)
 
     def to_json(self) -> str:
         """Convert store to JSON string"""
-        return json.dumps({"memory_store": self._store, "manual_id_store": self._manual_id_store})
+        data = {"memory_store": self._store.to_dict(), "manual_id_store": self._manual_id_store.to_dict()}
+        if self._near_duplicates is not None:
+            data["simhashes"] = self._near_duplicates.hashes
+        return json.dumps(data)
 
     @classmethod
-    def from_json(cls, json_str: str) -> "MemoryContextStore":
-        """Create store from JSON string"""
-        store = cls()
-        store._store = json.loads(json_str)["memory_store"]
-        store._manual_id_store = json.loads(json_str)["manual_id_store"]
+    def from_json(cls, json_str: str, **kwargs) -> "MemoryContextStore":
+        """Create store from JSON string, `kwargs` are passed to the constructor"""
+        data = json.loads(json_str)
+        store = cls(**kwargs)
+
+        simhashes = data.get("simhashes", {})
+        for page_hash, page_markers in data["memory_store"].items():
+            store._store.set(page_hash, page_markers)
+            if store._near_duplicates is not None and page_hash in simhashes:
+                store._near_duplicates.add(page_hash, simhashes[page_hash])
+
+        for marker_id, marker_data in data["manual_id_store"].items():
+            store._manual_id_store.set(marker_id, marker_data)
+
         return store
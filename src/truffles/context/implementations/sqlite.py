@@ -0,0 +1,241 @@
+import asyncio
+import json
+import sqlite3
+import threading
+from typing import Dict, Optional, Tuple
+
+from truffles.context.base import ContextStore
+from truffles.context.fingerprint import FINGERPRINT_MODES
+from truffles.context.marker import Marker, marker_from_dict
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS markers (
+    page_hash TEXT NOT NULL,
+    action_name TEXT NOT NULL,
+    marker TEXT NOT NULL,
+    PRIMARY KEY (page_hash, action_name)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS markers_action_name ON markers (action_name);
+CREATE TABLE IF NOT EXISTS manual_markers (
+    marker_id TEXT PRIMARY KEY,
+    marker TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+class SQLiteContextStore(ContextStore):
+    """
+    SQLite implementation of context store.
+
+    The database runs in WAL mode, so several workers on one host can share a single file: readers never block
+    each other and only wait on writers for the short duration of a batch commit. Opening the store does not
+    load any data, every lookup is a primary key query.
+
+    Writes are buffered and committed in batches of `batch_size`, call `flush()` (or `close()`) to persist
+    pending writes earlier. Pending writes are visible to lookups of this store immediately. Used as an async
+    context manager, the store is closed, and pending writes are committed, on exit:
+
+        async with SQLiteContextStore("markers.db") as store:
+            StoreManager.initialize(store)
+            ...
+
+    The database calls of the async methods run in a worker thread, they can wait up to `timeout` seconds on
+    a lock held by another process.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        fingerprint_mode: str = "exact",
+        batch_size: int = 100,
+        timeout: float = 30.0,
+    ):
+        """
+        Args:
+            path: Path of the database file, it is created if it does not exist
+            fingerprint_mode: "exact" hashes the full page state, "structural" only the DOM skeleton
+            batch_size: Number of buffered writes that triggers a commit
+            timeout: Seconds to wait for a lock held by another process before raising
+        """
+        if fingerprint_mode not in FINGERPRINT_MODES:
+            raise ValueError(f"fingerprint_mode must be one of: {FINGERPRINT_MODES}")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+
+        self.fingerprint_mode = fingerprint_mode
+        self.batch_size = batch_size
+
+        # serializes the worker threads sharing the connection and the pending writes
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(path, timeout=timeout, isolation_level=None, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA)
+
+        self._pending_markers: Dict[Tuple[str, str], str] = {}
+        self._pending_manual_markers: Dict[str, str] = {}
+
+    def _fetch_marker_data(self, page_hash: str, action_name: str) -> Optional[str]:
+        if (page_hash, action_name) in self._pending_markers:
+            return self._pending_markers[(page_hash, action_name)]
+
+        row = self._connection.execute(
+            "SELECT marker FROM markers WHERE page_hash = ? AND action_name = ?", (page_hash, action_name)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _fetch_manual_marker_data(self, marker_id: str) -> Optional[str]:
+        if marker_id in self._pending_manual_markers:
+            return self._pending_manual_markers[marker_id]
+
+        row = self._connection.execute("SELECT marker FROM manual_markers WHERE marker_id = ?", (marker_id,)).fetchone()
+        return row[0] if row else None
+
+    def _queue_writes(self, markers: Dict[Tuple[str, str], str], manual_markers: Dict[str, str]) -> None:
+        self._pending_markers.update(markers)
+        self._pending_manual_markers.update(manual_markers)
+
+        if len(self._pending_markers) + len(self._pending_manual_markers) >= self.batch_size:
+            self._flush()
+
+    def flush(self) -> None:
+        """Commit all buffered writes in a single transaction"""
+        with self._lock:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._pending_markers and not self._pending_manual_markers:
+            return
+
+        self._connection.execute("BEGIN IMMEDIATE")
+        try:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO markers (page_hash, action_name, marker) VALUES (?, ?, ?)",
+                [(page_hash, action_name, data) for (page_hash, action_name), data in self._pending_markers.items()],
+            )
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO manual_markers (marker_id, marker) VALUES (?, ?)",
+                list(self._pending_manual_markers.items()),
+            )
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            raise
+        self._connection.execute("COMMIT")
+
+        self._pending_markers.clear()
+        self._pending_manual_markers.clear()
+
+    def close(self) -> None:
+        """Flush pending writes and close the database connection"""
+        with self._lock:
+            self._flush()
+            self._connection.close()
+
+    async def __aenter__(self) -> "SQLiteContextStore":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await asyncio.to_thread(self.close)
+
+    async def get_marker(self, page_state: str, action_name: str, marker_id: Optional[str] = None) -> Optional[Marker]:
+        """Get marker for a given page state and action"""
+        return await asyncio.to_thread(self._get_marker, page_state, action_name, marker_id)
+
+    def _get_marker(self, page_state: str, action_name: str, marker_id: Optional[str]) -> Optional[Marker]:
+        page_hash = self._process_page_state(page_state)
+        marker_data = None
+        found_under = None
+
+        with self._lock:
+            if marker_id:
+                marker_data = self._fetch_manual_marker_data(marker_id)
+
+            if not marker_data:  # not found so far, check the page state
+                marker_data = self._fetch_marker_data(page_hash, action_name)
+                if not marker_data:
+                    return None
+                found_under = page_hash
+
+                # store it for next time, since it was requested and not found
+                if marker_id:
+                    self._queue_writes({}, {marker_id: marker_data})
+
+        marker = marker_from_dict(json.loads(marker_data))
+        marker.page_key = found_under
+        return marker
+
+    async def store_marker(
+        self,
+        page_state: str,
+        action_name: str,
+        marker: Marker,
+        marker_id: Optional[str] = None,
+    ) -> None:
+        """Store marker for a given page state and action"""
+        await asyncio.to_thread(self._store_marker, page_state, action_name, marker, marker_id)
+
+    def _store_marker(self, page_state: str, action_name: str, marker: Marker, marker_id: Optional[str]) -> None:
+        page_hash = self._process_page_state(page_state)
+        marker_data = json.dumps(marker.to_dict())
+
+        with self._lock:
+            self._queue_writes({(page_hash, action_name): marker_data}, {marker_id: marker_data} if marker_id else {})
+
+    async def remove_marker(
+        self,
+        page_state: str,
+        action_name: str,
+        marker: Marker,
+        marker_id: Optional[str] = None,
+    ) -> None:
+        """Remove marker for a given page state and action if it matches the provided marker"""
+        await asyncio.to_thread(self._remove_marker, page_state, action_name, marker, marker_id)
+
+    def _remove_marker(self, page_state: str, action_name: str, marker: Marker, marker_id: Optional[str]) -> None:
+        page_hash = marker.page_key or self._process_page_state(page_state)
+
+        with self._lock:
+            self._flush()
+
+            marker_data = self._fetch_marker_data(page_hash, action_name)
+            if marker_data and marker_from_dict(json.loads(marker_data)) == marker:
+                self._connection.execute(
+                    "DELETE FROM markers WHERE page_hash = ? AND action_name = ?", (page_hash, action_name)
+                )
+
+            # like the page entry, the marker id entry is only removed if it stores this marker
+            marker_data = self._fetch_manual_marker_data(marker_id) if marker_id else None
+            if marker_data and marker_from_dict(json.loads(marker_data)) == marker:
+                self._connection.execute("DELETE FROM manual_markers WHERE marker_id = ?", (marker_id,))
+
+    def load_json(self, json_str: str) -> None:
+        """
+        Bulk load a `MemoryContextStore.to_json()` dump in a single transaction.
+
+        The dump has to be created with the same `fingerprint_mode` as this store.
+        """
+        data = json.loads(json_str)
+
+        with self._lock:
+            self._flush()
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO markers (page_hash, action_name, marker) VALUES (?, ?, ?)",
+                    (
+                        (page_hash, action_name, json.dumps(marker_data))
+                        for page_hash, actions in data["memory_store"].items()
+                        for action_name, marker_data in actions.items()
+                    ),
+                )
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO manual_markers (marker_id, marker) VALUES (?, ?)",
+                    (
+                        (marker_id, json.dumps(marker_data))
+                        for marker_id, marker_data in data["manual_id_store"].items()
+                    ),
+                )
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
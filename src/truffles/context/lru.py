@@ -0,0 +1,106 @@
+import json
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterator, Optional
+
+from truffles.context.stats import CacheStats
+
+
+class LRUStore:
+    """
+    Dictionary with optional entry, byte and age limits.
+
+    Entries are kept in least recently used order, so every operation including eviction is O(1). Expired
+    entries are dropped when they are accessed or reach the least recently used end.
+    """
+
+    def __init__(
+        self,
+        stats: CacheStats,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        ttl: Optional[float] = None,
+        on_evict: Optional[Callable[[str], None]] = None,
+    ):
+        self._data: OrderedDict = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._expires: Dict[str, float] = {}
+        self._bytes = 0
+
+        self._stats = stats
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._ttl = ttl
+        self._on_evict = on_evict
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def _expired(self, key: str) -> bool:
+        return self._ttl is not None and self._expires[key] <= time.monotonic()
+
+    def _discard(self, key: str) -> None:
+        del self._data[key]
+        self._bytes -= self._sizes.pop(key, 0)
+        self._expires.pop(key, None)
+
+    def _evict(self, key: str) -> None:
+        self._discard(key)
+        self._stats.evictions += 1
+        if self._on_evict is not None:
+            self._on_evict(key)
+
+    def get(self, key: str) -> Optional[Dict]:
+        if key not in self._data:
+            return None
+
+        if self._expired(key):
+            self._evict(key)
+            return None
+
+        self._data.move_to_end(key)
+        return self._data[key]
+
+    def set(self, key: str, value: Dict) -> None:
+        if key in self._data:
+            self._discard(key)
+
+        self._data[key] = value
+        if self._max_bytes is not None:
+            self._sizes[key] = len(key) + len(json.dumps(value))
+            self._bytes += self._sizes[key]
+        if self._ttl is not None:
+            self._expires[key] = time.monotonic() + self._ttl
+
+        # evict from the least recently used end, never the entry that was just set
+        while len(self._data) > 1:
+            oldest = next(iter(self._data))
+            if (
+                (self._max_entries is not None and len(self._data) > self._max_entries)
+                or (self._max_bytes is not None and self._bytes > self._max_bytes)
+                or self._expired(oldest)
+            ):
+                self._evict(oldest)
+            else:
+                break
+
+    def replace(self, key: str, value: Dict) -> None:
+        """Replace the value of an existing entry, keeping its expiry and its place in the LRU order"""
+        if key not in self._data:
+            return
+
+        self._data[key] = value
+        if self._max_bytes is not None:
+            size = len(key) + len(json.dumps(value))
+            self._bytes += size - self._sizes[key]
+            self._sizes[key] = size
+
+    def pop(self, key: str) -> None:
+        if key in self._data:
+            self._discard(key)
+
+    def to_dict(self) -> Dict[str, Dict]:
+        return dict(self._data)
@@ -1,11 +1,55 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Dict
+from typing import Dict, Optional
+
+from truffles.context.exceptions import ContextError
+
+# a cached list may shrink or grow by this factor before its marker is considered stale
+ITEM_COUNT_TOLERANCE = 4
+
+
+@dataclass
+class MarkerValidation:
+    """Shape of the list a marker located when it was detected, checked before a cached marker is reused"""
+
+    min_items: int
+    max_items: int
+    # tag and stable classes shared by most items, e.g. "li.product-card"
+    child_signature: Optional[str] = None
+
+    @classmethod
+    def from_list(
+        cls, item_count: int, child_signature: Optional[str], tolerance: int = ITEM_COUNT_TOLERANCE
+    ) -> "MarkerValidation":
+        return cls(
+            min_items=max(1, -(-item_count // tolerance)),
+            max_items=item_count * tolerance,
+            child_signature=child_signature,
+        )
+
+    def matches(self, item_count: int, child_signature: Optional[str]) -> bool:
+        """Whether a list with `item_count` items and `child_signature` still looks like the detected one"""
+        if not self.min_items <= item_count <= self.max_items:
+            return False
+        return self.child_signature is None or self.child_signature == child_signature
+
+    def to_dict(self) -> Dict:
+        return {"min_items": self.min_items, "max_items": self.max_items, "child_signature": self.child_signature}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "MarkerValidation":
+        return cls(
+            min_items=data["min_items"], max_items=data["max_items"], child_signature=data.get("child_signature")
+        )
 
 
 class Marker(ABC):
     """Abstract base class for markers that can be used to locate elements"""
 
+    # key of the page entry a context store found the marker under, e.g. a near-duplicate page, so that
+    # `remove_marker` evicts that entry. Not serialized and not compared.
+    page_key: Optional[str] = None
+
     @abstractmethod
     def to_dict(self) -> Dict:
         """Convert marker to dictionary for serialization"""
@@ -22,23 +66,36 @@ class Marker(ABC):
         pass
 
 
+def _validation_to_dict(validation: Optional[MarkerValidation]) -> Dict:
+    return {"validation": validation.to_dict()} if validation is not None else {}
+
+
+def _validation_from_dict(data: Dict) -> Optional[MarkerValidation]:
+    # markers stored before the validation was added have none
+    return MarkerValidation.from_dict(data["validation"]) if data.get("validation") else None
+
+
 @dataclass
 class SimpleMarker(Marker):
     """Simple marker that stores a single selector string"""
 
     selector: str
     selector_type: str = "css"  # can be "css" or "xpath"
+    validation: Optional[MarkerValidation] = None
 
     def to_dict(self) -> Dict:
         return {
             "type": "simple",
             "selector": self.selector,
             "selector_type": self.selector_type,
+            **_validation_to_dict(self.validation),
         }
 
     @classmethod
     def from_dict(cls, data: Dict) -> "SimpleMarker":
-        return cls(selector=data["selector"], selector_type=data["selector_type"])
+        return cls(
+            selector=data["selector"], selector_type=data["selector_type"], validation=_validation_from_dict(data)
+        )
 
     def get_selector(self) -> str:
         return self.selector
@@ -50,17 +107,21 @@ class AttributeMarker(Marker):
 
     attribute_dict: Dict[str, str]
     match_mode: str = "contains"  # can be "exact" or "contains"
+    validation: Optional[MarkerValidation] = None
 
     def to_dict(self) -> Dict:
         return {
             "type": "attribute",
             "attribute_dict": self.attribute_dict,
             "match_mode": self.match_mode,
+            **_validation_to_dict(self.validation),
         }
 
     @classmethod
     def from_dict(cls, data: Dict) -> "AttributeMarker":
-        return cls(attribute_dict=data["attribute_dict"], match_mode=data["match_mode"])
+        return cls(
+            attribute_dict=data["attribute_dict"], match_mode=data["match_mode"], validation=_validation_from_dict(data)
+        )
 
     def get_selector(self) -> str:
         if self.match_mode == "exact":
@@ -69,3 +130,14 @@ class AttributeMarker(Marker):
             return " and ".join([f'[{key}~="{value}"]' for key, value in self.attribute_dict.items()])
         else:
             raise ValueError(f"Invalid match mode: {self.match_mode}")
+
+
+def marker_from_dict(data: Dict) -> Marker:
+    """Create the appropriate marker type from its dictionary representation"""
+    marker_type = data["type"]
+    if marker_type == "simple":
+        return SimpleMarker.from_dict(data)
+    elif marker_type == "attribute":
+        return AttributeMarker.from_dict(data)
+    else:
+        raise ContextError(f"Unknown marker type: {marker_type}")
@@ -1,6 +1,7 @@
 from typing import Optional
 
 from truffles.context.base import ContextStore, Marker
+from truffles.tracing.tracer import Tracer
 
 
 class StoreManager:
@@ -23,7 +24,10 @@ class StoreManager:
     @classmethod
     async def get_marker(cls, page_state: str, action_name: str, marker_id: Optional[str] = None) -> Optional[Marker]:
         """Get selector from current store"""
-        return await cls.get_store().get_marker(page_state, action_name, marker_id)
+        with Tracer.span("context.get_marker", action=action_name) as span:
+            marker = await cls.get_store().get_marker(page_state, action_name, marker_id)
+            span.set_attribute("hit", marker is not None)
+        return marker
 
     @classmethod
     async def store_marker(
@@ -34,7 +38,8 @@ class StoreManager:
         marker_id: Optional[str] = None,
     ) -> None:
         """Store selector in current store"""
-        await cls.get_store().store_marker(page_state, action_name, marker, marker_id)
+        with Tracer.span("context.store_marker", action=action_name):
+            await cls.get_store().store_marker(page_state, action_name, marker, marker_id)
 
     @classmethod
     async def remove_marker(
@@ -0,0 +1,16 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class CacheStats:
+    """Counters to size a cache from data"""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
@@ -1,21 +1,83 @@
-from inspect import iscoroutinefunction
-from typing import Any, Dict, Type, TypeVar
+import functools
+from inspect import getattr_static, iscoroutinefunction, isfunction
+from typing import Any, Dict, FrozenSet, Optional, Type, TypeVar
 
 from truffles.core.tool_manager import ToolManager
+from truffles.tools import load_builtin_tools
 from truffles.tools.base import BaseTool
 
 T = TypeVar("T", bound=BaseTool)
 
 
+def _make_delegator(wrapped_type: Type, name: str, wrap: bool = True) -> Optional[Any]:
+    """
+    Class attribute forwarding `name` to the wrapped object and wrapping the result, None if the attribute of
+    `wrapped_type` is not a plain method or property. With `wrap=False` the result is returned as is.
+    """
+    attribute = getattr_static(wrapped_type, name, None)
+
+    if isinstance(attribute, property):
+
+        def getter(self):
+            return self._wrap_result(getattr(self._wrapped, name))
+
+        return property(getter, doc=attribute.__doc__)
+
+    if not isfunction(attribute):
+        return None
+
+    if iscoroutinefunction(attribute):
+        if wrap:
+
+            async def method(self, *args, **kwargs):
+                return self._wrap_result(await getattr(self._wrapped, name)(*args, **kwargs))
+
+        else:
+
+            async def method(self, *args, **kwargs):
+                return await getattr(self._wrapped, name)(*args, **kwargs)
+
+    elif wrap:
+
+        def method(self, *args, **kwargs):
+            return self._wrap_result(getattr(self._wrapped, name)(*args, **kwargs))
+
+    else:
+
+        def method(self, *args, **kwargs):
+            return getattr(self._wrapped, name)(*args, **kwargs)
+
+    return functools.wraps(attribute)(method)
+
+
 class Enhanced:
-    """Base class that provides registry and delegation capabilities to wrapped objects"""
+    """
+    Base class that provides registry and delegation capabilities to wrapped objects.
+
+    Methods and properties of the wrapped object are delegated through wrappers that are created on first access
+    and installed on the subclass, so a subclass should wrap a single type (or itself).
+    """
+
+    __slots__ = ("_wrapped", "_tools", "__weakref__")
 
     _tool_registry: Dict[Type, Dict[str, Type[BaseTool]]] = {}
 
+    # methods of the wrapped object that only return plain JSON data, their results are not wrapped
+    _plain_result_methods: FrozenSet[str] = frozenset()
+
+    # wrap returned collections in views that wrap their items on access, instead of copying them
+    lazy_collections: bool = False
+
     def __init__(self, wrapped_obj: Any):
         self._wrapped = wrapped_obj
-        # Create a tool manager specific to this instance's class
-        self.tools = ToolManager(self)
+        self._tools: Optional[ToolManager] = None
+
+    @property
+    def tools(self) -> ToolManager:
+        """Tool manager specific to this instance's class, created on first access"""
+        if self._tools is None:
+            self._tools = ToolManager(self)
+        return self._tools
 
     @classmethod
     def register_tool(cls, name: str):
@@ -43,23 +105,37 @@ class Enhanced:
 
     def __getattr__(self, name: str):
         """Delegate undefined attributes to wrapped object"""
-        output = getattr(self._wrapped, name)
+        if name in Enhanced.__slots__:
+            # unset slot, e.g. while copying, looking it up on the wrapped object would recurse
+            raise AttributeError(name)
+
+        wrapped = self._wrapped
+        if not isinstance(wrapped, Enhanced) and not name.startswith("__"):
+            delegator = _make_delegator(type(wrapped), name, wrap=name not in self._plain_result_methods)
+            if delegator is not None:
+                # later accesses find the delegator on the class and skip __getattr__
+                setattr(type(self), name, delegator)
+                return getattr(self, name)
+
+        output = getattr(wrapped, name)
+        if name in self._plain_result_methods:
+            return output
 
         if iscoroutinefunction(output):
 
-            async def wrapped(*args, **kwargs):
+            async def wrapped_call(*args, **kwargs):
                 result = await output(*args, **kwargs)
                 return self._wrap_result(result)
 
-            return wrapped
+            return wrapped_call
 
         elif callable(output):
 
-            def wrapped(*args, **kwargs):
+            def wrapped_call(*args, **kwargs):
                 result = output(*args, **kwargs)
                 return self._wrap_result(result)
 
-            return wrapped
+            return wrapped_call
 
         return self._wrap_result(output)
 
@@ -69,4 +145,5 @@ class Enhanced:
     @classmethod
     def get_tools(cls) -> Dict[str, Type[BaseTool]]:
         """Get all tools registered for this specific class"""
+        load_builtin_tools()
         return cls._tool_registry.get(cls, {})
@@ -2,44 +2,71 @@ from inspect import iscoroutinefunction
 from typing import TYPE_CHECKING
 from weakref import proxy
 
+from truffles.tracing.tracer import Tracer
+
 if TYPE_CHECKING:
     from truffles.core.enhanced import Enhanced
+    from truffles.tools.base import BaseTool
 
 
 class ToolManager:
     """Manages tool instances and execution for Enhanced objects"""
 
+    __slots__ = ("_enhanced", "_tool_instances", "_tool_wrappers")
+
     def __init__(self, enhanced_obj: "Enhanced"):
         self._enhanced = proxy(enhanced_obj)
         self._tool_instances = {}
+        self._tool_wrappers = {}
 
     def __getattr__(self, name: str):
         """Handle tool execution with different handling for sync/async tools"""
-        tools = self._enhanced.get_tools()
-
-        if name not in tools:
-            raise AttributeError(f"No tool named '{name}' registered for {self._enhanced.__class__.__name__}")
+        if name in ToolManager.__slots__:
+            raise AttributeError(name)
 
-        if name not in self._tool_instances:
-            tool_class = tools[name]
-            self._tool_instances[name] = tool_class(self._enhanced)
+        tool_wrapper = self._tool_wrappers.get(name)
+        if tool_wrapper is not None:
+            return tool_wrapper
 
-        tool_instance = self._tool_instances[name]
+        tool_instance = self.get_tool(name)
+        # the wrapper is cached on the manager, closing over the manager itself would make a reference cycle
+        enhanced = self._enhanced
 
         if iscoroutinefunction(tool_instance.execute):
 
             async def tool_wrapper(*args, **kwargs):
-                result = await tool_instance.execute(*args, **kwargs)
-                return self._enhanced._wrap_result(result)
+                with Tracer.span(f"tool.{name}", target=type(enhanced).__name__):
+                    result = await tool_instance.execute(*args, **kwargs)
+                return enhanced._wrap_result(result)
 
         else:
 
             def tool_wrapper(*args, **kwargs):
-                result = tool_instance.execute(*args, **kwargs)
-                return self._enhanced._wrap_result(result)
+                with Tracer.span(f"tool.{name}", target=type(enhanced).__name__):
+                    result = tool_instance.execute(*args, **kwargs)
+                return enhanced._wrap_result(result)
 
+        self._tool_wrappers[name] = tool_wrapper
         return tool_wrapper
 
+    def get_tool(self, name: str) -> "BaseTool":
+        """
+        Get the tool instance behind `name`, the one its calls run on.
+
+        Use it to read what a tool recorded about its last call, e.g.
+        `page.tools.get_tool("get_main_list").last_detection`.
+        """
+        tools = self._enhanced.get_tools()
+
+        if name not in tools:
+            raise AttributeError(f"No tool named '{name}' registered for {self._enhanced.__class__.__name__}")
+
+        if name not in self._tool_instances:
+            tool_class = tools[name]
+            self._tool_instances[name] = tool_class(self._enhanced)
+
+        return self._tool_instances[name]
+
     def __dir__(self) -> list:
         """List available tools"""
         return list(self._enhanced.get_tools().keys())
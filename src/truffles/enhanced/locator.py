@@ -7,6 +7,18 @@ from truffles.utils.wrap import wrap_collection
 
 
 class TLocator(Enhanced):
+    __slots__ = ()
+
+    _plain_result_methods = frozenset(
+        {
+            "all_inner_texts",
+            "all_text_contents",
+            "bounding_box",
+            "evaluate",
+            "evaluate_all",
+        }
+    )
+
     def __init__(self, locator: Union[Locator, "TLocator"]):
         assert isinstance(locator, Locator) or isinstance(
             locator, TLocator
@@ -17,7 +29,7 @@ class TLocator(Enhanced):
         if isinstance(result, Locator):
             return TLocator(result)
         elif isinstance(result, (list, tuple, set, dict)):
-            return wrap_collection(result)
+            return wrap_collection(result, lazy=self.lazy_collections)
         return result
 
     @property
@@ -8,6 +8,17 @@ from truffles.utils.wrap import wrap_collection
 
 
 class TPage(Enhanced):
+    __slots__ = ()
+
+    _plain_result_methods = frozenset(
+        {
+            "content",
+            "eval_on_selector",
+            "eval_on_selector_all",
+            "evaluate",
+        }
+    )
+
     def __init__(self, page: Union[Page, "TPage"]):
         assert isinstance(page, Page) or isinstance(page, TPage), "page must be a playwright Page or TPage"
         super().__init__(page)
@@ -18,5 +29,5 @@ class TPage(Enhanced):
         elif isinstance(result, Page):
             return TPage(result)
         elif isinstance(result, (list, tuple, set, dict)):
-            return wrap_collection(result)
+            return wrap_collection(result, lazy=self.lazy_collections)
         return result
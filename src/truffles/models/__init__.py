@@ -1,3 +1,4 @@
 from truffles.models.default_model import DefaultModel
+from truffles.models.scheduler import ModelScheduler, RateLimit
 
-__all__ = ["DefaultModel"]
+__all__ = ["DefaultModel", "ModelScheduler", "RateLimit"]
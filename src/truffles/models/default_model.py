@@ -1,8 +1,9 @@
-from typing import Optional
+import sys
+from typing import Dict, Optional, Tuple, Type
 
-from langchain_anthropic import ChatAnthropic
 from langchain_core.language_models import BaseLanguageModel
-from langchain_openai import ChatOpenAI
+from langchain_core.runnables import Runnable
+from pydantic import BaseModel
 
 # LangchainGoogleGenAI has a bug with the structured output (even the cursor autocomplete knows it)
 # from langchain_google_genai import ChatGoogleGenerativeAI
@@ -31,12 +32,37 @@ ANTHROPIC_MODELS = {
 # }
 
 
+def _is_provider_model(model: BaseLanguageModel, module_name: str, class_name: str) -> bool:
+    """
+    Whether `model` is an instance of the provider class, without importing the provider package: a model of a
+    provider can only exist once its package has been imported.
+    """
+    module = sys.modules.get(module_name)
+    return module is not None and isinstance(model, getattr(module, class_name))
+
+
 class DefaultModel:
     _default_model: Optional[BaseLanguageModel] = None
+    _size_overrides: Dict[str, BaseLanguageModel] = {}
+
+    # one client per size, so all calls share its connection pool
+    _specific_models: Dict[str, BaseLanguageModel] = {}
+    _structured_runnables: Dict[Tuple[Optional[str], Type[BaseModel]], Runnable] = {}
 
     @classmethod
-    def initialize(cls, model: BaseLanguageModel):
+    def initialize(cls, model: BaseLanguageModel, size_overrides: Optional[Dict[str, BaseLanguageModel]] = None):
+        """
+        Args:
+            model: The default model, its provider selects the models of the other sizes
+            size_overrides: Models to use for specific sizes instead of the provider defaults
+        """
+        if size_overrides and not set(size_overrides) <= set(MODEL_SIZES):
+            raise ValueError(f"Model size must be one of: {MODEL_SIZES}")
+
         cls._default_model = model
+        cls._size_overrides = dict(size_overrides or {})
+        cls._specific_models = {}
+        cls._structured_runnables = {}
 
     @classmethod
     def get_model(cls):
@@ -47,20 +73,36 @@ class DefaultModel:
     @classmethod
     def reset(cls):
         cls._default_model = None
+        cls._size_overrides = {}
+        cls._specific_models = {}
+        cls._structured_runnables = {}
 
     @classmethod
     def get_specific_model(cls, model_size: str = "standard"):
         if model_size not in MODEL_SIZES:
             raise ValueError(f"Model size must be one of: {MODEL_SIZES}")
 
+        if model_size in cls._size_overrides:
+            return cls._size_overrides[model_size]
+
+        if model_size not in cls._specific_models:
+            cls._specific_models[model_size] = cls._create_specific_model(model_size)
+        return cls._specific_models[model_size]
+
+    @classmethod
+    def _create_specific_model(cls, model_size: str) -> BaseLanguageModel:
         current_model = cls.get_model()
 
         # Detect if current model is Anthropic
-        if isinstance(current_model, ChatAnthropic):
+        if _is_provider_model(current_model, "langchain_anthropic", "ChatAnthropic"):
+            from langchain_anthropic import ChatAnthropic
+
             return ChatAnthropic(model=ANTHROPIC_MODELS[model_size])
 
         # Detect if current model is OpenAI
-        if isinstance(current_model, ChatOpenAI):
+        if _is_provider_model(current_model, "langchain_openai", "ChatOpenAI"):
+            from langchain_openai import ChatOpenAI
+
             return ChatOpenAI(model=OPENAI_MODELS[model_size])
 
         # # Detect if current model is Google
@@ -68,3 +110,24 @@ class DefaultModel:
         #     return ChatGoogleGenerativeAI(model=GOOGLE_MODELS[model_size])
 
         raise ValueError("Unsupported model type. Only OpenAI and Anthropic models are supported.")
+
+    @classmethod
+    def get_structured_model(
+        cls, schema: Type[BaseModel], model_size: Optional[str] = "standard"
+    ) -> Tuple[BaseLanguageModel, Runnable]:
+        """
+        Get the model of `model_size` and its structured output runnable for `schema`, retrying invalid output once.
+
+        The runnable is built once per schema class and size, `model_size=None` uses the default model.
+        """
+        model = cls.get_model() if model_size is None else cls.get_specific_model(model_size)
+
+        key = (model_size, schema)
+        if key not in cls._structured_runnables:
+            runnable = model.with_structured_output(schema, include_raw=False)  # set to True for debugging
+            cls._structured_runnables[key] = runnable.with_retry(
+                retry_if_exception_type=(ValueError,),
+                stop_after_attempt=2,
+                wait_exponential_jitter=True,
+            )
+        return model, cls._structured_runnables[key]
@@ -2,3 +2,9 @@ class LLMConfigError(Exception):
     """Exception raised for errors in the LLM configuration system."""
 
     pass
+
+
+class LLMQueueFullError(Exception):
+    """Exception raised when too many LLM calls are waiting for a rate limited model."""
+
+    pass
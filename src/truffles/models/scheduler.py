@@ -0,0 +1,286 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, replace
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from langchain_core.language_models import BaseLanguageModel
+from langchain_core.messages import BaseMessage
+from langchain_core.runnables import Runnable
+
+from truffles.models.exceptions import LLMQueueFullError
+from truffles.tracing.callbacks import TokenUsageCallback
+from truffles.tracing.tracer import Tracer
+
+# rough size of an image in the prompt, used for the token estimate
+IMAGE_TOKEN_ESTIMATE = 1000
+
+# pause of a model after a rate limit error without a retry-after header
+DEFAULT_RATE_LIMIT_PAUSE = 5.0
+
+
+@dataclass
+class RateLimit:
+    """Limits for the LLM calls to one provider or model"""
+
+    max_concurrency: Optional[int] = None
+    requests_per_minute: Optional[float] = None
+    tokens_per_minute: Optional[float] = None
+    # calls waiting for a slot beyond this raise LLMQueueFullError
+    max_queue_size: Optional[int] = None
+    # retries of calls that failed with a provider rate limit error, after pausing the model
+    max_rate_limit_retries: int = 2
+
+
+@dataclass
+class SchedulerStats:
+    """Queue and wait time metrics of one rate limited provider or model"""
+
+    queue_depth: int = 0
+    in_flight: int = 0
+    completed: int = 0
+    rejected: int = 0
+    rate_limited: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    @property
+    def mean_wait(self) -> float:
+        started = self.completed + self.in_flight
+        return self.total_wait / started if started else 0.0
+
+
+def estimate_message_tokens(messages: List[BaseMessage]) -> int:
+    """Cheap estimate of the prompt tokens, ~4 characters per token"""
+    tokens = 0
+    for message in messages:
+        content = message.content if isinstance(message.content, list) else [message.content]
+        for part in content:
+            if isinstance(part, str):
+                tokens += len(part) // 4
+            elif part.get("type") == "text":
+                tokens += len(part.get("text", "")) // 4
+            else:
+                tokens += IMAGE_TOKEN_ESTIMATE
+    return tokens
+
+
+class TokenBucket:
+    """Token bucket refilled continuously with `rate_per_minute`, waiters are served in order"""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self._level = self.capacity
+        self._updated = time.monotonic()
+        # created in the running loop, a bucket outlives the event loops of successive `asyncio.run()` calls
+        self._lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1) -> None:
+        amount = min(amount, self.capacity)  # larger requests would never fit
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop, self._lock = loop, asyncio.Lock()
+
+        async with self._lock:
+            self._refill()
+            while self._level < amount:
+                await asyncio.sleep((amount - self._level) / self.rate)
+                self._refill()
+            self._level -= amount
+
+
+class _Lane:
+    """Limits and metrics shared by all calls to one provider or model"""
+
+    def __init__(self, limit: RateLimit):
+        self.limit = limit
+        self.stats = SchedulerStats()
+        self.paused_until = 0.0
+        # created in the running loop, like the lock of `TokenBucket`
+        self.semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.requests = TokenBucket(limit.requests_per_minute) if limit.requests_per_minute else None
+        self.tokens = TokenBucket(limit.tokens_per_minute) if limit.tokens_per_minute else None
+
+    async def _wait_for_budget(self, tokens: int) -> None:
+        while self.paused_until > time.monotonic():
+            await asyncio.sleep(self.paused_until - time.monotonic())
+        if self.requests is not None:
+            await self.requests.acquire()
+        if self.tokens is not None and tokens:
+            await self.tokens.acquire(tokens)
+
+    def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self.semaphore = asyncio.Semaphore(self.limit.max_concurrency) if self.limit.max_concurrency else None
+
+    @asynccontextmanager
+    async def slot(self, tokens: int) -> AsyncIterator[None]:
+        self._bind_loop()
+        if self.limit.max_queue_size is not None and self.stats.queue_depth >= self.limit.max_queue_size:
+            self.stats.rejected += 1
+            raise LLMQueueFullError(f"More than {self.limit.max_queue_size} LLM calls are waiting")
+
+        semaphore = self.semaphore
+        queued_at = time.monotonic()
+        self.stats.queue_depth += 1
+        try:
+            if semaphore is not None:
+                await semaphore.acquire()
+            try:
+                await self._wait_for_budget(tokens)
+            except BaseException:
+                if semaphore is not None:
+                    semaphore.release()
+                raise
+        finally:
+            self.stats.queue_depth -= 1
+
+        wait = time.monotonic() - queued_at
+        self.stats.total_wait += wait
+        self.stats.max_wait = max(self.stats.max_wait, wait)
+        self.stats.in_flight += 1
+        try:
+            yield
+        finally:
+            self.stats.in_flight -= 1
+            self.stats.completed += 1
+            if semaphore is not None:
+                semaphore.release()
+
+    def pause(self, seconds: float) -> None:
+        self.stats.rate_limited += 1
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+def _rate_limit_pause(error: Exception) -> Optional[float]:
+    """Get the pause requested by a provider rate limit error, None for other errors"""
+    if type(error).__name__ != "RateLimitError" and getattr(error, "status_code", None) != 429:
+        return None
+
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(retry_after)
+    except (TypeError, ValueError):
+        return DEFAULT_RATE_LIMIT_PAUSE
+
+
+class ModelScheduler:
+    """
+    Shared scheduler for all LLM calls of the tools.
+
+    Calls are grouped by the most specific configured key: "<provider class>/<model name>", then
+    "<provider class>", then the default limit. Without `initialize()` calls are passed through unchanged.
+    """
+
+    _default_limit: Optional[RateLimit] = None
+    _limits: Dict[str, RateLimit] = {}
+    _lanes: Dict[str, _Lane] = {}
+
+    @classmethod
+    def initialize(cls, default_limit: Optional[RateLimit] = None, limits: Optional[Dict[str, RateLimit]] = None):
+        """
+        Args:
+            default_limit: Limit for models without a specific entry in `limits`
+            limits: Limits by provider class name (e.g. "ChatOpenAI") or "<provider class>/<model name>"
+                (e.g. "ChatOpenAI/gpt-4o-mini")
+        """
+        cls._default_limit = default_limit
+        cls._limits = dict(limits or {})
+        cls._lanes = {}
+
+    @classmethod
+    def reset(cls):
+        cls._default_limit = None
+        cls._limits = {}
+        cls._lanes = {}
+
+    @staticmethod
+    def model_key(model: BaseLanguageModel) -> str:
+        model_name = getattr(model, "model_name", None) or getattr(model, "model", None)
+        return f"{type(model).__name__}/{model_name}"
+
+    @classmethod
+    def _get_lane(cls, model: BaseLanguageModel) -> Optional[_Lane]:
+        model_key = cls.model_key(model)
+        for key in (model_key, type(model).__name__):
+            if key in cls._limits:
+                break
+        else:
+            if cls._default_limit is None:
+                return None
+            key = model_key
+
+        if key not in cls._lanes:
+            cls._lanes[key] = _Lane(cls._limits.get(key, cls._default_limit))
+        return cls._lanes[key]
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, SchedulerStats]:
+        """Get a snapshot of the metrics by limit key"""
+        return {key: replace(lane.stats) for key, lane in cls._lanes.items()}
+
+    @classmethod
+    async def ainvoke(
+        cls,
+        model: BaseLanguageModel,
+        runnable: Runnable,
+        messages: List[BaseMessage],
+        tokens: Optional[int] = None,
+    ) -> Any:
+        """
+        Invoke `runnable` (built from `model`) once the limits of `model` allow it.
+
+        Args:
+            model: The chat model the call goes to, selects the limits
+            runnable: The runnable to invoke, e.g. `model.with_structured_output(...)`
+            messages: Input of the runnable
+            tokens: Prompt tokens for the token limit, estimated from `messages` if not given
+        """
+        if not Tracer.enabled:
+            return await cls._ainvoke(model, runnable, messages, tokens)
+
+        usage = TokenUsageCallback()
+        with Tracer.span("llm.invoke", model=cls.model_key(model)) as span:
+            try:
+                return await cls._ainvoke(model, runnable, messages, tokens, config={"callbacks": [usage]})
+            finally:
+                span.set_attribute("input_tokens", usage.input_tokens)
+                span.set_attribute("output_tokens", usage.output_tokens)
+                span.set_attribute("total_tokens", usage.total_tokens)
+
+    @classmethod
+    async def _ainvoke(
+        cls,
+        model: BaseLanguageModel,
+        runnable: Runnable,
+        messages: List[BaseMessage],
+        tokens: Optional[int] = None,
+        config: Optional[Dict[str, Any]] = None,
+    ) -> Any:
+        lane = cls._get_lane(model)
+        if lane is None:
+            return await runnable.ainvoke(messages, config=config)
+
+        if tokens is None:
+            tokens = estimate_message_tokens(messages) if lane.tokens is not None else 0
+
+        for attempt in range(lane.limit.max_rate_limit_retries + 1):
+            async with lane.slot(tokens):
+                try:
+                    return await runnable.ainvoke(messages, config=config)
+                except Exception as e:
+                    pause = _rate_limit_pause(e)
+                    if pause is None or attempt == lane.limit.max_rate_limit_retries:
+                        raise
+                    lane.pause(pause)
@@ -1,3 +1,4 @@
+from truffles.tasks.browser_pool import BrowserPool
 from truffles.tasks.listing_task import ListingTask
 
-__all__ = ["ListingTask"]
+__all__ = ["BrowserPool", "ListingTask"]
@@ -0,0 +1,153 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from playwright.async_api import Browser, Page, Playwright, async_playwright
+
+
+class _PooledBrowser:
+    def __init__(self, browser: Browser):
+        self.browser = browser
+        self.active_contexts = 0
+        self.pages_served = 0
+        self.retired = False
+
+    @property
+    def healthy(self) -> bool:
+        return not self.retired and self.browser.is_connected()
+
+
+class BrowserPool:
+    """
+    Pool of playwright browsers that hands out pages in fresh browser contexts.
+
+    Browsers are launched on demand up to `max_browsers` and shared by up to `max_contexts_per_browser`
+    concurrent borrowers. A browser is retired after it served `max_pages_per_browser` pages or when it
+    disconnects, and closed once its last context is returned.
+
+    The pool belongs to the event loop it is first used in, use it as an async context manager to close it:
+
+        async with BrowserPool(max_browsers=2) as pool:
+            await asyncio.gather(*[ListingTask(url, Product, browser_pool=pool).run() for url in urls])
+    """
+
+    def __init__(
+        self,
+        max_browsers: int = 1,
+        max_contexts_per_browser: int = 8,
+        max_pages_per_browser: int = 100,
+        launch_options: Optional[Dict[str, Any]] = None,
+        context_options: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Args:
+            max_browsers: Maximum number of browsers in use (retired browsers finishing their pages not counted)
+            max_contexts_per_browser: Maximum number of pages borrowed from one browser at the same time
+            max_pages_per_browser: Number of pages after which a browser is recycled
+            launch_options: Keyword arguments for `chromium.launch()`
+            context_options: Keyword arguments for `browser.new_context()`
+        """
+        if min(max_browsers, max_contexts_per_browser, max_pages_per_browser) < 1:
+            raise ValueError("Pool limits must be at least 1")
+
+        self.max_browsers = max_browsers
+        self.max_contexts_per_browser = max_contexts_per_browser
+        self.max_pages_per_browser = max_pages_per_browser
+        self.launch_options = launch_options or {}
+        self.context_options = context_options or {}
+
+        self._playwright: Optional[Playwright] = None
+        self._browsers: List[_PooledBrowser] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._closed = False
+
+    async def __aenter__(self) -> "BrowserPool":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    def _bind_loop(self) -> None:
+        """Create the pool's asyncio primitives in the running loop, they cannot be used from another loop"""
+        loop = asyncio.get_running_loop()
+        if self._loop is None:
+            self._loop = loop
+            self._lock = asyncio.Lock()
+            self._slots = asyncio.Semaphore(self.max_browsers * self.max_contexts_per_browser)
+        elif self._loop is not loop:
+            raise RuntimeError("BrowserPool is bound to a different event loop, create one pool per loop")
+
+    @property
+    def launched_browsers(self) -> int:
+        return len(self._browsers)
+
+    async def _acquire_browser(self) -> _PooledBrowser:
+        async with self._lock:
+            if self._closed:
+                raise RuntimeError("BrowserPool is closed")
+
+            for pooled in list(self._browsers):
+                if not pooled.browser.is_connected():
+                    self._browsers.remove(pooled)
+
+            available = [
+                pooled
+                for pooled in self._browsers
+                if pooled.healthy and pooled.active_contexts < self.max_contexts_per_browser
+            ]
+            if available:
+                pooled = min(available, key=lambda b: b.active_contexts)
+            else:
+                # the slot semaphore guarantees there is room for another browser
+                if self._playwright is None:
+                    self._playwright = await async_playwright().start()
+                pooled = _PooledBrowser(await self._playwright.chromium.launch(**self.launch_options))
+                self._browsers.append(pooled)
+
+            pooled.active_contexts += 1
+            return pooled
+
+    async def _release_browser(self, pooled: _PooledBrowser) -> None:
+        pooled.active_contexts -= 1
+        pooled.pages_served += 1
+        if pooled.pages_served >= self.max_pages_per_browser:
+            pooled.retired = True
+
+        if (pooled.retired or not pooled.browser.is_connected()) and pooled.active_contexts == 0:
+            if pooled in self._browsers:
+                self._browsers.remove(pooled)
+            if pooled.browser.is_connected():
+                await pooled.browser.close()
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[Page]:
+        """Borrow a page in a new browser context, the context is closed when the block exits"""
+        if self._closed:
+            raise RuntimeError("BrowserPool is closed")
+        self._bind_loop()
+
+        async with self._slots:
+            pooled = await self._acquire_browser()
+            try:
+                context = await pooled.browser.new_context(**self.context_options)
+                try:
+                    yield await context.new_page()
+                finally:
+                    if pooled.browser.is_connected():
+                        await context.close()
+            finally:
+                await self._release_browser(pooled)
+
+    async def close(self) -> None:
+        """Close all browsers and stop playwright, borrowed pages become unusable"""
+        self._closed = True
+        browsers, self._browsers = self._browsers, []
+        for pooled in browsers:
+            if pooled.browser.is_connected():
+                await pooled.browser.close()
+
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
@@ -1,14 +1,35 @@
 import asyncio
-from typing import Any, Callable, Optional, Type
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, Type
 
 from pydantic import BaseModel
 
 from truffles.enhanced.page import TPage
+from truffles.tasks.browser_pool import BrowserPool
 from truffles.tasks.task import BaseTask
+from truffles.tools.structure_locator.structure_locator import LocatorToDictTool
+
+DEFAULT_MAX_CONCURRENCY = 8
 
 
 class ListingTask(BaseTask):
-    def __init__(self, page: str | TPage, schema: Type[BaseModel], pre_run: Optional[Callable] = None):
+    def __init__(
+        self,
+        page: str | TPage,
+        schema: Type[BaseModel],
+        pre_run: Optional[Callable] = None,
+        batch_size: Optional[int] = None,
+        browser_pool: Optional[BrowserPool] = None,
+    ):
+        """
+        Args:
+            page: URL or truffles page to extract the main list from
+            schema: Schema of a single list item
+            pre_run: Coroutine function that is awaited with the page before the list is detected
+            batch_size: If set, structure this many items per LLM call instead of one call per item
+            browser_pool: Pool to borrow the page from if `page` is a URL. Without a pool, every run launches its
+                own browser and closes it when done.
+        """
         super().__init__()
 
         assert isinstance(page, (str, TPage)), "page must be a string or a truffles TPage object"
@@ -17,28 +38,89 @@ class ListingTask(BaseTask):
         self.page = page if isinstance(page, TPage) else None
         self.schema = schema
         self.pre_run = pre_run
+        self.batch_size = batch_size
+        self.browser_pool = browser_pool
 
-    async def _initialize_page(self):
-        if self.page_url:
-            from playwright.async_api import async_playwright
+    @asynccontextmanager
+    async def _borrowed_page(self) -> AsyncIterator[None]:
+        """Borrow a page if needed, it is returned to the pool when the block exits"""
+        if not self.page_url:
+            yield
+            return
 
-            import truffles
+        import truffles
 
-            p = await async_playwright().start()
-            browser = await p.chromium.launch()
-            truffles_page = await truffles.wrap(await browser.new_page())
-            await truffles_page.goto(self.page_url)
-            self.page = truffles_page
+        async with AsyncExitStack() as stack:
+            pool = self.browser_pool or await stack.enter_async_context(BrowserPool())
+            page = await stack.enter_async_context(pool.page())
+            self.page = await truffles.wrap(page)
+            await self.page.goto(self.page_url)
+            try:
+                yield
+            finally:
+                self.page = None
 
     async def run(self, **kwargs) -> Any:
-        # Initialize page if needed
-        if self.page_url:
-            await self._initialize_page()
+        async with self._borrowed_page():
+            return await self._run_on_page()
 
-        if self.pre_run:
-            await self.pre_run(self.page)
+    async def _run_on_page(self) -> Any:
+        locators = await self._get_locators()
+
+        if self.batch_size:
+            return await LocatorToDictTool.execute_many(locators, self.schema, batch_size=self.batch_size)
 
-        locators = await self.page.tools.get_main_list()
         results = await asyncio.gather(*[loc.tools.to_structure(self.schema) for loc in locators])
 
         return results
+
+    async def stream(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY) -> AsyncIterator[Tuple[int, Any]]:
+        """
+        Yield `(index, result)` for every list item as soon as it is structured, in completion order.
+
+        Args:
+            max_concurrency: Maximum number of items (or batches if `batch_size` is set) structured at the same
+                time, further items are started as earlier ones finish
+
+        Work still in flight is cancelled when the consumer stops iterating.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        async with self._borrowed_page():
+            locators = await self._get_locators()
+
+            step = self.batch_size or 1
+            starts = iter(range(0, len(locators), step))
+            pending: Dict[asyncio.Task, int] = {}
+            try:
+                while True:
+                    while len(pending) < max_concurrency and (start := next(starts, None)) is not None:
+                        task = asyncio.ensure_future(self._structure_chunk(locators[start : start + step]))
+                        pending[task] = start
+
+                    if not pending:
+                        break
+
+                    done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        start = pending.pop(task)
+                        for offset, result in enumerate(task.result()):
+                            yield start + offset, result
+            finally:
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _get_locators(self) -> List:
+        if self.pre_run:
+            await self.pre_run(self.page)
+
+        # no list detected, there is nothing to structure
+        return await self.page.tools.get_main_list() or []
+
+    async def _structure_chunk(self, locators: List) -> List[Any]:
+        if self.batch_size:
+            return await LocatorToDictTool.execute_many(locators, self.schema, batch_size=self.batch_size)
+
+        return [await locators[0].tools.to_structure(self.schema)]
@@ -0,0 +1,15 @@
+import importlib
+from functools import lru_cache
+
+# modules of the tools that come with truffles, each registers its tool on an Enhanced class when imported
+BUILTIN_TOOL_MODULES = (
+    "truffles.tools.list_detector.list_detector",
+    "truffles.tools.structure_locator.structure_locator",
+)
+
+
+@lru_cache(maxsize=1)
+def load_builtin_tools() -> None:
+    """Register the built-in tools, they are imported on the first tool lookup instead of with the package"""
+    for module in BUILTIN_TOOL_MODULES:
+        importlib.import_module(module)
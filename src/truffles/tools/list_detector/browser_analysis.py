@@ -0,0 +1,420 @@
+from typing import Dict, List, Tuple
+
+from playwright.async_api import Frame, Page
+
+from truffles.context.fingerprint import VOLATILE_TOKEN, PageKey, page_key_from_html
+from truffles.tracing.tracer import Tracer
+
+
+def _with_volatile_token(script: str) -> str:
+    """Fill in `VOLATILE_TOKEN` as a regex literal, so the scripts drop the same tokens as the Python helpers"""
+    return script.replace("/__VOLATILE_TOKEN__/", f"/{VOLATILE_TOKEN.pattern}/")
+
+
+# Runs `find_candidate_elements`, `analyze_common_ancestors` and `count_tags_in_soup` inside the page.
+# Attributes are extracted like `get_attr_list` on a BeautifulSoup tree: multi-valued attributes are split,
+# numeric values are skipped and the document itself is the "[document]" root.
+# Returns `[attribute, common ancestor count, total count]` for every attribute of a common ancestor.
+ANALYZE_LIST_CANDIDATES_JS = """
+(identifiers) => {
+  const SKIPPED_TAGS = new Set(["script", "style"]);
+  const LIST_ATTRIBUTES = {
+    "*": ["class", "accesskey", "dropzone"],
+    a: ["rel", "rev"],
+    link: ["rel", "rev"],
+    td: ["headers"],
+    th: ["headers"],
+    form: ["accept-charset"],
+    object: ["archive"],
+    area: ["rel"],
+    icon: ["sizes"],
+    iframe: ["sandbox"],
+    output: ["for"],
+  };
+  const NUMBER = /^\\s*[+-]?\\d+(_\\d+)*\\s*$/;
+  const ELEMENT_NODE = 1, TEXT_NODE = 3, COMMENT_NODE = 8, DOCUMENT_NODE = 9;
+
+  const tagName = (node) => (node.nodeType === DOCUMENT_NODE ? "[document]" : node.localName.toLowerCase());
+
+  const attributeKeys = (node) => {
+    if (node.nodeType === DOCUMENT_NODE) return [JSON.stringify(["[document]"])];
+
+    const name = tagName(node);
+    const keys = [];
+    for (const attribute of node.attributes) {
+      const key = attribute.name.toLowerCase();
+      const isList = LIST_ATTRIBUTES["*"].includes(key) || (LIST_ATTRIBUTES[name] || []).includes(key);
+      const values = isList ? attribute.value.split(/\\s+/).filter(Boolean) : [attribute.value];
+      for (const value of values) {
+        if (!NUMBER.test(value)) keys.push(JSON.stringify([key, value]));
+      }
+    }
+    keys.push(JSON.stringify([name]));
+    return keys;
+  };
+
+  // depth first walk, `visit` returns false to skip the subtree of an element
+  const walk = (root, visit) => {
+    const stack = [root];
+    while (stack.length) {
+      const node = stack.pop();
+      if (visit(node) === false) continue;
+      for (let i = node.childNodes.length - 1; i >= 0; i--) stack.push(node.childNodes[i]);
+    }
+  };
+
+  // candidate strings, like `find_elements_with_text` for all identifiers at once
+  const needles = identifiers.map((identifier) => identifier.toLowerCase());
+  const candidates = [];
+  walk(document, (node) => {
+    if (node.nodeType === TEXT_NODE || node.nodeType === COMMENT_NODE) {
+      const parent = node.parentNode;
+      if (parent && parent.nodeType === ELEMENT_NODE && SKIPPED_TAGS.has(tagName(parent))) return;
+      const text = node.data.toLowerCase();
+      if (needles.some((needle) => text.includes(needle))) candidates.push(node);
+    }
+  });
+
+  // number of ordered candidate pairs whose lowest common ancestor is a node:
+  // (candidates in its subtree)^2 - sum over children of (candidates in the child subtree)^2
+  const subtreeCounts = new Map();
+  for (const candidate of candidates) {
+    for (let node = candidate; node; node = node.parentNode) {
+      subtreeCounts.set(node, (subtreeCounts.get(node) || 0) + 1);
+    }
+  }
+  const childSquares = new Map();
+  for (const [node, count] of subtreeCounts) {
+    if (node.parentNode) childSquares.set(node.parentNode, (childSquares.get(node.parentNode) || 0) + count * count);
+  }
+
+  const ancestorCounts = new Map();
+  for (const [node, count] of subtreeCounts) {
+    if (node.nodeType !== ELEMENT_NODE && node.nodeType !== DOCUMENT_NODE) continue;
+    const pairs = count * count - (childSquares.get(node) || 0);
+    if (pairs <= 0) continue;
+    for (const key of attributeKeys(node)) ancestorCounts.set(key, (ancestorCounts.get(key) || 0) + pairs);
+  }
+
+  // like `count_tags_in_soup`, only for the attributes found above
+  const totalCounts = new Map();
+  walk(document, (node) => {
+    if (node.nodeType !== ELEMENT_NODE && node.nodeType !== DOCUMENT_NODE) return false;
+    if (SKIPPED_TAGS.has(tagName(node))) return false;
+    for (const key of attributeKeys(node)) {
+      if (ancestorCounts.has(key)) totalCounts.set(key, (totalCounts.get(key) || 0) + 1);
+    }
+  });
+
+  return [...ancestorCounts].map(([key, count]) => [JSON.parse(key), count, totalCounts.get(key) || 0]);
+}
+"""
+
+
+async def score_frame_in_browser(frame: Frame, identifiers: List[str]) -> Dict[Tuple, float]:
+    """
+    Score the common ancestor attributes of the elements containing `identifiers` inside the frame.
+
+    Equivalent to `calculate_normalized_counts` over the BeautifulSoup analysis of the frame content, without
+    transferring and parsing the frame HTML.
+    """
+    with Tracer.span("page.evaluate", purpose="list_candidates"):
+        scored = await frame.evaluate(ANALYZE_LIST_CANDIDATES_JS, identifiers)
+    return {tuple(attribute): count / total for attribute, count, total in scored if total > 0}
+
+
+# Scores every element with at least `minItems` element children as a list wrapper. The children are grouped
+# by tag and stable classes, the largest group are the items. Groups are scored by the structural similarity
+# of the items, their count, the visible area they cover and their text length.
+# Returns the best wrapper with its rarest stable id/class, a CSS path to it and the scores.
+SCORE_REPEATING_GROUPS_JS = _with_volatile_token("""
+({ minItems, shapeDepth }) => {
+  const SKIPPED_TAGS = new Set(["script", "style", "noscript", "template", "svg", "head", "link", "meta"]);
+  // `truffles.context.fingerprint.VOLATILE_TOKEN`, generated ids and hashes change between page loads
+  const VOLATILE = /__VOLATILE_TOKEN__/;
+  const CSS_IDENTIFIER = /^[A-Za-z_][\\w-]*$/;
+
+  const stable = (token) => !VOLATILE.test(token);
+  const classes = (el) => (el.getAttribute("class") || "").split(/\\s+/).filter(Boolean);
+  const elementChildren = (el) => Array.from(el.children).filter((child) => !SKIPPED_TAGS.has(child.localName));
+  const signature = (el) => [el.localName, ...classes(el).filter(stable).sort()].join(".");
+
+  // signatures of the descendants down to `shapeDepth`, the structure items are compared by
+  const shape = (el) => {
+    const bag = new Map();
+    const stack = [[el, 0]];
+    while (stack.length) {
+      const [node, depth] = stack.pop();
+      for (const child of elementChildren(node)) {
+        const key = signature(child);
+        bag.set(key, (bag.get(key) || 0) + 1);
+        if (depth + 1 < shapeDepth) stack.push([child, depth + 1]);
+      }
+    }
+    return bag;
+  };
+
+  // weighted Jaccard similarity of two signature bags
+  const bagSimilarity = (a, b) => {
+    let intersection = 0, union = 0;
+    for (const key of new Set([...a.keys(), ...b.keys()])) {
+      const x = a.get(key) || 0, y = b.get(key) || 0;
+      intersection += Math.min(x, y);
+      union += Math.max(x, y);
+    }
+    return union ? intersection / union : 1;
+  };
+
+  const root = document.documentElement;
+  const pageArea = Math.max(1, root.scrollWidth * root.scrollHeight);
+
+  const scoreGroup = (wrapper, children) => {
+    const groups = new Map();
+    for (const child of children) {
+      const key = signature(child);
+      if (!groups.has(key)) groups.set(key, []);
+      groups.get(key).push(child);
+    }
+    const items = [...groups.values()].reduce((a, b) => (b.length > a.length ? b : a));
+    if (items.length < minItems) return null;
+
+    const reference = shape(items[Math.floor(items.length / 2)]);
+    let similarity = 0, area = 0, text = 0;
+    for (const item of items) {
+      similarity += bagSimilarity(reference, shape(item));
+      const rect = item.getBoundingClientRect();
+      area += rect.width * rect.height;
+      text += (item.textContent || "").trim().length;
+    }
+    // structural similarity of the items, discounted by the children that are not items
+    similarity /= children.length;
+
+    const areaShare = Math.min(1, area / pageArea);
+    const meanText = text / items.length;
+    const textFactor = 0.25 + 0.75 * Math.min(1, meanText / 40);
+    return {
+      wrapper,
+      count: items.length,
+      similarity,
+      areaShare,
+      meanText,
+      score: similarity * textFactor * Math.log2(items.length + 1) * Math.sqrt(areaShare),
+      quality: similarity * textFactor * Math.min(1, (items.length - 1) / 5) * Math.min(1, areaShare / 0.2),
+    };
+  };
+
+  // ids and classes of every element the marker selector can match, including the skipped ones (e.g. svg) and
+  // open shadow roots, which Playwright's CSS engine pierces. The inert content of templates is never matched.
+  const tokenCounts = new Map();
+  const countToken = (key) => tokenCounts.set(key, (tokenCounts.get(key) || 0) + 1);
+  const countTokens = (scope) => {
+    for (const el of scope.querySelectorAll("*")) {
+      for (const token of classes(el)) countToken("class " + token);
+      if (el.getAttribute("id")) countToken("id " + el.getAttribute("id"));
+      if (el.shadowRoot) countTokens(el.shadowRoot);
+    }
+  };
+  countTokens(document);
+
+  let best = null, secondScore = 0;
+  const stack = [document.body || root];
+  while (stack.length) {
+    const el = stack.pop();
+    const children = elementChildren(el);
+    for (const child of children) stack.push(child);
+    if (children.length < minItems) continue;
+
+    const candidate = scoreGroup(el, children);
+    if (!candidate) continue;
+    if (!best || candidate.score > best.score) {
+      secondScore = best ? best.score : 0;
+      best = candidate;
+    } else if (candidate.score > secondScore) {
+      secondScore = candidate.score;
+    }
+  }
+  if (!best || best.score <= 0) return null;
+
+  const wrapper = best.wrapper;
+  const uniqueId = (el) => {
+    const id = el.getAttribute("id");
+    return id && stable(id) && CSS_IDENTIFIER.test(id) && tokenCounts.get("id " + id) === 1 ? id : null;
+  };
+
+  let attribute = null;
+  if (uniqueId(wrapper)) {
+    attribute = ["id", uniqueId(wrapper)];
+  } else {
+    const unique = classes(wrapper).filter((token) => stable(token) && tokenCounts.get("class " + token) === 1);
+    if (unique.length) attribute = ["class", unique[0]];
+  }
+
+  const path = [];
+  for (let node = wrapper; node && node !== root; node = node.parentElement) {
+    if (uniqueId(node)) {
+      path.unshift("#" + uniqueId(node));
+      break;
+    }
+    path.unshift(`${node.localName}:nth-child(${Array.from(node.parentElement.children).indexOf(node) + 1})`);
+  }
+  // the path is empty if the wrapper is the root itself
+  if (!path.length || !path[0].startsWith("#")) path.unshift("html");
+
+  return {
+    attribute,
+    path: path.join(" > "),
+    count: best.count,
+    similarity: best.similarity,
+    areaShare: best.areaShare,
+    meanText: best.meanText,
+    // clear winners are more trustworthy than a close race between unrelated lists
+    confidence: best.quality * (1 - 0.5 * (secondScore / best.score)),
+  };
+}
+""")
+
+
+# Counts the children of every wrapper and finds the signature shared by most of them, the tag and stable classes
+# like in `SCORE_REPEATING_GROUPS_JS`. Used to build the items of a marker and to validate a cached marker in a
+# single evaluation.
+# Returns `{counts: [children per wrapper], signature: most common child signature or null}`.
+WRAPPER_CHILDREN_JS = _with_volatile_token("""
+(wrappers) => {
+  const VOLATILE = /__VOLATILE_TOKEN__/;
+  const signature = (el) => {
+    const classes = (el.getAttribute("class") || "").split(/\\s+/).filter((token) => token && !VOLATILE.test(token));
+    return [el.localName, ...classes.sort()].join(".");
+  };
+
+  const counts = [];
+  const signatures = new Map();
+  for (const wrapper of wrappers) {
+    counts.push(wrapper.children.length);
+    for (const child of wrapper.children) {
+      const key = signature(child);
+      signatures.set(key, (signatures.get(key) || 0) + 1);
+    }
+  }
+
+  let best = null, bestCount = 0;
+  for (const [key, count] of signatures) {
+    if (count > bestCount) {
+      best = key;
+      bestCount = count;
+    }
+  }
+  return { counts, signature: best };
+}
+""")
+
+
+# Computes the page key of `truffles.context.fingerprint.page_key_from_html` for the serialized document inside
+# the page: the sha256 of the outerHTML ("exact") or of the DOM skeleton ("structural"), and the skeleton SimHash.
+# The skeleton follows `page_skeleton`, walking the DOM instead of parsing its serialization.
+# Returns `{key, simhash}` with the SimHash as a decimal string, or `{html: outerHTML}` without `crypto.subtle`,
+# which only exists in secure contexts.
+PAGE_KEY_JS = _with_volatile_token("""
+async ({ mode, withSimhash }) => {
+  const root = document.documentElement;
+  const subtle = globalThis.crypto && globalThis.crypto.subtle;
+  if (!subtle) return { html: root.outerHTML };
+
+  const IGNORED_ELEMENTS = new Set(["script", "style", "noscript", "link", "meta"]);
+  const VALUE_ATTRIBUTES = new Set(["role", "type"]);
+  const VOLATILE_TOKEN = /__VOLATILE_TOKEN__/;
+
+  const encoder = new TextEncoder();
+  const sha256 = (text) => subtle.digest("SHA-256", encoder.encode(text));
+  const hex = (buffer) => Array.from(new Uint8Array(buffer), (byte) => byte.toString(16).padStart(2, "0")).join("");
+  const isStable = (token) => Boolean(token) && !VOLATILE_TOKEN.test(token.toLowerCase());
+
+  const elementToken = (el, tag, path) => {
+    const classes = new Set();
+    const attributeNames = new Set();
+    let elementId = "";
+    for (const attribute of el.attributes) {
+      const key = attribute.name.toLowerCase();
+      const value = attribute.value;
+      if (key === "class") {
+        for (const token of value.split(/\\s+/)) if (isStable(token)) classes.add(token);
+      } else if (key === "id") {
+        elementId = isStable(value) ? value : "";
+      } else if (VALUE_ATTRIBUTES.has(key) && isStable(value)) {
+        attributeNames.add(`${key}=${value}`);
+      } else {
+        attributeNames.add(key);
+      }
+    }
+
+    let signature = tag + [...classes].sort().map((token) => "." + token).join("");
+    if (elementId) signature += "#" + elementId;
+    if (attributeNames.size) signature += `[${[...attributeNames].sort().join(",")}]`;
+    return `${path}|${signature}`;
+  };
+
+  // one token per element, its path of ancestor tags and its normalized attributes
+  const skeleton = () => {
+    const tokens = new Set();
+    const stack = [[root, ""]];
+    while (stack.length) {
+      const [el, path] = stack.pop();
+      const tag = el.localName.toLowerCase();
+      if (!IGNORED_ELEMENTS.has(tag)) tokens.add(elementToken(el, tag, path));
+      // like `page_skeleton`, also when scripting is disabled and <noscript> has element children
+      if (tag === "noscript") continue;
+
+      const childPath = path ? `${path}/${tag}` : tag;
+      // the serialization includes the content of templates
+      const children = tag === "template" && el.content ? el.content.children : el.children;
+      for (const child of children) stack.push([child, childPath]);
+    }
+    return [...tokens].sort();
+  };
+
+  // 64 bit SimHash over the first 8 bytes of the sha256 of every token, as two 32 bit halves
+  const simhash = async (tokens) => {
+    const weights = new Array(64).fill(0);
+    for (const digest of await Promise.all(tokens.map(sha256))) {
+      const view = new DataView(digest);
+      const high = view.getUint32(0), low = view.getUint32(4);
+      for (let bit = 0; bit < 32; bit++) {
+        weights[bit] += (low >>> bit) & 1 ? 1 : -1;
+        weights[bit + 32] += (high >>> bit) & 1 ? 1 : -1;
+      }
+    }
+    let value = 0n;
+    weights.forEach((weight, bit) => {
+      if (weight > 0) value |= 1n << BigInt(bit);
+    });
+    return value.toString();
+  };
+
+  const tokens = mode === "structural" || withSimhash ? skeleton() : null;
+  const key = hex(await sha256(mode === "structural" ? tokens.join("\\n") : root.outerHTML));
+  return { key, simhash: withSimhash ? await simhash(tokens) : null };
+}
+""")
+
+
+async def compute_page_key(page: Page, fingerprint_mode: str = "exact", with_simhash: bool = False) -> PageKey:
+    """
+    Compute the page key for a context store inside the page, only the short key is transferred.
+
+    Falls back to transferring the outerHTML and computing the key in Python if the page has no `crypto.subtle`
+    (non-secure contexts, e.g. plain http).
+
+    Args:
+        page: The page to compute the key of
+        fingerprint_mode: The `fingerprint_mode` of the store the key is used with
+        with_simhash: Also compute the skeleton SimHash, for stores with near-duplicate matching
+    """
+    with Tracer.span("page.evaluate", purpose="page_state") as span:
+        result = await page.evaluate(PAGE_KEY_JS, {"mode": fingerprint_mode, "withSimhash": with_simhash})
+        span.set_attribute("in_browser", "key" in result)
+        span.set_attribute("bytes", len(result["html"]) if "html" in result else len(result["key"]))
+
+    if "html" in result:
+        return page_key_from_html(result["html"], fingerprint_mode, with_simhash)
+
+    page_simhash = int(result["simhash"]) if result["simhash"] is not None else None
+    return PageKey(result["key"], fingerprint_mode, page_simhash)
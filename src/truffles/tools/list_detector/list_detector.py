@@ -1,7 +1,10 @@
-from typing import List, Optional
+import time
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional, Tuple
 
 from playwright.async_api import Locator, Page
 
+from truffles.context.marker import Marker, MarkerValidation
 from truffles.context.state import StoreManager
 from truffles.enhanced.locator import TLocator
 
@@ -9,10 +12,43 @@ from truffles.enhanced.locator import TLocator
 # from ...t_locator import TLocator
 from truffles.enhanced.page import TPage
 from truffles.tools.base import BaseTool
-from truffles.tools.list_detector.strategies.llm_strategy import LLMStrategy
+from truffles.tools.list_detector.browser_analysis import WRAPPER_CHILDREN_JS, compute_page_key
+from truffles.tools.list_detector.screenshot import ScreenshotConfig, ScreenshotStats
+from truffles.tools.list_detector.strategies.statistical_strategy import StatisticalStrategy
+from truffles.tracing.tracer import Tracer
 
 ALLOWED_MATCH_MODES = ("exact", "contains")
 
+# stages of the "cascade" strategy, from the cheapest to the most expensive
+CASCADE_STAGES = ("cache", "statistical", "llm")
+
+# statistical detections below this confidence are escalated to the LLM in the "cascade" strategy
+DEFAULT_CONFIDENCE_THRESHOLD = 0.6
+
+
+@dataclass
+class DetectionRecord:
+    """The stage that produced the marker of a detection and the time until then"""
+
+    stage: str
+    seconds: float
+    confidence: Optional[float] = None
+
+
+@dataclass
+class StageStats:
+    """How often a detection stage ran and produced the marker, and the time spent in it"""
+
+    attempts: int = 0
+    accepted: int = 0
+    # cached markers evicted because their list no longer matched the validation stats
+    rejected: int = 0
+    total_seconds: float = 0.0
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.total_seconds / self.attempts if self.attempts else 0.0
+
 
 @TPage.register_tool("get_main_list")
 class ListDetector(BaseTool):
@@ -20,32 +56,45 @@ class ListDetector(BaseTool):
     Main list detection tool that uses language models and caching to efficiently detect lists.
     """
 
+    # per stage metrics of all detections, see `get_stage_stats()`
+    _stage_stats: Dict[str, StageStats] = {}
+
     def __init__(self, page: Page):
         super().__init__()
         self.page = page
-
-    async def _get_list_by_item(
+        # size and timing of the screenshot sent with the last LLM detection
+        self.last_screenshot_stats: Optional[ScreenshotStats] = None
+        # confidence of the last statistical detection
+        self.last_confidence: Optional[float] = None
+        # stage and latency of the last `execute()` that found a marker, read it with
+        # `page.tools.get_tool("get_main_list").last_detection`
+        self.last_detection: Optional[DetectionRecord] = None
+
+    @classmethod
+    def get_stage_stats(cls) -> Dict[str, StageStats]:
+        """Get a snapshot of the metrics by stage ("cache", "statistical" or "llm")"""
+        return {stage: replace(stats) for stage, stats in cls._stage_stats.items()}
+
+    @classmethod
+    def reset_stage_stats(cls) -> None:
+        cls._stage_stats = {}
+
+    def _record_stage(self, stage: str, started: float) -> StageStats:
+        stats = self._stage_stats.setdefault(stage, StageStats())
+        stats.attempts += 1
+        stats.total_seconds += time.perf_counter() - started
+        return stats
+
+    def _get_item_locator(
         self,
         item_selector: Optional[str] = None,
         item_attribute: Optional[dict] = None,
-        match_mode: str = "contains",  # Can be 'exact', 'contains', 'key_only', or 'value_only'
-    ) -> List[TLocator]:
+        match_mode: str = "contains",
+    ) -> TLocator:
         """
-        Get list of items by item selector or attribute.
+        Get a single locator matching all items by item selector or attribute.
 
-        Args:
-            item_selector: XPath or CSS selector string to find items
-            item_attribute: Dictionary of attributes to match elements
-            match_mode: How to match attributes:
-                - 'exact': Match both key and value (default)
-                - 'key_only': Match elements that have the specified keys, regardless of value
-                - 'value_only': Match elements that have the specified values, regardless of key
-
-        Returns:
-            List of TLocator objects representing the found items
-
-        Raises:
-            ValueError: If neither item_selector nor item_attribute is provided, or if both are provided
+        See `_get_list_by_item` for the arguments.
         """
 
         # Input validation
@@ -56,8 +105,7 @@ class ListDetector(BaseTool):
 
         # Handle item_selector case
         if item_selector:
-            elements = await self.page.locator(item_selector).all()
-            return elements
+            return self.page.locator(item_selector)
 
         # Handle item_attribute case
         if match_mode not in ALLOWED_MATCH_MODES:
@@ -68,8 +116,33 @@ class ListDetector(BaseTool):
         else:
             attribute_selector = " and ".join([f'[{key}~="{value}"]' for key, value in item_attribute.items()])
 
-        elements = await self.locator(f"*{attribute_selector}")
-        return elements
+        return self.page.locator(f"*{attribute_selector}")
+
+    async def _get_list_by_item(
+        self,
+        item_selector: Optional[str] = None,
+        item_attribute: Optional[dict] = None,
+        match_mode: str = "contains",  # Can be 'exact', 'contains', 'key_only', or 'value_only'
+    ) -> List[TLocator]:
+        """
+        Get list of items by item selector or attribute.
+
+        Args:
+            item_selector: XPath or CSS selector string to find items
+            item_attribute: Dictionary of attributes to match elements
+            match_mode: How to match attributes:
+                - 'exact': Match both key and value (default)
+                - 'key_only': Match elements that have the specified keys, regardless of value
+                - 'value_only': Match elements that have the specified values, regardless of key
+
+        Returns:
+            List of TLocator objects representing the found items
+
+        Raises:
+            ValueError: If neither item_selector nor item_attribute is provided, or if both are provided
+        """
+
+        return await self._get_item_locator(item_selector, item_attribute, match_mode).all()
 
     async def _get_list_by_wrapper(
         self,
@@ -80,6 +153,9 @@ class ListDetector(BaseTool):
         """
         Get list of items that are children of wrapper elements.
 
+        The children of all wrappers are counted in a single evaluation, the items are `nth()` locators
+        which do not need another round trip to the browser.
+
         Args:
             wrapper_selector: CSS/XPath selector for wrapper elements
             wrapper_attribute: Dictionary of attributes to match wrapper elements
@@ -94,47 +170,115 @@ class ListDetector(BaseTool):
                       when AI assistance is not enabled
         """
 
-        wrappers = await self._get_list_by_item(
+        wrappers = self._get_item_locator(
             item_selector=wrapper_selector,
             item_attribute=wrapper_attribute,
             match_mode=match_mode,
         )
 
+        all_children, _ = await self._get_wrapper_children(wrappers)
+        return all_children  # could use combine_locator_list to combine
+
+    async def _get_wrapper_children(self, wrappers: TLocator) -> Tuple[List[TLocator], Optional[str]]:
+        """The children of all wrappers and the tag and stable classes shared by most of them"""
+        with Tracer.span("page.evaluate", purpose="child_counts"):
+            children_info = await wrappers.evaluate_all(WRAPPER_CHILDREN_JS)
+
         all_children = []
-        for wrapper in wrappers:
-            children = await wrapper.locator(":scope > *").all()
-            all_children.extend(children)
+        for wrapper_index, child_count in enumerate(children_info["counts"]):
+            children = wrappers.nth(wrapper_index).locator(":scope > *")
+            all_children.extend(children.nth(child_index) for child_index in range(child_count))
 
-        return all_children  # could use combine_locator_list to combine
+        return all_children, children_info["signature"]
+
+    async def _get_marker_list(self, marker: Marker) -> Tuple[List[TLocator], Optional[str]]:
+        """The items of the list located by `marker` and their child signature"""
+        return await self._get_wrapper_children(self._get_item_locator(item_selector=marker.get_selector()))
 
     async def execute(
         self,
         strategy: str = "llm",
         force_detect: bool = False,
         marker_id: Optional[str] = None,
+        analysis_engine: str = "soup",
+        screenshot_config: Optional[ScreenshotConfig] = None,
+        confidence_threshold: float = DEFAULT_CONFIDENCE_THRESHOLD,
         **kwargs,
     ) -> Optional[List[Locator]]:
+        """
+        Detect the main list of the page and return its items.
+
+        Args:
+            strategy: "llm", "statistical", or "cascade" to use the statistical detection and only fall back to
+                the LLM if its confidence is below `confidence_threshold` or its list has no items
+            force_detect: Skip the cached marker. Without it a cached marker is still evicted and the list detected
+                again if its items no longer match the count range and child signature recorded at detection.
+            marker_id: Additional key to store and look up the marker by
+            analysis_engine: Where the LLM strategy analyzes the page, see `LLMStrategy`
+            screenshot_config: Screenshot settings of the LLM strategy
+            confidence_threshold: Minimum confidence of a statistical detection in the "cascade" strategy
+        """
         # TODO: make this nice and extensible
-        detection_strategies = ["basic", "statistical", "llm"]
+        detection_strategies = ["basic", "statistical", "llm", "cascade"]
         if strategy not in detection_strategies:
             raise ValueError(f"Invalid strategy '{strategy}'. Must be one of: {detection_strategies}")
 
-        page_state = await self.page.evaluate("document.documentElement.outerHTML")
+        started = time.perf_counter()
+        self.last_detection = None
+        # only the key of the page state is transferred, not the whole document
+        store = StoreManager.get_store()
+        page_state = await compute_page_key(
+            self.page, store.fingerprint_mode, with_simhash=store.near_duplicate_matching
+        )
 
         # try to get cached result first
         if not force_detect:
             cached_marker = await StoreManager.get_marker(
                 page_state=page_state, action_name="list_detector", marker_id=marker_id
             )
+            cache_stats = self._record_stage("cache", started)
 
             if cached_marker:
-                return await self._get_list_by_wrapper(wrapper_selector=cached_marker.get_selector())
+                items, child_signature = await self._get_marker_list(cached_marker)
+                validation = cached_marker.validation
+                if validation is None or validation.matches(len(items), child_signature):
+                    cache_stats.accepted += 1
+                    self.last_detection = DetectionRecord("cache", time.perf_counter() - started)
+                    return items
+
+                # the layout changed since the marker was detected, evict it and detect the list again
+                cache_stats.rejected += 1
+                await StoreManager.remove_marker(
+                    page_state=page_state, action_name="list_detector", marker=cached_marker, marker_id=marker_id
+                )
 
         # Detect lists using requested strategy
-        marker = await self._detect_list(strategy)
+        if strategy == "cascade":
+            # a statistical marker whose items cannot be found counts as a failed detection
+            marker, items_locator, child_signature = await self._detect_items("statistical")
+            if not items_locator or self.last_confidence < confidence_threshold:
+                statistical = marker, items_locator, child_signature, self.last_detection
+                marker, items_locator, child_signature = await self._detect_items(
+                    "llm", analysis_engine=analysis_engine, screenshot_config=screenshot_config
+                )
+                # an uncertain statistical list is still better than none
+                if not items_locator and statistical[1]:
+                    marker, items_locator, child_signature, self.last_detection = statistical
+        else:
+            marker, items_locator, child_signature = await self._detect_items(
+                strategy, analysis_engine=analysis_engine, screenshot_config=screenshot_config
+            )
         if not marker:
+            self.last_detection = None
             return None
+        self.last_detection.seconds = time.perf_counter() - started
 
+        if not items_locator:
+            # a marker without items would only serve empty results from the cache
+            return items_locator
+        self._stage_stats[self.last_detection.stage].accepted += 1
+
+        marker.validation = MarkerValidation.from_list(len(items_locator), child_signature)
         await StoreManager.store_marker(
             page_state=page_state,
             action_name="list_detector",
@@ -142,20 +286,42 @@ class ListDetector(BaseTool):
             marker_id=marker_id,
         )
 
-        items_locator = await self._get_list_by_wrapper(wrapper_selector=marker.get_selector())
-
         return items_locator
 
+    async def _detect_items(self, strategy: str, **kwargs) -> Tuple[Optional[Marker], List[TLocator], Optional[str]]:
+        """Detect the list with `strategy`, the marker, its items and their child signature"""
+        marker = await self._detect_list(strategy, **kwargs)
+        if not marker:
+            return None, [], None
+        items_locator, child_signature = await self._get_marker_list(marker)
+        return marker, items_locator, child_signature
+
     async def _detect_list(
         self,
         strategy: str,
-    ) -> Optional[List[Locator]]:
+        analysis_engine: str = "soup",
+        screenshot_config: Optional[ScreenshotConfig] = None,
+    ) -> Optional[Marker]:
+        started = time.perf_counter()
+        confidence = None
         if strategy == "llm":
-            llm_strategy = LLMStrategy()
-            return await llm_strategy.detect(self.page)
+            # imported here, the LLM strategy pulls in bs4 and the page analysis helpers
+            from truffles.tools.list_detector.strategies.llm_strategy import LLMStrategy
+
+            llm_strategy = LLMStrategy(analysis_engine=analysis_engine, screenshot_config=screenshot_config)
+            marker = await llm_strategy.detect(self.page)
+            self.last_screenshot_stats = llm_strategy.last_screenshot_stats
+        elif strategy == "statistical":
+            statistical_strategy = StatisticalStrategy()
+            marker = await statistical_strategy.detect(self.page)
+            confidence = self.last_confidence = statistical_strategy.last_confidence
         else:
             raise NotImplementedError(f"Detection strategy {strategy} not implemented yet. Want to help?")
 
+        self._record_stage(strategy, started)
+        self.last_detection = DetectionRecord(strategy, time.perf_counter() - started, confidence) if marker else None
+        return marker
+
     @property
     def name(self) -> str:
         return "list_detector"
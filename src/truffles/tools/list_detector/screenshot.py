@@ -0,0 +1,113 @@
+import asyncio
+import io
+import os
+import time
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from playwright.async_api import Page
+
+from truffles.tracing.tracer import Tracer
+
+SCREENSHOT_FORMATS = ("png", "jpeg", "webp")
+
+# OpenAI vision models scale images down to fit 2048x2048, more pixels only cost bytes and encoding time
+DEFAULT_MAX_SIDE = 2048
+
+PAGE_SIZE_JS = """
+() => [
+  Math.max(document.documentElement.scrollWidth, document.body ? document.body.scrollWidth : 0),
+  Math.max(document.documentElement.scrollHeight, document.body ? document.body.scrollHeight : 0),
+]
+"""
+
+
+@dataclass
+class ScreenshotConfig:
+    """How the page screenshot for the list detection is captured and encoded"""
+
+    format: str = "png"
+    # JPEG/WebP quality between 0 and 100, None uses the encoder default
+    quality: Optional[int] = None
+    # longest side in pixels the image is scaled down to, None keeps the captured size
+    max_side: Optional[int] = DEFAULT_MAX_SIDE
+    # if set, the final image is also written to this path
+    debug_path: Optional[str] = None
+
+    def __post_init__(self):
+        if self.format not in SCREENSHOT_FORMATS:
+            raise ValueError(f"format must be one of: {SCREENSHOT_FORMATS}")
+
+    @property
+    def mime_type(self) -> str:
+        return f"image/{self.format}"
+
+
+@dataclass
+class ScreenshotStats:
+    """Size and timing of one captured screenshot"""
+
+    width: int
+    height: int
+    bytes: int
+    capture_seconds: float
+    encode_seconds: float
+
+
+def _downscale(image_bytes: bytes, config: ScreenshotConfig) -> Tuple[bytes, int, int]:
+    """Scale the image down to `config.max_side` and encode it in `config.format`, runs in a worker thread"""
+    from PIL import Image
+
+    with Image.open(io.BytesIO(image_bytes)) as img:
+        if config.max_side and max(img.size) > config.max_side:
+            img.thumbnail((config.max_side, config.max_side))
+        if config.format == "jpeg" and img.mode != "RGB":
+            img = img.convert("RGB")
+
+        save_options = {"quality": config.quality} if config.quality is not None and config.format != "png" else {}
+        output = io.BytesIO()
+        img.save(output, format=config.format.upper(), **save_options)
+        return output.getvalue(), img.width, img.height
+
+
+def _write_debug_image(path: str, image_bytes: bytes) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(image_bytes)
+
+
+async def capture_screenshot(page: Page, config: Optional[ScreenshotConfig] = None) -> Tuple[bytes, ScreenshotStats]:
+    """
+    Capture the upper left part of the page (at most twice as long as wide, or the other way around).
+
+    Only the needed region is captured, at CSS pixel scale. Scaling and re-encoding happen in a worker thread
+    and are skipped if the browser output already fits the config.
+    """
+    config = config or ScreenshotConfig()
+
+    start = time.perf_counter()
+    with Tracer.span("page.screenshot", format=config.format) as span:
+        width, height = await page.evaluate(PAGE_SIZE_JS)
+        clip = {"x": 0, "y": 0, "width": min(width, 2 * height), "height": min(height, 2 * width)}
+
+        screenshot_options = {"full_page": True, "clip": clip, "scale": "css"}
+        if config.format == "jpeg":
+            screenshot_options["type"] = "jpeg"
+            if config.quality is not None:
+                screenshot_options["quality"] = config.quality
+
+        image_bytes = await page.screenshot(**screenshot_options)
+        span.set_attribute("bytes", len(image_bytes))
+    capture_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    width, height = int(clip["width"]), int(clip["height"])
+    with Tracer.span("image.process", format=config.format) as span:
+        if config.format == "webp" or (config.max_side and max(width, height) > config.max_side):
+            image_bytes, width, height = await asyncio.to_thread(_downscale, image_bytes, config)
+        if config.debug_path:
+            await asyncio.to_thread(_write_debug_image, config.debug_path, image_bytes)
+        span.set_attribute("bytes", len(image_bytes))
+    encode_seconds = time.perf_counter() - start
+
+    return image_bytes, ScreenshotStats(width, height, len(image_bytes), capture_seconds, encode_seconds)
@@ -1,26 +1,34 @@
+import asyncio
 import base64
-import io
 import os
 from collections import Counter
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from typing import Callable, Dict, List, Optional, Tuple
 
 from bs4 import BeautifulSoup, Tag
 from langchain_core.messages import HumanMessage, SystemMessage
-from PIL import Image
-from playwright.async_api import Locator, Page
+from playwright.async_api import Frame, Locator, Page
 from pydantic import BaseModel, Field
 
 from truffles.context import AttributeMarker
 from truffles.models.default_model import DefaultModel
+from truffles.models.scheduler import ModelScheduler
+from truffles.tools.list_detector.browser_analysis import score_frame_in_browser
+from truffles.tools.list_detector.screenshot import ScreenshotConfig, ScreenshotStats, capture_screenshot
 from truffles.tools.list_detector.utils import (
+    TextIndex,
+    count_common_ancestor_attributes,
     count_tags_in_soup,
-    find_elements_with_text,
-    find_lowest_common_ancestor,
     get_attr_list,
 )
+from truffles.tracing.tracer import Tracer
 
 from .base import ListDetectionStrategy
 
+# "soup" parses the frame HTML with BeautifulSoup, "browser" analyzes the DOM inside the page
+ANALYSIS_ENGINES = ("soup", "browser")
+
 
 class DetectionOutput(BaseModel):
     selector: str = Field(
@@ -33,25 +41,17 @@ class ListDetectionOutput(BaseModel):
     items: List[DetectionOutput]  # = Field(description="A list of detected items (this wraps the output)")
 
 
-def find_candidate_elements(soup: BeautifulSoup, identifiers: List[dict]) -> List[Tuple[Tag, str]]:
-    """Find all elements matching the given identifiers"""
+def find_candidate_elements(soup: BeautifulSoup, identifiers: List[str]) -> List[Tuple[Tag, str]]:
+    """Find all elements containing one of the given identifier strings"""
     candidates = []
-    for identifier in identifiers:
-        elements = find_elements_with_text(soup, identifier.selector)
-        if elements:
-            candidates.extend(elements)
+    for elements in TextIndex(soup).find(identifiers).values():
+        candidates.extend(elements)
     return list(set(candidates))
 
 
 def analyze_common_ancestors(element_candidates: List[Tuple[Tag, str]], attr_extractor: Callable) -> List[str]:
     """Analyze common ancestors of candidate elements and extract attributes"""
-    attrs = []
-    for el1, _ in element_candidates:
-        for el2, _ in element_candidates:
-            common_ancestor = find_lowest_common_ancestor(el1, el2)
-            if isinstance(common_ancestor, Tag):
-                attrs.extend(attr_extractor(common_ancestor))
-    return attrs
+    return list(count_common_ancestor_attributes(element_candidates, attr_extractor).elements())
 
 
 def calculate_normalized_counts(attr_counts: Counter, total_tags: Counter) -> Dict[str, float]:
@@ -63,44 +63,114 @@ def calculate_normalized_counts(attr_counts: Counter, total_tags: Counter) -> Di
     return normalized_counts
 
 
+def score_frame_html(html: str, identifiers: List[str]) -> Dict[Tuple, float]:
+    """
+    Score the common ancestor attributes of the elements containing `identifiers` in the frame HTML.
+
+    Runs in a worker thread, or a worker process with `LLMStrategy.use_process_pool()`, so the arguments and the
+    result are plain picklable values.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+
+    # Find candidate elements
+    element_candidates = find_candidate_elements(soup, identifiers)
+
+    # Count the attributes of the common ancestors
+    # TODO: This is a bit of a hack, implement a better way
+    attr_counts = count_common_ancestor_attributes(element_candidates, get_attr_list)
+
+    # Normalize attributes
+    total_tags = count_tags_in_soup(soup)
+    return calculate_normalized_counts(attr_counts, total_tags)
+
+
+async def _frame_content(frame: Frame) -> str:
+    with Tracer.span("frame.content") as span:
+        html = await frame.content()
+        span.set_attribute("bytes", len(html))
+    return html
+
+
 class LLMStrategy(ListDetectionStrategy):
     """
     Strategy that uses an LLM to detect list elements.
     """
 
+    # parses and scores the frame HTML, `asyncio.to_thread()` when None, see `use_process_pool()`
+    _parse_executor: Optional[Executor] = None
+    # worker count of the pool created by `use_process_pool()`, used to replace it when it breaks
+    _process_pool_workers: Optional[int] = None
+
+    def __init__(self, analysis_engine: str = "soup", screenshot_config: Optional[ScreenshotConfig] = None):
+        if analysis_engine not in ANALYSIS_ENGINES:
+            raise ValueError(f"analysis_engine must be one of: {ANALYSIS_ENGINES}")
+        self.analysis_engine = analysis_engine
+        self.screenshot_config = screenshot_config or ScreenshotConfig()
+        # size and capture/encode time of the screenshot sent with the last detection
+        self.last_screenshot_stats: Optional[ScreenshotStats] = None
+
+    @classmethod
+    def get_parse_executor(cls) -> Optional[Executor]:
+        """Get the executor for the "soup" analysis, None when it runs in a worker thread"""
+        return cls._parse_executor
+
+    @classmethod
+    def set_parse_executor(cls, executor: Optional[Executor]) -> None:
+        """Use `executor` for the "soup" analysis, None restores the default worker thread"""
+        cls._parse_executor = executor
+        cls._process_pool_workers = None
+
+    @classmethod
+    def use_process_pool(cls, max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+        """
+        Parse the frame HTML in a process pool shared by all detections, instead of a worker thread.
+
+        Opt-in: the workers need the spawn `if __name__ == "__main__":` guard in the calling script. A pool that
+        breaks (e.g. a worker killed by the OOM killer) is replaced on the next parse.
+
+        Args:
+            max_workers: Number of worker processes, defaults to `min(4, os.cpu_count())`
+        """
+        max_workers = max_workers or min(4, os.cpu_count() or 1)
+        cls.set_parse_executor(ProcessPoolExecutor(max_workers=max_workers))
+        cls._process_pool_workers = max_workers
+        return cls._parse_executor
+
+    @classmethod
+    async def _score_frames(cls, frame_htmls: List[str], identifiers: List[str]) -> List[Dict[Tuple, float]]:
+        executor = cls._parse_executor
+        if executor is None:
+            return await asyncio.gather(
+                *[asyncio.to_thread(score_frame_html, html, identifiers) for html in frame_htmls]
+            )
+
+        loop = asyncio.get_running_loop()
+
+        def parse_all(executor: Executor):
+            return asyncio.gather(
+                *[loop.run_in_executor(executor, score_frame_html, html, identifiers) for html in frame_htmls]
+            )
+
+        try:
+            return await parse_all(executor)
+        except BrokenProcessPool:
+            # replace the broken pool once, a second failure is raised
+            if cls._parse_executor is executor:
+                executor.shutdown(wait=False)
+                cls.use_process_pool(cls._process_pool_workers)
+            return await parse_all(cls._parse_executor)
+
     async def _get_candidates(self, page: Page) -> Optional[List[Locator]]:
         """AI-powered detection using LLM"""
 
         # Initialize the model with structured output
-        model = DefaultModel.get_model().with_structured_output(ListDetectionOutput, include_raw=False)
-        model = model.with_retry(
-            retry_if_exception_type=(ValueError,),
-            stop_after_attempt=2,
-            wait_exponential_jitter=True,
-        )
-
-        # Take a screenshot of the full page
-        screenshot_bytes = await page.screenshot(full_page=True)  # Add logging to confirm save
-
-        # Crop the image to keep upper left corner within 8000x8000
-        with Image.open(io.BytesIO(screenshot_bytes)) as img:
-            width, height = img.size
-            crop_width = min(width, 2 * height)
-            crop_height = min(height, 2 * width)
-            # Crop from (0,0) to (crop_width, crop_height)
-            img = img.crop((0, 0, crop_width, crop_height))
-
-            output = io.BytesIO()
-            img.save(output, format="PNG")
-            screenshot_bytes = output.getvalue()
-
-            # Save cropped image for debugging
-            os.makedirs("./tmp", exist_ok=True)
-            img.save("./tmp/cropped_screenshot.png")
+        base_model, model = DefaultModel.get_structured_model(ListDetectionOutput, model_size=None)
 
+        # Take a screenshot of the upper part of the page
+        screenshot_bytes, self.last_screenshot_stats = await capture_screenshot(page, self.screenshot_config)
         screenshot_base64 = base64.b64encode(screenshot_bytes).decode()
 
-        image_data_url = f"data:image/png;base64,{screenshot_base64}"
+        image_data_url = f"data:{self.screenshot_config.mime_type};base64,{screenshot_base64}"
 
         # Create messages for the chat model
         messages = [
@@ -120,7 +190,8 @@ class LLMStrategy(ListDetectionStrategy):
             ),
         ]
 
-        response = await model.ainvoke(messages)  # for debugging set `include_raw = True`
+        # for debugging set `include_raw = True`
+        response = await ModelScheduler.ainvoke(base_model, model, messages)
         return response
 
     async def _string_to_wrap_selectors(
@@ -131,24 +202,21 @@ class LLMStrategy(ListDetectionStrategy):
     ) -> List[Locator]:
         """Get list candidates from all HTML frames"""
 
-        soup_list = [BeautifulSoup(await fr.content(), "html.parser") for fr in page.frames]
-        overall_counts = {}
-
-        for soup in soup_list:
-            # Find candidate elements
-            element_candidates = find_candidate_elements(soup, list_element_candidates)
+        identifiers = [candidate.selector for candidate in list_element_candidates]
+        frames = page.frames
 
-            # Analyze common ancestors and get attributes
-            # TODO: This is a bit of a hack, implement a better way
-            possible_attrs = analyze_common_ancestors(element_candidates, get_attr_list)
+        if self.analysis_engine == "browser":
+            frame_counts = await asyncio.gather(*[score_frame_in_browser(fr, identifiers) for fr in frames])
+        else:
+            frame_htmls = await asyncio.gather(*[_frame_content(fr) for fr in frames])
 
-            # Count and normalize attributes
-            attr_counts = Counter(possible_attrs)
-            total_tags = count_tags_in_soup(soup)
-            normalized_counts = calculate_normalized_counts(attr_counts, total_tags)
-
-            overall_counts.update(normalized_counts)
+            with Tracer.span("bs4.parse", frames=len(frames), bytes=sum(len(html) for html in frame_htmls)):
+                frame_counts = await self._score_frames(frame_htmls, identifiers)
 
+        # later frames win, like updating the counts frame by frame
+        overall_counts = {}
+        for counts in frame_counts:
+            overall_counts.update(counts)
         return overall_counts
 
     async def detect(self, page: Page) -> Optional[List[Locator]]:
@@ -0,0 +1,53 @@
+from typing import Any, Dict, Optional
+
+from playwright.async_api import Page
+
+from truffles.context import AttributeMarker, Marker, SimpleMarker
+from truffles.tools.list_detector.browser_analysis import SCORE_REPEATING_GROUPS_JS
+from truffles.tracing.tracer import Tracer
+
+from .base import ListDetectionStrategy
+
+# wrappers need at least this many similar children to count as a list
+DEFAULT_MIN_ITEMS = 3
+
+# depth of the subtrees compared to decide whether two items are structurally similar
+DEFAULT_SHAPE_DEPTH = 3
+
+
+class StatisticalStrategy(ListDetectionStrategy):
+    """
+    Strategy that detects the main list from repeating sibling subtrees, without any LLM call.
+
+    The whole page is scored in a single evaluation of the main frame.
+    """
+
+    def __init__(self, min_items: int = DEFAULT_MIN_ITEMS, shape_depth: int = DEFAULT_SHAPE_DEPTH):
+        if min_items < 2:
+            raise ValueError("min_items must be at least 2")
+        self.min_items = min_items
+        self.shape_depth = shape_depth
+        # confidence between 0 and 1 of the last detection, None if nothing was found
+        self.last_confidence: Optional[float] = None
+        # item count, similarity, area share and mean text length of the last detected list
+        self.last_scores: Optional[Dict[str, Any]] = None
+
+    async def detect(self, page: Page) -> Optional[Marker]:
+        with Tracer.span("page.evaluate", purpose="statistical_scores"):
+            result = await page.evaluate(
+                SCORE_REPEATING_GROUPS_JS, {"minItems": self.min_items, "shapeDepth": self.shape_depth}
+            )
+        if not result:
+            self.last_confidence = None
+            self.last_scores = None
+            return None
+
+        self.last_confidence = result["confidence"]
+        self.last_scores = {key: result[key] for key in ("count", "similarity", "areaShare", "meanText")}
+
+        # a unique stable id or class survives content changes better than the position in the DOM
+        if result["attribute"]:
+            key, value = result["attribute"]
+            return AttributeMarker(attribute_dict={key: value}, match_mode="contains")
+
+        return SimpleMarker(selector=result["path"])
@@ -1,7 +1,10 @@
+from bisect import bisect_right
 from collections import Counter
-from typing import List
+from typing import Callable, Dict, List, Tuple
 
-from bs4 import BeautifulSoup, Tag
+from bs4 import BeautifulSoup, NavigableString, Tag
+
+SKIPPED_TEXT_PARENTS = ("script", "style")
 
 
 def find_lowest_common_ancestor(node1, node2):
@@ -29,6 +32,44 @@ def find_lowest_common_ancestor(node1, node2):
     return None
 
 
+def count_common_ancestor_attributes(
+    element_candidates: List[Tuple[Tag, int]], attr_extractor: Callable = None
+) -> Counter:
+    """
+    Count the attributes of the lowest common ancestor of every ordered pair of candidate elements.
+
+    Gives the same counts as extracting the attributes of `find_lowest_common_ancestor(el1, el2)` for all
+    k^2 pairs, in O(k * depth): a node is the lowest common ancestor of (candidates in its subtree)^2 minus
+    the sum over its children of (candidates in the child subtree)^2 ordered pairs.
+    """
+    attr_extractor = attr_extractor or get_attr_list
+
+    nodes: Dict[int, Tag] = {}
+    subtree_counts: Dict[int, int] = {}
+    for element, _ in element_candidates:
+        node = element
+        while node is not None:
+            key = id(node)
+            nodes[key] = node
+            subtree_counts[key] = subtree_counts.get(key, 0) + 1
+            node = node.parent
+
+    child_squares: Dict[int, int] = {}
+    for key, count in subtree_counts.items():
+        parent = nodes[key].parent
+        if parent is not None:
+            child_squares[id(parent)] = child_squares.get(id(parent), 0) + count * count
+
+    attr_counts = Counter()
+    for key, count in subtree_counts.items():
+        pairs = count * count - child_squares.get(key, 0)
+        if pairs and isinstance(nodes[key], Tag):
+            for attr in attr_extractor(nodes[key]):
+                attr_counts[attr] += pairs
+
+    return attr_counts
+
+
 def count_tags_in_soup(soup: BeautifulSoup) -> Counter:
     """
     Count the occurrences of each attribute in the entire soup.
@@ -54,12 +95,60 @@ def find_elements_with_text(soup: BeautifulSoup, text: str) -> List[Tag]:
     output = [
         (element, id(element))
         for element in soup.find_all(string=lambda string: string and text.lower() in string.lower())
-        if element.parent.name not in ["script", "style"]
+        if element.parent.name not in SKIPPED_TEXT_PARENTS
     ]
 
     return output
 
 
+class TextIndex:
+    """
+    Lower-cased index of all strings in a soup outside of script and style elements.
+
+    The strings are concatenated once, `find` then runs one C-level substring search per identifier over the
+    whole text and maps the hits back to their strings, instead of walking the soup and lower-casing every
+    string again for each identifier.
+    """
+
+    SEPARATOR = "\x00"
+
+    def __init__(self, soup: BeautifulSoup):
+        self._strings: List[NavigableString] = [
+            string for string in soup.find_all(string=True) if string and string.parent.name not in SKIPPED_TEXT_PARENTS
+        ]
+        lowered = [string.lower() for string in self._strings]
+
+        self._starts: List[int] = []
+        position = 0
+        for text in lowered:
+            self._starts.append(position)
+            position += len(text) + len(self.SEPARATOR)
+
+        self._lowered = lowered
+        self._text = self.SEPARATOR.join(lowered)
+
+    def _find_one(self, needle: str) -> List[Tuple[NavigableString, int]]:
+        if not needle or self.SEPARATOR in needle:
+            return [(s, id(s)) for s, text in zip(self._strings, self._lowered) if needle in text]
+
+        matches = []
+        position = self._text.find(needle)
+        while position != -1:
+            string_index = bisect_right(self._starts, position) - 1
+            matches.append((self._strings[string_index], id(self._strings[string_index])))
+
+            # one match per string is enough, continue with the next string
+            if string_index + 1 == len(self._starts):
+                break
+            position = self._text.find(needle, self._starts[string_index + 1])
+
+        return matches
+
+    def find(self, identifiers: List[str]) -> Dict[str, List[Tuple[NavigableString, int]]]:
+        """Find the strings containing each identifier (case-insensitive), as `(string, id(string))` tuples"""
+        return {identifier: self._find_one(identifier.lower()) for identifier in identifiers}
+
+
 def identify_list_attribute(html: str, list_element_candidates: List[str]) -> str:
     """
     Identify the attribute with the highest ratio of appearances as lowest common ancestor
@@ -75,21 +164,12 @@ def identify_list_attribute(html: str, list_element_candidates: List[str]) -> st
     soup = BeautifulSoup(html, "html.parser")
 
     element_candidates = []
-    for identifier in list_element_candidates:
-        elements = find_elements_with_text(soup, identifier)
-        if elements:
-            element_candidates += elements
+    for elements in TextIndex(soup).find(list_element_candidates).values():
+        element_candidates += elements
 
     element_candidates = list(set(element_candidates))
 
-    possible_attrs = []
-    for el1, _ in element_candidates:
-        for el2, _ in element_candidates:
-            common_ancestor = find_lowest_common_ancestor(el1, el2)
-            if isinstance(common_ancestor, Tag):
-                possible_attrs += get_attr_list(common_ancestor)
-
-    attr_counts = Counter(possible_attrs)
+    attr_counts = count_common_ancestor_attributes(element_candidates, get_attr_list)
     total_tags = count_tags_in_soup(soup)
 
     normalized_counts = {}
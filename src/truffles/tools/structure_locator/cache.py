@@ -0,0 +1,169 @@
+import hashlib
+import json
+from abc import ABC, abstractmethod
+from dataclasses import replace
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+
+from truffles.context.lru import LRUStore
+from truffles.context.stats import CacheStats
+
+
+@lru_cache(maxsize=256)
+def _schema_hash(structure: Type[BaseModel]) -> str:
+    """Hash of the JSON schema of `structure`, so a changed schema never reuses old results"""
+    schema = json.dumps(structure.model_json_schema(), sort_keys=True)
+    return hashlib.sha256(schema.encode("utf-8")).hexdigest()
+
+
+def structure_cache_key(
+    structure: Type[BaseModel], filter_relevance: bool, model_size: str, element_text: Optional[str]
+) -> str:
+    """Content-addressed key of one `to_structure` call, whitespace differences in the text are ignored"""
+    normalized_text = " ".join((element_text or "").split())
+    key = json.dumps([_schema_hash(structure), filter_relevance, model_size, normalized_text])
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+class StructureCache(ABC):
+    """Abstract base class for `to_structure` result stores"""
+
+    @abstractmethod
+    async def get_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get the stored entry for a key"""
+        pass
+
+    @abstractmethod
+    async def store_entry(self, key: str, entry: Dict[str, Any]) -> None:
+        """Store the entry for a key"""
+        pass
+
+    @abstractmethod
+    async def remove_entry(self, key: str) -> None:
+        """Remove the entry for a key if present"""
+        pass
+
+    @property
+    @abstractmethod
+    def stats(self) -> CacheStats:
+        """Hit, miss and eviction counters"""
+        pass
+
+
+class MemoryStructureCache(StructureCache):
+    """In-memory implementation of the structure cache"""
+
+    def __init__(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None, ttl: Optional[float] = None):
+        """
+        Args:
+            max_entries: Maximum number of stored results, the least recently used are evicted first
+            max_bytes: Maximum approximate size of the stored results
+            ttl: Seconds after which a stored result expires
+        """
+        self._stats = CacheStats()
+        self._store = LRUStore(self._stats, max_entries=max_entries, max_bytes=max_bytes, ttl=ttl)
+
+    @property
+    def stats(self) -> CacheStats:
+        return replace(self._stats, entries=len(self._store))
+
+    async def get_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._store.get(key)
+        if entry is None:
+            self._stats.misses += 1
+        else:
+            self._stats.hits += 1
+        return entry
+
+    async def store_entry(self, key: str, entry: Dict[str, Any]) -> None:
+        self._store.set(key, entry)
+
+    async def remove_entry(self, key: str) -> None:
+        self._store.pop(key)
+
+    def to_json(self) -> str:
+        """Convert cache to JSON string"""
+        return json.dumps({"structure_cache": self._store.to_dict()})
+
+    @classmethod
+    def from_json(cls, json_str: str, **kwargs) -> "MemoryStructureCache":
+        """Create cache from JSON string, `kwargs` are passed to the constructor"""
+        cache = cls(**kwargs)
+        for key, entry in json.loads(json_str)["structure_cache"].items():
+            cache._store.set(key, entry)
+        return cache
+
+
+class StructureCacheManager:
+    """
+    Opt-in cache of `to_structure` results, shared by all locators.
+
+    Without `initialize()` every call goes to the LLM.
+    """
+
+    _cache: Optional[StructureCache] = None
+
+    @classmethod
+    def initialize(cls, cache: StructureCache) -> None:
+        """Initialize the cache"""
+        cls._cache = cache
+
+    @classmethod
+    def get_cache(cls) -> Optional[StructureCache]:
+        """Get the current cache, None if caching is disabled"""
+        return cls._cache
+
+    @classmethod
+    def get_stats(cls) -> Optional[CacheStats]:
+        """Get the hit rate counters of the current cache"""
+        return cls._cache.stats if cls._cache is not None else None
+
+    @classmethod
+    async def get_result(
+        cls, structure: Type[BaseModel], filter_relevance: bool, model_size: str, element_text: Optional[str]
+    ) -> Tuple[bool, Optional[BaseModel]]:
+        """
+        Look up a cached result.
+
+        Returns:
+            Whether the result was found and the validated result, None for an irrelevant item
+        """
+        if cls._cache is None:
+            return False, None
+
+        key = structure_cache_key(structure, filter_relevance, model_size, element_text)
+        entry = await cls._cache.get_entry(key)
+        if entry is None:
+            return False, None
+        if entry["result"] is None:
+            return True, None
+
+        try:
+            return True, structure.model_validate(entry["result"])
+        except ValidationError:
+            # e.g. a validator changed without changing the schema, the entry is recomputed
+            await cls._cache.remove_entry(key)
+            return False, None
+
+    @classmethod
+    async def store_result(
+        cls,
+        structure: Type[BaseModel],
+        filter_relevance: bool,
+        model_size: str,
+        element_text: Optional[str],
+        result: Optional[BaseModel],
+    ) -> None:
+        """Store a result, None for an irrelevant item"""
+        if cls._cache is None:
+            return
+
+        key = structure_cache_key(structure, filter_relevance, model_size, element_text)
+        await cls._cache.store_entry(key, {"result": result.model_dump(mode="json") if result is not None else None})
+
+    @classmethod
+    def reset(cls) -> None:
+        """Disable the cache (good for testing)"""
+        cls._cache = None
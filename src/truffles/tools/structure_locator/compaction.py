@@ -0,0 +1,109 @@
+import asyncio
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Optional, Tuple
+
+# character limit of the text sent for a single item, applied before the token budget
+MAX_CHAR_LEN = 100000
+
+# token budget of the text sent for a single item
+DEFAULT_MAX_TOKENS = 8000
+
+# encoding of the gpt-4o model family, a close enough estimate for the other providers
+TOKEN_ENCODING = "o200k_base"
+
+_INLINE_WHITESPACE = re.compile(r"[^\S\n]+")
+
+
+@dataclass
+class TextStats:
+    """Size of an item text before and after the compaction"""
+
+    raw_chars: int
+    chars: int
+    tokens: int
+    truncated: bool
+
+
+@lru_cache(maxsize=1)
+def _get_encoding() -> Optional[Any]:
+    """
+    The tiktoken encoding, None if tiktoken is not installed or the encoding cannot be loaded (e.g. offline).
+
+    tiktoken is the optional `tokens` extra.
+    """
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding(TOKEN_ENCODING)
+    except Exception:
+        return None
+
+
+async def load_encoding() -> None:
+    """Load the tokenizer in a worker thread, the first load reads or downloads the encoding file"""
+    if _get_encoding.cache_info().currsize == 0:
+        await asyncio.to_thread(_get_encoding)
+
+
+def count_tokens(text: str) -> int:
+    """Number of tokens of `text`, ~4 characters per token if no tokenizer is available"""
+    encoding = _get_encoding()
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """Cut `text` down to at most `max_tokens` tokens"""
+    encoding = _get_encoding()
+    if encoding is None:
+        return text[: max_tokens * 4]
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+
+
+def compact_text(
+    text: Optional[str],
+    max_tokens: Optional[int] = DEFAULT_MAX_TOKENS,
+    max_chars: int = MAX_CHAR_LEN,
+    dedupe_lines: bool = False,
+) -> Tuple[str, TextStats]:
+    """
+    Shrink an item text for the LLM without losing its content.
+
+    Runs of whitespace are collapsed, empty lines dropped, and the result is cut to `max_chars` characters and
+    `max_tokens` tokens.
+
+    Args:
+        text: The item text
+        max_tokens: Token budget, None for no limit
+        max_chars: Character limit, applied before the token budget
+        dedupe_lines: Also drop lines repeating an earlier line, e.g. boilerplate repeated in every card. Off by
+            default, identical rows of a table or order are content.
+
+    Returns:
+        The compacted text and its size statistics
+    """
+    text = text or ""
+
+    seen = set()
+    lines = []
+    for line in text.splitlines():
+        line = _INLINE_WHITESPACE.sub(" ", line).strip()
+        if not line or (dedupe_lines and line in seen):
+            continue
+        seen.add(line)
+        lines.append(line)
+    compacted = "\n".join(lines)
+
+    truncated = len(compacted) > max_chars
+    compacted = compacted[:max_chars]
+
+    tokens = count_tokens(compacted)
+    if max_tokens is not None and tokens > max_tokens:
+        compacted = truncate_tokens(compacted, max_tokens)
+        tokens = count_tokens(compacted)
+        truncated = True
+
+    return compacted, TextStats(raw_chars=len(text), chars=len(compacted), tokens=tokens, truncated=truncated)
@@ -23,3 +23,25 @@ def struct_locator_message(element_text: str) -> List[BaseMessage]:
     #     messages.append(HumanMessage(content=f"Additional instructions: {prompt}"))
 
     return messages
+
+
+def struct_locator_batch_message(element_texts: List[str]) -> List[BaseMessage]:
+    items = "\n\n".join(f"### Item {index}\n{text}" for index, text in enumerate(element_texts))
+
+    messages = [
+        SystemMessage(
+            content="""You are an AI model that converts the visible text on a webpage to structured data.
+            The text of several numbered items is given, return exactly one entry per item and set its `index`
+            to the item number. You **always** use the correct pydantic format."""
+        ),
+        HumanMessage(
+            content=[
+                {
+                    "type": "text",
+                    "text": items,
+                },
+            ]
+        ),
+    ]
+
+    return messages
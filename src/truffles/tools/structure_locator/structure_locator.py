@@ -1,15 +1,69 @@
-from typing import Dict
+import asyncio
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, Type
 
 from playwright.async_api import Locator
-from pydantic import BaseModel, Field, ValidationError
+from pydantic import BaseModel, Field, ValidationError, create_model
 
 from truffles.enhanced.locator import TLocator
 from truffles.models.default_model import DefaultModel
+from truffles.models.scheduler import ModelScheduler
 from truffles.tools.base import BaseTool
+from truffles.tools.structure_locator.cache import StructureCacheManager
+from truffles.tools.structure_locator.compaction import (
+    DEFAULT_MAX_TOKENS,
+    MAX_CHAR_LEN,
+    TextStats,
+    compact_text,
+    load_encoding,
+)
 from truffles.tools.structure_locator.exceptions import StructureLocatorOutputValidationError
-from truffles.tools.structure_locator.messages import struct_locator_message
+from truffles.tools.structure_locator.messages import struct_locator_batch_message, struct_locator_message
+from truffles.tracing.tracer import Tracer
 
-MAX_CHAR_LEN = 100000
+DEFAULT_BATCH_SIZE = 10
+
+MODEL_SIZE = "small"
+
+
+@lru_cache(maxsize=256)
+def _relevance_model(structure: Type[BaseModel]) -> Type[BaseModel]:
+    """Extend `structure` with the relevance flag"""
+
+    class RelevanceFilter(structure):
+        is_relevant: bool = Field(description="Is this relevant to the pydantic entries?")
+
+    return RelevanceFilter
+
+
+@lru_cache(maxsize=256)
+def _batch_model(structure: Type[BaseModel], filter_relevance: bool) -> Type[BaseModel]:
+    """Create the structured output model for a batch of items of `structure`"""
+
+    item_fields = {"index": (int, Field(description="The number of the item this entry belongs to"))}
+    if filter_relevance:
+        item_fields["is_relevant"] = (bool, Field(description="Is this relevant to the pydantic entries?"))
+
+    batch_item = create_model(f"{structure.__name__}BatchItem", __base__=structure, **item_fields)
+
+    return create_model(
+        f"{structure.__name__}Batch",
+        items=(List[batch_item], Field(description="One entry per item")),
+    )
+
+
+async def _get_text(locator: Locator, use_inner_text: bool) -> Optional[str]:
+    return await (locator.inner_text() if use_inner_text else locator.text_content())
+
+
+def _compact(element_text: Optional[str], max_tokens: Optional[int], dedupe_lines: bool) -> Tuple[str, TextStats]:
+    with Tracer.span("text.compact") as span:
+        compacted, stats = compact_text(
+            element_text, max_tokens=max_tokens, max_chars=MAX_CHAR_LEN, dedupe_lines=dedupe_lines
+        )
+        span.set_attribute("raw_chars", stats.raw_chars)
+        span.set_attribute("tokens", stats.tokens)
+    return compacted, stats
 
 
 @TLocator.register_tool("to_structure")
@@ -21,6 +75,8 @@ class LocatorToDictTool(BaseTool):
     def __init__(self, locator: Locator):
         super().__init__()
         self.locator = locator
+        # size of the text sent with the last `execute()`
+        self.last_text_stats: Optional[TextStats] = None
 
     async def _exec_impl(self, element_text: str, structure: BaseModel, filter_relevance: bool = True) -> Dict:
         """Implementation of list getter"""
@@ -28,23 +84,15 @@ class LocatorToDictTool(BaseTool):
         # TODO: add implement cropped screenshot passing?
 
         # add relevance filtering
-        class RelevanceFilter(structure):
-            is_relevant: bool = Field(description="Is this relevant to the pydantic entries?")
-
-        model = DefaultModel.get_specific_model(model_size="small").with_structured_output(
-            RelevanceFilter if filter_relevance else structure,
-            include_raw=False,  # set to True for debugging
-        )
-        model = model.with_retry(
-            retry_if_exception_type=(ValueError,),
-            stop_after_attempt=2,
-            wait_exponential_jitter=True,
+        base_model, model = DefaultModel.get_structured_model(
+            _relevance_model(structure) if filter_relevance else structure, model_size=MODEL_SIZE
         )
 
         messages = struct_locator_message(element_text)
 
         try:
-            response = await model.ainvoke(messages)  # for debugging set `include_raw = True`
+            # for debugging set `include_raw = True`
+            response = await ModelScheduler.ainvoke(base_model, model, messages)
         except ValidationError:
             raise StructureLocatorOutputValidationError("Error validating LLM output")
 
@@ -57,7 +105,130 @@ class LocatorToDictTool(BaseTool):
         else:
             return response
 
-    async def execute(self, structure: BaseModel, filter_relevance: bool = True) -> Dict:
-        """Convert the locator content to a dictionary"""
+    async def execute(
+        self,
+        structure: BaseModel,
+        filter_relevance: bool = True,
+        use_inner_text: bool = False,
+        max_tokens: Optional[int] = DEFAULT_MAX_TOKENS,
+        dedupe_lines: bool = False,
+    ) -> Dict:
+        """
+        Convert the locator content to a dictionary
+
+        Args:
+            structure: Schema of the result
+            filter_relevance: Return None if the content does not fit the schema
+            use_inner_text: Use the rendered text (hidden text dropped, line breaks from the layout) instead of
+                the raw text content, costs a layout in the browser
+            max_tokens: Token budget of the text sent to the model, after whitespace and empty lines are removed
+            dedupe_lines: Drop lines repeating an earlier line of the text, e.g. boilerplate, see `compact_text`
+        """
+
+        element_text = await _get_text(self.locator, use_inner_text)
+        await load_encoding()
+        element_text, self.last_text_stats = _compact(element_text, max_tokens, dedupe_lines)
+
+        found, result = await StructureCacheManager.get_result(structure, filter_relevance, MODEL_SIZE, element_text)
+        if found:
+            return result
+
+        result = await self._exec_impl(element_text, structure, filter_relevance)
+        await StructureCacheManager.store_result(structure, filter_relevance, MODEL_SIZE, element_text, result)
+        return result
+
+    @staticmethod
+    async def _exec_batch_impl(
+        element_texts: List[str], structure: Type[BaseModel], filter_relevance: bool = True
+    ) -> Dict[int, Optional[BaseModel]]:
+        """
+        Structure several texts in a single LLM call, returns the results by position in `element_texts`.
+
+        Items missing from the response are left out, nothing is returned if the response does not validate.
+        """
+
+        base_model, model = DefaultModel.get_structured_model(
+            _batch_model(structure, filter_relevance), model_size=MODEL_SIZE
+        )
+
+        messages = struct_locator_batch_message(element_texts)
+
+        try:
+            # for debugging set `include_raw = True`
+            response = await ModelScheduler.ainvoke(base_model, model, messages)
+        except ValidationError:
+            return {}  # the batch response is malformed, all of its items are converted one by one
+
+        results = {}
+        for item in response.items:
+            if item.index in results or not 0 <= item.index < len(element_texts):
+                continue  # the model returned an unknown or duplicate item, ignore it
+
+            if filter_relevance and not item.is_relevant:
+                results[item.index] = None
+            else:
+                results[item.index] = structure.model_validate(item.model_dump(exclude={"index", "is_relevant"}))
+
+        return results
+
+    @classmethod
+    async def execute_many(
+        cls,
+        locators: List[Locator],
+        structure: Type[BaseModel],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        filter_relevance: bool = True,
+        use_inner_text: bool = False,
+        max_tokens: Optional[int] = DEFAULT_MAX_TOKENS,
+        dedupe_lines: bool = False,
+    ) -> List[Optional[BaseModel]]:
+        """
+        Convert the content of several locators, packing `batch_size` items into each LLM call.
+
+        Items the model leaves out of a batch response, or all items of a malformed response, are converted one by
+        one. Cached results are reused if `StructureCacheManager` is initialized. See `execute` for
+        `use_inner_text`, `max_tokens` and `dedupe_lines`.
+
+        Returns:
+            One result per locator, in order. Irrelevant items are None if `filter_relevance` is set.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+
+        raw_texts = await asyncio.gather(*[_get_text(locator, use_inner_text) for locator in locators])
+        await load_encoding()
+        element_texts = [_compact(text, max_tokens, dedupe_lines)[0] for text in raw_texts]
+
+        cached = await asyncio.gather(
+            *[StructureCacheManager.get_result(structure, filter_relevance, MODEL_SIZE, text) for text in element_texts]
+        )
+        results = {index: result for index, (found, result) in enumerate(cached) if found}
+
+        uncached = [index for index in range(len(locators)) if index not in results]
+        batches = [uncached[start : start + batch_size] for start in range(0, len(uncached), batch_size)]
+
+        batch_results = await asyncio.gather(
+            *[
+                cls._exec_batch_impl([element_texts[index] for index in batch], structure, filter_relevance)
+                for batch in batches
+            ]
+        )
+        for batch, batch_result in zip(batches, batch_results):
+            results.update({batch[position]: result for position, result in batch_result.items()})
+
+        missing = [index for index in uncached if index not in results]
+        missing_results = await asyncio.gather(
+            *[cls(locators[index])._exec_impl(element_texts[index], structure, filter_relevance) for index in missing]
+        )
+        results.update(zip(missing, missing_results))
+
+        await asyncio.gather(
+            *[
+                StructureCacheManager.store_result(
+                    structure, filter_relevance, MODEL_SIZE, element_texts[index], results[index]
+                )
+                for index in uncached
+            ]
+        )
 
-        return await self._exec_impl(await self.locator.text_content(), structure, filter_relevance)
+        return [results[index] for index in range(len(locators))]
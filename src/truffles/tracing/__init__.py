@@ -0,0 +1,4 @@
+from truffles.tracing.exporters import InMemoryExporter, OpenTelemetryExporter
+from truffles.tracing.tracer import Span, SpanExporter, Tracer
+
+__all__ = ["Tracer", "Span", "SpanExporter", "InMemoryExporter", "OpenTelemetryExporter"]
@@ -0,0 +1,75 @@
+from typing import Any, Dict, List, Optional
+
+from truffles.tracing.tracer import Span, SpanExporter
+
+
+class InMemoryExporter(SpanExporter):
+    """Collects the finished spans, e.g. for tests and benchmarks"""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+
+    def on_end(self, span: Span) -> None:
+        self.spans.append(span)
+
+    def find(self, name: str) -> List[Span]:
+        """Get the finished spans with the given name"""
+        return [span for span in self.spans if span.name == name]
+
+    def total_duration(self, name: str) -> float:
+        """Summed duration in seconds of the spans with the given name"""
+        return sum(span.duration for span in self.find(name))
+
+    def clear(self) -> None:
+        self.spans = []
+
+
+class OpenTelemetryExporter(SpanExporter):
+    """
+    Forwards the spans to OpenTelemetry, keeping their nesting and timing.
+
+    Requires the `opentelemetry-api` package, the spans go to the configured tracer provider.
+    """
+
+    def __init__(self, tracer_provider: Optional[Any] = None, instrumentation_name: str = "truffles"):
+        """
+        Args:
+            tracer_provider: OpenTelemetry tracer provider, defaults to the global one
+            instrumentation_name: Name of the OpenTelemetry tracer
+        """
+        try:
+            from opentelemetry import trace
+        except ImportError as e:
+            raise ImportError(
+                "OpenTelemetryExporter requires opentelemetry-api, install it with `pip install opentelemetry-api`"
+            ) from e
+
+        self._trace = trace
+        self._tracer = trace.get_tracer(instrumentation_name, tracer_provider=tracer_provider)
+        self._open_spans: Dict[int, Any] = {}
+
+    def on_start(self, span: Span) -> None:
+        parent = self._open_spans.get(span.parent_id)
+        context = self._trace.set_span_in_context(parent) if parent is not None else None
+        self._open_spans[span.span_id] = self._tracer.start_span(
+            span.name, context=context, start_time=span.start_time, attributes=_otel_attributes(span.attributes)
+        )
+
+    def on_end(self, span: Span) -> None:
+        otel_span = self._open_spans.pop(span.span_id, None)
+        if otel_span is None:
+            return
+
+        otel_span.set_attributes(_otel_attributes(span.attributes))
+        if span.error is not None:
+            otel_span.set_status(self._trace.Status(self._trace.StatusCode.ERROR, span.error))
+        otel_span.end(end_time=span.end_time)
+
+
+def _otel_attributes(attributes: Dict[str, Any]) -> Dict[str, Any]:
+    """OpenTelemetry only accepts primitive attribute values"""
+    return {
+        key: value if isinstance(value, (str, bool, int, float)) else str(value)
+        for key, value in attributes.items()
+        if value is not None
+    }
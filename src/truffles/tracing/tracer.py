@@ -0,0 +1,137 @@
+import itertools
+import time
+from abc import ABC, abstractmethod
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+_span_ids = itertools.count(1)
+
+
+@dataclass
+class Span:
+    """A timed operation, nested in the span that was active when it started"""
+
+    name: str
+    span_id: int
+    parent_id: Optional[int] = None
+    trace_id: Optional[int] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    # wall clock times in nanoseconds since the epoch
+    start_time: int = 0
+    end_time: Optional[int] = None
+    error: Optional[str] = None
+
+    @property
+    def duration(self) -> Optional[float]:
+        """Duration in seconds, None while the span is running"""
+        return (self.end_time - self.start_time) / 1e9 if self.end_time is not None else None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+
+class SpanExporter(ABC):
+    """Receives the spans of the tracer"""
+
+    def on_start(self, span: Span) -> None:
+        """Called when a span starts, before any of its children"""
+        pass
+
+    @abstractmethod
+    def on_end(self, span: Span) -> None:
+        """Called when a span ends, after all of its children"""
+        pass
+
+
+class _NoopSpan:
+    """Returned while tracing is disabled, so instrumented code needs no checks"""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        return None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("truffles_current_span", default=None)
+
+
+class _ActiveSpan:
+    """Context manager that makes a span the parent of the spans started inside it"""
+
+    __slots__ = ("span", "_exporters", "_token")
+
+    def __init__(self, span: Span, exporters: List[SpanExporter]):
+        self.span = span
+        self._exporters = exporters
+
+    def __enter__(self) -> Span:
+        parent = _current_span.get()
+        if parent is not None:
+            self.span.parent_id = parent.span_id
+            self.span.trace_id = parent.trace_id
+        else:
+            self.span.trace_id = self.span.span_id
+
+        self.span.start_time = time.time_ns()
+        self._token = _current_span.set(self.span)
+        for exporter in self._exporters:
+            exporter.on_start(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        self.span.end_time = time.time_ns()
+        if exc is not None:
+            self.span.error = f"{exc_type.__name__}: {exc}"
+        _current_span.reset(self._token)
+        for exporter in self._exporters:
+            exporter.on_end(self.span)
+
+
+class Tracer:
+    """
+    Tracing of the tool calls, browser round trips and LLM calls.
+
+    Disabled until `initialize()` is called, `span()` then returns a shared no-op context manager.
+    """
+
+    enabled: bool = False
+    _exporters: List[SpanExporter] = []
+
+    @classmethod
+    def initialize(cls, *exporters: SpanExporter) -> None:
+        """Enable tracing, every span is passed to all `exporters`"""
+        cls._exporters = list(exporters)
+        cls.enabled = bool(exporters)
+
+    @classmethod
+    def reset(cls) -> None:
+        """Disable tracing"""
+        cls._exporters = []
+        cls.enabled = False
+
+    @classmethod
+    def span(cls, name: str, **attributes: Any):
+        """
+        Context manager timing the block as a span, it is the parent of all spans started inside the block.
+
+        Usage:
+            with Tracer.span("page.evaluate", purpose="page_state") as span:
+                ...
+                span.set_attribute("bytes", len(result))
+        """
+        if not cls.enabled:
+            return _NOOP_SPAN
+        return _ActiveSpan(Span(name, next(_span_ids), attributes=attributes), cls._exporters)
+
+    @staticmethod
+    def current_span() -> Optional[Span]:
+        return _current_span.get()
@@ -1,35 +1,110 @@
+from collections.abc import Mapping, Sequence
+from functools import lru_cache
+from typing import Any, Iterator
+
 from playwright.async_api import Locator, Page
 
+COLLECTION_TYPES = (list, tuple, set, dict)
 
-def wrap_collection(collection):
-    """Recursively wrap nested collections containing Page or Locator objects."""
 
+@lru_cache(maxsize=1)
+def _enhanced_types():
+    # imported on first use, the enhanced classes import this module
     from ..enhanced.locator import TLocator
     from ..enhanced.page import TPage
 
+    return TLocator, TPage
+
+
+def wrap_item(item: Any, lazy: bool = False) -> Any:
+    """Wrap a Page or Locator, or a collection that may contain them. Other values are returned as is."""
+
+    if isinstance(item, Locator):
+        TLocator, TPage = _enhanced_types()
+        return TLocator(item)
+    if isinstance(item, Page):
+        TLocator, TPage = _enhanced_types()
+        return TPage(item)
+    if isinstance(item, COLLECTION_TYPES):
+        return wrap_collection(item, lazy=lazy)
+    return item
+
+
+def wrap_collection(collection, lazy: bool = False):
+    """
+    Recursively wrap nested collections containing Page or Locator objects.
+
+    Args:
+        collection: List, tuple, set or dict to wrap
+        lazy: Return views that wrap the items on access instead of copying the whole collection. Lists and
+            tuples become a `LazyList`, dicts a `LazyDict`, sets are always copied.
+    """
+
+    if lazy:
+        if isinstance(collection, dict):
+            return LazyDict(collection)
+        if isinstance(collection, (list, tuple)):
+            return LazyList(collection)
+
     if isinstance(collection, dict):
-        return {
-            key: (
-                TLocator(value)
-                if isinstance(value, Locator)
-                else (
-                    TPage(value)
-                    if isinstance(value, Page)
-                    else (wrap_collection(value) if isinstance(value, (list, tuple, set, dict)) else value)
-                )
-            )
-            for key, value in collection.items()
-        }
-
-    return type(collection)(
-        (
-            TLocator(item)
-            if isinstance(item, Locator)
-            else (
-                TPage(item)
-                if isinstance(item, Page)
-                else (wrap_collection(item) if isinstance(item, (list, tuple, set, dict)) else item)
-            )
-        )
-        for item in collection
-    )
+        return {key: wrap_item(value) for key, value in collection.items()}
+
+    return type(collection)(wrap_item(item) for item in collection)
+
+
+class LazyList(Sequence):
+    """Read-only view of a list or tuple that wraps Page and Locator items when they are accessed"""
+
+    __slots__ = ("_items",)
+
+    def __init__(self, items: Sequence):
+        self._items = items
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return LazyList(self._items[index])
+        return wrap_item(self._items[index], lazy=True)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[Any]:
+        for item in self._items:
+            yield wrap_item(item, lazy=True)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, LazyList):
+            other = other._items
+        return list(self._items) == list(other) if isinstance(other, (list, tuple)) else NotImplemented
+
+    def __repr__(self) -> str:
+        return f"LazyList({self._items!r})"
+
+
+class LazyDict(Mapping):
+    """Read-only view of a dict that wraps Page and Locator values when they are accessed"""
+
+    __slots__ = ("_items",)
+
+    def __init__(self, items: dict):
+        self._items = items
+
+    def __getitem__(self, key):
+        return wrap_item(self._items[key], lazy=True)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._items)
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._items
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, LazyDict):
+            other = other._items
+        return self._items == other if isinstance(other, dict) else NotImplemented
+
+    def __repr__(self) -> str:
+        return f"LazyDict({self._items!r})"
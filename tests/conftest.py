@@ -0,0 +1,25 @@
+import pytest
+from playwright.async_api import Error, async_playwright
+
+# why Chromium could not be launched, the remaining browser tests are skipped without trying again
+_launch_error = None
+
+
+@pytest.fixture
+async def page():
+    """A page of a headless Chromium, the test is skipped if Chromium is not installed"""
+    global _launch_error
+    if _launch_error:
+        pytest.skip(_launch_error)
+
+    async with async_playwright() as playwright:
+        try:
+            browser = await playwright.chromium.launch()
+        except Error as error:
+            _launch_error = f"Chromium is not available ({error.message.splitlines()[0]})"
+            pytest.skip(_launch_error)
+
+        try:
+            yield await browser.new_page()
+        finally:
+            await browser.close()
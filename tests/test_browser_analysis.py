@@ -0,0 +1,46 @@
+import html
+from pathlib import Path
+
+import pytest
+from bs4 import BeautifulSoup
+
+from truffles.tools.list_detector.browser_analysis import score_frame_in_browser
+from truffles.tools.list_detector.strategies.llm_strategy import DetectionOutput, LLMStrategy, score_frame_html
+
+FIXTURES = sorted((Path(__file__).parents[1] / "benchmarks" / "fixtures").glob("*.html"))
+
+
+def list_texts(source: str) -> list:
+    """The first text of the items of the expected list, what the LLM answers"""
+    wrapper = BeautifulSoup(source, "html.parser").select_one("[data-expected-list]")
+    texts = [next(child.stripped_strings, None) for child in wrapper.find_all(recursive=False)]
+    return [text for text in texts if text]
+
+
+@pytest.mark.parametrize("fixture", FIXTURES, ids=lambda path: path.stem)
+async def test_browser_scoring_matches_soup_scoring(page, fixture):
+    source = fixture.read_text(encoding="utf-8")
+    await page.set_content(source)
+    texts = list_texts(source)
+
+    # the soup engine parses the HTML the browser serializes, not the fixture source
+    content = await page.content()
+    for identifiers in (texts[:3], texts, [text.upper() for text in texts[:3]], ["e"], ["no such text"]):
+        browser_scores = await score_frame_in_browser(page.main_frame, identifiers)
+        assert browser_scores == pytest.approx(score_frame_html(content, identifiers)), identifiers
+
+    assert await score_frame_in_browser(page.main_frame, texts[:3])
+
+
+@pytest.mark.parametrize("fixture", FIXTURES, ids=lambda path: path.stem)
+async def test_engines_find_the_same_wrappers_across_frames(page, fixture):
+    source = fixture.read_text(encoding="utf-8")
+    await page.set_content(f'{source}<iframe srcdoc="{html.escape(source)}"></iframe>')
+    assert len(page.frames) == 2
+
+    candidates = [DetectionOutput(selector=text) for text in list_texts(source)[:3]]
+    soup_scores = await LLMStrategy(analysis_engine="soup")._string_to_wrap_selectors(page, candidates)
+    browser_scores = await LLMStrategy(analysis_engine="browser")._string_to_wrap_selectors(page, candidates)
+
+    assert soup_scores
+    assert browser_scores == pytest.approx(soup_scores)
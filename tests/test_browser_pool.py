@@ -0,0 +1,41 @@
+import asyncio
+
+import pytest
+
+from truffles.tasks.browser_pool import BrowserPool
+
+
+def test_pool_is_bound_to_its_event_loop():
+    pool = BrowserPool()
+
+    async def bind():
+        pool._bind_loop()
+
+    asyncio.run(bind())
+    with pytest.raises(RuntimeError, match="different event loop"):
+        asyncio.run(bind())
+
+
+def test_separate_pools_work_across_event_loops():
+    async def bind():
+        async with BrowserPool() as pool:
+            pool._bind_loop()
+            assert pool._loop is asyncio.get_running_loop()
+        assert pool._closed
+
+    asyncio.run(bind())
+    asyncio.run(bind())
+
+
+async def test_closed_pool_refuses_pages():
+    async with BrowserPool() as pool:
+        pass
+
+    with pytest.raises(RuntimeError, match="closed"):
+        async with pool.page():
+            pass
+
+
+def test_invalid_limits():
+    with pytest.raises(ValueError):
+        BrowserPool(max_browsers=0)
@@ -0,0 +1,44 @@
+from collections import Counter
+from pathlib import Path
+
+import pytest
+from bs4 import BeautifulSoup, Tag
+
+from truffles.tools.list_detector.strategies.llm_strategy import find_candidate_elements
+from truffles.tools.list_detector.utils import (
+    count_common_ancestor_attributes,
+    find_lowest_common_ancestor,
+    get_attr_list,
+)
+
+FIXTURES = sorted((Path(__file__).parents[1] / "benchmarks" / "fixtures").glob("*.html"))
+
+
+def pairwise_attribute_counts(element_candidates) -> Counter:
+    """The previous implementation, the attributes of the lowest common ancestor of every ordered pair"""
+    attrs = []
+    for el1, _ in element_candidates:
+        for el2, _ in element_candidates:
+            common_ancestor = find_lowest_common_ancestor(el1, el2)
+            if isinstance(common_ancestor, Tag):
+                attrs.extend(get_attr_list(common_ancestor))
+    return Counter(attrs)
+
+
+def list_texts(soup: BeautifulSoup) -> list:
+    """The first text of the items of the expected list, what the LLM answers"""
+    wrapper = soup.select_one("[data-expected-list]")
+    texts = [next(child.stripped_strings, None) for child in wrapper.find_all(recursive=False)]
+    return [text for text in texts if text]
+
+
+@pytest.mark.parametrize("fixture", FIXTURES, ids=lambda path: path.stem)
+def test_linear_scoring_matches_pairwise_scoring(fixture):
+    soup = BeautifulSoup(fixture.read_text(encoding="utf-8"), "html.parser")
+
+    candidates = find_candidate_elements(soup, list_texts(soup)[:3])
+    assert candidates
+    assert count_common_ancestor_attributes(candidates, get_attr_list) == pairwise_attribute_counts(candidates)
+
+    all_strings = [(string, id(string)) for string in soup.find_all(string=True)]
+    assert count_common_ancestor_attributes(all_strings, get_attr_list) == pairwise_attribute_counts(all_strings)
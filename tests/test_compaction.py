@@ -0,0 +1,67 @@
+import pytest
+
+from truffles.tools.structure_locator import compaction
+from truffles.tools.structure_locator.compaction import compact_text, count_tokens, load_encoding
+
+ORDER = """
+    Order   #1234
+
+    1 x  Coffee beans
+    1 x  Coffee beans
+    Add to cart
+"""
+
+
+@pytest.fixture
+def no_tokenizer(monkeypatch):
+    monkeypatch.setattr(compaction, "_get_encoding", lambda: None)
+
+
+def test_collapses_whitespace_and_keeps_repeated_rows():
+    text, stats = compact_text(ORDER)
+
+    assert text == "Order #1234\n1 x Coffee beans\n1 x Coffee beans\nAdd to cart"
+    assert stats.raw_chars == len(ORDER)
+    assert stats.chars == len(text)
+    assert not stats.truncated
+
+
+def test_dedupe_lines_is_opt_in():
+    text, _ = compact_text(ORDER, dedupe_lines=True)
+
+    assert text == "Order #1234\n1 x Coffee beans\nAdd to cart"
+
+
+def test_empty_text():
+    assert compact_text(None) == ("", compaction.TextStats(raw_chars=0, chars=0, tokens=0, truncated=False))
+
+
+def test_character_limit():
+    text, stats = compact_text("abcdef\nghij", max_tokens=None, max_chars=4)
+
+    assert text == "abcd"
+    assert stats.truncated
+
+
+def test_token_budget_without_tokenizer(no_tokenizer):
+    text, stats = compact_text("word " * 100, max_tokens=10)
+
+    assert text == ("word " * 100)[:40]
+    assert stats.tokens == 10
+    assert stats.truncated
+    assert count_tokens("abcde") == 2
+
+
+async def test_load_encoding_loads_once(monkeypatch):
+    calls = []
+
+    def get_encoding():
+        calls.append(1)
+        return None
+
+    cached = compaction.lru_cache(maxsize=1)(get_encoding)
+    monkeypatch.setattr(compaction, "_get_encoding", cached)
+
+    await load_encoding()
+    await load_encoding()
+    assert calls == [1]
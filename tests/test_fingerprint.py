@@ -0,0 +1,115 @@
+import hashlib
+
+import pytest
+
+from truffles.context import MemoryContextStore, PageKey, SimpleMarker
+from truffles.context.exceptions import ContextError
+from truffles.context.fingerprint import (
+    SimHashIndex,
+    hamming_distance,
+    page_key_from_html,
+    page_skeleton,
+    simhash,
+    skeleton_digest,
+)
+
+PAGE = '<html><body><ul class="products"><li class="card">a</li><li class="card">b</li></ul></body></html>'
+
+
+def test_skeleton_ignores_text_and_volatile_tokens():
+    reloaded = (
+        '<html><body><ul class="products css-1a2b3c4d5e"><li class="card">c</li><li class="card" id="item-12345">'
+        "d</li></ul><script>window.csrf = 'abc';</script></body></html>"
+    )
+    assert page_skeleton(reloaded) == page_skeleton(PAGE)
+
+    assert page_skeleton(PAGE) == {
+        "|html",
+        "html|body",
+        "html/body|ul.products",
+        "html/body/ul|li.card",
+    }
+
+
+def test_skeleton_keeps_value_attributes_and_attribute_names():
+    skeleton = page_skeleton('<div role="list" data-x="1"><input type="text" value="a" /><br></div>')
+
+    assert skeleton == {"|div[data-x,role=list]", "div|input[type=text,value]", "div|br"}
+
+
+def test_skeleton_recovers_from_unclosed_and_stray_tags():
+    skeleton = page_skeleton("<div><p>unclosed</div></span><section></section>")
+
+    assert skeleton == {"|div", "div|p", "|section"}
+
+
+def test_simhash_of_similar_skeletons_is_close():
+    sections = [f"html/body/main|section.s{i}" for i in range(40)]
+    base = simhash(sections)
+
+    assert hamming_distance(base, simhash(sections + ["html/body|nav"])) < 16
+    assert hamming_distance(base, simhash(sections[:20])) > hamming_distance(base, simhash(sections[:39]))
+
+
+def test_simhash_index_finds_the_closest_key():
+    index = SimHashIndex(max_distance=3)
+    index.add("a", 0b0000)
+    index.add("b", 0b0111)
+
+    assert index.query(0b0001) == "a"
+    assert index.query(0b1111) == "b"
+    assert index.query(0b1111 << 40 | 0b1111 << 20) is None
+
+
+def test_simhash_index_remove_and_readd():
+    index = SimHashIndex(max_distance=2)
+    index.add("a", 1)
+    index.add("a", 0b111 << 50)
+
+    assert len(index) == 1
+    assert index.query(1) is None
+    assert index.query(0b111 << 50) == "a"
+
+    index.remove("a")
+    index.remove("missing")
+    assert "a" not in index
+    assert index.query(0b111 << 50) is None
+    assert all(not buckets for buckets in index._buckets)
+
+
+def test_simhash_index_validates_the_distance():
+    with pytest.raises(ValueError):
+        SimHashIndex(max_distance=64)
+
+
+def test_page_key_from_html_matches_the_store_keys():
+    exact = page_key_from_html(PAGE)
+    assert exact == hashlib.sha256(PAGE.encode("utf-8")).hexdigest()
+    assert (exact.fingerprint_mode, exact.simhash) == ("exact", None)
+
+    structural = page_key_from_html(PAGE, "structural", with_simhash=True)
+    assert structural == skeleton_digest(page_skeleton(PAGE))
+    assert structural.simhash == simhash(page_skeleton(PAGE))
+
+
+def test_page_key_validates_the_fingerprint_mode():
+    with pytest.raises(ValueError):
+        PageKey("key", "fuzzy")
+
+
+async def test_stores_use_a_page_key_as_is():
+    store = MemoryContextStore(fingerprint_mode="structural")
+    marker = SimpleMarker(selector=".products")
+
+    await store.store_marker(page_key_from_html(PAGE, "structural"), "list_detector", marker)
+    assert await store.get_marker(PAGE.replace(">a<", ">c<"), "list_detector") == marker
+
+    with pytest.raises(ContextError):
+        await store.get_marker(page_key_from_html(PAGE), "list_detector")
+
+
+def test_noscript_content_is_not_part_of_the_skeleton():
+    # with scripting enabled, browsers parse the content of <noscript> as text
+    with_noscript = PAGE.replace("<body>", '<body><noscript><iframe src="/pixel"></iframe></noscript>')
+
+    assert page_skeleton(with_noscript) == page_skeleton(PAGE)
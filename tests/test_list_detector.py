@@ -0,0 +1,115 @@
+import time
+from typing import Optional
+
+import pytest
+from playwright.async_api import Page
+
+from truffles.context import MemoryContextStore, PageKey, SimpleMarker, StoreManager
+from truffles.enhanced.page import TPage
+from truffles.tools.list_detector import list_detector
+from truffles.tools.list_detector.list_detector import DetectionRecord, ListDetector
+
+
+class _FakePageImpl:
+    _loop = None
+
+
+class FakePage(Page):
+    def __init__(self):
+        super().__init__(_FakePageImpl())
+
+
+@pytest.fixture(autouse=True)
+def store(monkeypatch):
+    async def compute_page_key(page, fingerprint_mode, with_simhash=False):
+        return PageKey("page", fingerprint_mode)
+
+    monkeypatch.setattr(list_detector, "compute_page_key", compute_page_key)
+    StoreManager.initialize(MemoryContextStore())
+    ListDetector.reset_stage_stats()
+    yield
+    StoreManager.reset()
+    ListDetector.reset_stage_stats()
+
+
+def detector(monkeypatch, items: list, llm_items: Optional[list] = None) -> ListDetector:
+    """The statistical marker selects `items`, the LLM marker `llm_items`, both with a confidence of 0.9"""
+    page = TPage(FakePage())
+    tool = page.tools.get_tool("get_main_list")
+
+    async def detect_list(strategy, **kwargs):
+        tool._record_stage(strategy, time.perf_counter())
+        tool.last_confidence = 0.9
+        tool.last_detection = DetectionRecord(strategy, 0.0, 0.9)
+        return SimpleMarker(selector=f".{strategy}")
+
+    async def get_marker_list(marker):
+        return (llm_items if marker.get_selector() == ".llm" else items), "li.card"
+
+    monkeypatch.setattr(tool, "_detect_list", detect_list)
+    monkeypatch.setattr(tool, "_get_marker_list", get_marker_list)
+    return tool
+
+
+def test_get_tool_returns_the_instance_the_calls_run_on():
+    page = TPage(FakePage())
+
+    tool = page.tools.get_tool("get_main_list")
+    assert isinstance(tool, ListDetector)
+    assert page.tools.get_tool("get_main_list") is tool
+
+    with pytest.raises(AttributeError):
+        page.tools.get_tool("missing")
+
+
+async def test_detection_is_accepted_once_items_are_found(monkeypatch):
+    tool = detector(monkeypatch, ["item"] * 3)
+
+    assert await tool.execute(strategy="statistical") == ["item"] * 3
+    assert tool.last_detection.stage == "statistical"
+    assert ListDetector.get_stage_stats()["statistical"].accepted == 1
+    assert ListDetector.get_stage_stats()["cache"].accepted == 0
+
+    # the stored marker is reused
+    assert await tool.execute(strategy="statistical") == ["item"] * 3
+    assert tool.last_detection.stage == "cache"
+    assert ListDetector.get_stage_stats()["cache"].accepted == 1
+
+
+async def test_detection_without_items_is_not_accepted(monkeypatch):
+    tool = detector(monkeypatch, [])
+
+    assert await tool.execute(strategy="statistical") == []
+    stats = ListDetector.get_stage_stats()["statistical"]
+    assert (stats.attempts, stats.accepted) == (1, 0)
+    assert await StoreManager.get_marker(PageKey("page"), "list_detector") is None
+
+
+async def test_cascade_escalates_when_the_statistical_list_has_no_items(monkeypatch):
+    tool = detector(monkeypatch, [], llm_items=["item"] * 2)
+
+    assert await tool.execute(strategy="cascade") == ["item"] * 2
+    assert tool.last_detection.stage == "llm"
+    stats = ListDetector.get_stage_stats()
+    assert (stats["statistical"].attempts, stats["statistical"].accepted) == (1, 0)
+    assert (stats["llm"].attempts, stats["llm"].accepted) == (1, 1)
+
+    marker = await StoreManager.get_marker(PageKey("page"), "list_detector")
+    assert marker.get_selector() == ".llm"
+
+
+async def test_cascade_keeps_a_confident_statistical_list(monkeypatch):
+    tool = detector(monkeypatch, ["item"] * 3, llm_items=["item"] * 2)
+
+    assert await tool.execute(strategy="cascade") == ["item"] * 3
+    assert tool.last_detection.stage == "statistical"
+    assert "llm" not in ListDetector.get_stage_stats()
+
+
+async def test_cascade_is_empty_only_when_both_stages_find_no_items(monkeypatch):
+    tool = detector(monkeypatch, [], llm_items=[])
+
+    assert await tool.execute(strategy="cascade") == []
+    stats = ListDetector.get_stage_stats()
+    assert (stats["statistical"].attempts, stats["llm"].attempts) == (1, 1)
+    assert await StoreManager.get_marker(PageKey("page"), "list_detector") is None
@@ -0,0 +1,102 @@
+import asyncio
+import gc
+from types import SimpleNamespace
+
+import pytest
+from playwright.async_api import Page
+from pydantic import BaseModel
+
+from truffles.enhanced.page import TPage
+from truffles.tasks.listing_task import ListingTask
+
+
+class Item(BaseModel):
+    title: str
+
+
+class _FakePageImpl:
+    _loop = None
+
+
+class FakePage(Page):
+    def __init__(self):
+        super().__init__(_FakePageImpl())
+
+
+def fake_locator(index: int, running: list):
+    async def to_structure(schema):
+        running.append(index)
+        await asyncio.sleep(0.01 * (3 - index % 3))
+        running.remove(index)
+        return schema(title=f"item {index}")
+
+    return SimpleNamespace(tools=SimpleNamespace(to_structure=to_structure))
+
+
+def listing_task(main_list) -> ListingTask:
+    async def get_main_list():
+        return main_list
+
+    task = ListingTask(TPage(FakePage()), Item)
+    task.page = SimpleNamespace(tools=SimpleNamespace(get_main_list=get_main_list))
+    return task
+
+
+async def test_no_list_detected():
+    task = listing_task(None)
+
+    assert await task.run() == []
+    assert [result async for result in task.stream()] == []
+
+
+async def test_stream_yields_every_item_with_its_index():
+    running = []
+    peak = []
+    locators = [fake_locator(index, running) for index in range(7)]
+    task = listing_task(locators)
+
+    results = []
+    async for index, result in task.stream(max_concurrency=3):
+        peak.append(len(running))
+        results.append((index, result))
+
+    assert sorted(results, key=lambda pair: pair[0]) == [(index, Item(title=f"item {index}")) for index in range(7)]
+    assert max(peak) <= 3
+    assert await task.run() == [Item(title=f"item {index}") for index in range(7)]
+
+
+async def test_stream_validates_max_concurrency():
+    with pytest.raises(ValueError):
+        async for _ in listing_task([]).stream(max_concurrency=0):
+            pass
+
+
+async def test_closing_the_stream_cancels_items_in_flight(caplog):
+    started = []
+    cancelled = []
+
+    def blocking_locator(index: int):
+        async def to_structure(schema):
+            if index == 0:
+                return schema(title="item 0")
+            started.append(index)
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                cancelled.append(index)
+                raise
+
+        return SimpleNamespace(tools=SimpleNamespace(to_structure=to_structure))
+
+    stream = listing_task([blocking_locator(index) for index in range(5)]).stream(max_concurrency=3)
+    async for first in stream:
+        break
+    await stream.aclose()
+
+    assert first == (0, Item(title="item 0"))
+    assert started == cancelled == [1, 2]
+    assert asyncio.all_tasks() == {asyncio.current_task()}
+
+    gc.collect()
+    await asyncio.sleep(0)
+    assert not [record for record in caplog.records if "destroyed but it is pending" in record.getMessage()]
@@ -0,0 +1,46 @@
+from concurrent.futures import Executor, Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from truffles.tools.list_detector.strategies.llm_strategy import LLMStrategy, score_frame_html
+
+HTML = (
+    '<html><body><div class="grid">'
+    + "".join(f'<div class="card"><h2>Product {i}</h2></div>' for i in range(5))
+    + "</div></body></html>"
+)
+IDENTIFIERS = ["Product 1", "Product 3"]
+
+
+class BrokenExecutor(Executor):
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        future.set_exception(BrokenProcessPool("a worker died"))
+        return future
+
+
+@pytest.fixture(autouse=True)
+def reset_parse_executor():
+    yield
+    executor = LLMStrategy.get_parse_executor()
+    LLMStrategy.set_parse_executor(None)
+    if executor is not None:
+        executor.shutdown()
+
+
+def test_score_frame_html_scores_the_common_ancestor():
+    scores = score_frame_html(HTML, IDENTIFIERS)
+    assert max(scores, key=scores.get) == ("class", "grid")
+
+
+async def test_parses_in_a_worker_thread_by_default():
+    assert LLMStrategy.get_parse_executor() is None
+    assert await LLMStrategy._score_frames([HTML, HTML], IDENTIFIERS) == [score_frame_html(HTML, IDENTIFIERS)] * 2
+
+
+async def test_broken_process_pool_is_replaced():
+    LLMStrategy.set_parse_executor(BrokenExecutor())
+
+    assert await LLMStrategy._score_frames([HTML], IDENTIFIERS) == [score_frame_html(HTML, IDENTIFIERS)]
+    assert not isinstance(LLMStrategy.get_parse_executor(), BrokenExecutor)
@@ -0,0 +1,102 @@
+import pytest
+
+from truffles.context import CacheStats, MemoryContextStore, SimpleMarker, lru
+from truffles.context.lru import LRUStore
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeTime()
+    monkeypatch.setattr(lru, "time", clock)
+    return clock
+
+
+def test_evicts_least_recently_used_entry():
+    stats = CacheStats()
+    evicted = []
+    store = LRUStore(stats, max_entries=2, on_evict=evicted.append)
+
+    store.set("a", {"n": 1})
+    store.set("b", {"n": 2})
+    store.get("a")
+    store.set("c", {"n": 3})
+
+    assert list(store) == ["a", "c"]
+    assert evicted == ["b"]
+    assert stats.evictions == 1
+
+
+def test_evicts_over_max_bytes_but_keeps_the_new_entry():
+    store = LRUStore(CacheStats(), max_bytes=30)
+
+    store.set("a", {"value": "x" * 10})
+    store.set("b", {"value": "y" * 10})
+    assert list(store) == ["b"]
+
+    store.set("c", {"value": "z" * 100})
+    assert list(store) == ["c"]
+
+
+def test_entries_expire_after_ttl(clock):
+    stats = CacheStats()
+    store = LRUStore(stats, ttl=10)
+
+    store.set("a", {"n": 1})
+    clock.now = 9
+    assert store.get("a") == {"n": 1}
+
+    clock.now = 10
+    assert store.get("a") is None
+    assert len(store) == 0
+    assert stats.evictions == 1
+
+
+def test_replace_keeps_expiry_and_order(clock):
+    store = LRUStore(CacheStats(), ttl=10, max_bytes=1000)
+    store.set("a", {"n": 1})
+    store.set("b", {"n": 2})
+
+    clock.now = 5
+    store.replace("a", {"n": 10})
+    store.replace("missing", {"n": 3})
+
+    assert list(store) == ["a", "b"]
+    assert "missing" not in store.to_dict()
+    clock.now = 10
+    assert store.get("a") is None
+
+
+async def test_remove_marker_does_not_refresh_the_other_markers(clock):
+    store = MemoryContextStore(ttl=10)
+    list_marker = SimpleMarker(selector=".list")
+    item_marker = SimpleMarker(selector=".item")
+    await store.store_marker("<html></html>", "list", list_marker)
+    await store.store_marker("<html></html>", "item", item_marker)
+
+    clock.now = 5
+    await store.remove_marker("<html></html>", "list", list_marker)
+    assert await store.get_marker("<html></html>", "list") is None
+    assert await store.get_marker("<html></html>", "item") == item_marker
+
+    clock.now = 10
+    assert await store.get_marker("<html></html>", "item") is None
+
+
+async def test_remove_marker_keeps_a_marker_id_of_another_marker():
+    store = MemoryContextStore()
+    marker = SimpleMarker(selector=".list")
+    await store.store_marker("<html></html>", "list", marker, marker_id="products")
+
+    await store.remove_marker("<html></html>", "list", SimpleMarker(selector=".other"), marker_id="products")
+    assert await store.get_marker("<p>other page</p>", "list", marker_id="products") == marker
+
+    await store.remove_marker("<html></html>", "list", marker, marker_id="products")
+    assert await store.get_marker("<p>other page</p>", "list", marker_id="products") is None
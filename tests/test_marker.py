@@ -0,0 +1,53 @@
+from truffles.context import MarkerValidation, MemoryContextStore, SimpleMarker
+from truffles.context.marker import marker_from_dict
+from truffles.tools.list_detector.browser_analysis import PAGE_KEY_JS, SCORE_REPEATING_GROUPS_JS, WRAPPER_CHILDREN_JS
+
+SECTIONS = "".join(f'<section class="section-{name}"><h2>{name}</h2><p>text</p></section>' for name in "abcdefghij")
+PAGE = f'<html><body><nav class="menu"></nav><main class="products">{SECTIONS}</main></body></html>'
+NEAR_DUPLICATE_PAGE = PAGE.replace('<nav class="menu"></nav>', '<nav class="menu"><span class="badge"></span></nav>')
+
+
+def test_validation_range_from_list():
+    validation = MarkerValidation.from_list(10, "li.card")
+
+    assert (validation.min_items, validation.max_items) == (3, 40)
+    assert MarkerValidation.from_list(1, None).min_items == 1
+
+
+def test_validation_matches_count_and_signature():
+    validation = MarkerValidation.from_list(10, "li.card")
+
+    assert validation.matches(10, "li.card")
+    assert validation.matches(3, "li.card")
+    assert not validation.matches(2, "li.card")
+    assert not validation.matches(41, "li.card")
+    assert not validation.matches(10, "div.row")
+    assert MarkerValidation.from_list(10, None).matches(10, "div.row")
+
+
+def test_validation_round_trips_with_the_marker():
+    marker = SimpleMarker(selector=".card", validation=MarkerValidation.from_list(10, "li.card"))
+    assert marker_from_dict(marker.to_dict()) == marker
+
+    # markers stored before the validation was added
+    assert marker_from_dict({"type": "simple", "selector": ".card", "selector_type": "css"}).validation is None
+
+
+async def test_remove_marker_evicts_the_near_duplicate_entry_it_was_found_under():
+    store = MemoryContextStore(fingerprint_mode="structural", near_duplicate_distance=16)
+    marker = SimpleMarker(selector=".products")
+    await store.store_marker(PAGE, "list_detector", marker)
+
+    cached_marker = await store.get_marker(NEAR_DUPLICATE_PAGE, "list_detector")
+    assert cached_marker == marker
+    assert cached_marker.page_key != store._page_keys(NEAR_DUPLICATE_PAGE)[0]
+
+    await store.remove_marker(NEAR_DUPLICATE_PAGE, "list_detector", cached_marker)
+    assert await store.get_marker(PAGE, "list_detector") is None
+    assert await store.get_marker(NEAR_DUPLICATE_PAGE, "list_detector") is None
+
+
+def test_scripts_share_the_volatile_token_pattern():
+    for script in (SCORE_REPEATING_GROUPS_JS, WRAPPER_CHILDREN_JS, PAGE_KEY_JS):
+        assert "/\\d{3,}|[0-9a-f]{8,}/;" in script
+        assert "__VOLATILE_TOKEN__" not in script
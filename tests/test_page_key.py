@@ -0,0 +1,47 @@
+import pytest
+
+from truffles.context.fingerprint import page_key_from_html
+from truffles.tools.list_detector.browser_analysis import compute_page_key
+
+ITEM = '<li class="card item-{id}" data-id="{id}"><a href="/p/{id}">{name}</a><span>{price} EUR</span></li>'
+
+
+def listing(names, extra: str = "") -> str:
+    items = "".join(ITEM.format(id=4711 + index, name=name, price=9.99 + index) for index, name in enumerate(names))
+    return (
+        f'<main><h1>{names[0]} and more</h1>{extra}<ul class="grid">{items}</ul>'
+        f"<noscript><p>Enable JavaScript to see {names[-1]}</p></noscript></main>"
+    )
+
+
+SHOES = listing(["Red shoe", "Blue shoe", "Green shoe"])
+BOOTS = listing(["Winter boot", "Rain boot", "Hiking boot", "Ankle boot"])
+WITH_BANNER = listing(["Red shoe", "Blue shoe", "Green shoe"], extra='<div class="banner"><img src="/a.png"></div>')
+
+
+async def key_of(page, html: str, fingerprint_mode: str, with_simhash: bool = False):
+    await page.set_content(html)
+    return await compute_page_key(page, fingerprint_mode, with_simhash=with_simhash)
+
+
+async def test_structural_key_ignores_text_and_volatile_tokens(page):
+    shoes = await key_of(page, SHOES, "structural")
+
+    assert shoes == await key_of(page, BOOTS, "structural")
+    assert shoes != await key_of(page, WITH_BANNER, "structural")
+    assert shoes.fingerprint_mode == "structural"
+
+
+async def test_exact_key_changes_with_the_text(page):
+    assert await key_of(page, SHOES, "exact") != await key_of(page, BOOTS, "exact")
+
+
+@pytest.mark.parametrize("fingerprint_mode", ["exact", "structural"])
+@pytest.mark.parametrize("html", [SHOES, WITH_BANNER], ids=["listing", "banner"])
+async def test_browser_key_matches_the_python_key(page, html, fingerprint_mode):
+    key = await key_of(page, html, fingerprint_mode, with_simhash=True)
+
+    outer_html = await page.evaluate("document.documentElement.outerHTML")
+    expected = page_key_from_html(outer_html, fingerprint_mode, with_simhash=True)
+    assert key == expected
+    assert key.simhash == expected.simhash
@@ -0,0 +1,145 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import HumanMessage
+from langchain_core.runnables import RunnableLambda
+
+from truffles.models.exceptions import LLMQueueFullError
+from truffles.models.scheduler import ModelScheduler, RateLimit, TokenBucket
+
+MESSAGES = [HumanMessage(content="hello")]
+
+
+class RateLimitError(Exception):
+    """Looks like the rate limit errors of the provider SDKs"""
+
+    def __init__(self, retry_after: str):
+        super().__init__("429 Too Many Requests")
+        self.status_code = 429
+        self.response = SimpleNamespace(headers={"retry-after": retry_after})
+
+
+@pytest.fixture(autouse=True)
+def reset_scheduler():
+    ModelScheduler.reset()
+    yield
+    ModelScheduler.reset()
+
+
+@pytest.fixture
+def model():
+    return FakeListChatModel(responses=["done"])
+
+
+async def test_passes_calls_through_without_limits(model):
+    result = await ModelScheduler.ainvoke(model, model, MESSAGES)
+
+    assert result.content == "done"
+    assert ModelScheduler.get_stats() == {}
+
+
+async def test_max_concurrency(model):
+    ModelScheduler.initialize(limits={"FakeListChatModel": RateLimit(max_concurrency=2)})
+    running, peak = 0, 0
+
+    async def call(messages):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return "done"
+
+    results = await asyncio.gather(*[ModelScheduler.ainvoke(model, RunnableLambda(call), MESSAGES) for _ in range(6)])
+
+    assert results == ["done"] * 6
+    assert peak == 2
+    stats = ModelScheduler.get_stats()["FakeListChatModel"]
+    assert stats.completed == 6
+    assert stats.in_flight == 0 and stats.queue_depth == 0
+
+
+async def test_rate_limit_error_pauses_and_retries(model):
+    ModelScheduler.initialize(default_limit=RateLimit(max_rate_limit_retries=2))
+    attempts = []
+
+    async def call(messages):
+        attempts.append(time.monotonic())
+        if len(attempts) == 1:
+            raise RateLimitError(retry_after="0.05")
+        return "done"
+
+    assert await ModelScheduler.ainvoke(model, RunnableLambda(call), MESSAGES) == "done"
+
+    assert len(attempts) == 2
+    assert attempts[1] - attempts[0] >= 0.05
+    stats = ModelScheduler.get_stats()[ModelScheduler.model_key(model)]
+    assert stats.rate_limited == 1
+    assert stats.completed == 2
+
+
+async def test_rate_limit_error_is_raised_after_the_retries(model):
+    ModelScheduler.initialize(default_limit=RateLimit(max_rate_limit_retries=1))
+
+    async def call(messages):
+        raise RateLimitError(retry_after="0")
+
+    with pytest.raises(RateLimitError):
+        await ModelScheduler.ainvoke(model, RunnableLambda(call), MESSAGES)
+
+
+async def test_other_errors_are_not_retried(model):
+    ModelScheduler.initialize(default_limit=RateLimit())
+    attempts = []
+
+    async def call(messages):
+        attempts.append(1)
+        raise ValueError("invalid output")
+
+    with pytest.raises(ValueError):
+        await ModelScheduler.ainvoke(model, RunnableLambda(call), MESSAGES)
+    assert len(attempts) == 1
+
+
+async def test_full_queue_rejects_calls(model):
+    ModelScheduler.initialize(default_limit=RateLimit(max_concurrency=1, max_queue_size=1))
+    release = asyncio.Event()
+
+    async def call(messages):
+        await release.wait()
+        return "done"
+
+    running = asyncio.ensure_future(ModelScheduler.ainvoke(model, RunnableLambda(call), MESSAGES))
+    queued = asyncio.ensure_future(ModelScheduler.ainvoke(model, RunnableLambda(call), MESSAGES))
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(LLMQueueFullError):
+        await ModelScheduler.ainvoke(model, RunnableLambda(call), MESSAGES)
+
+    release.set()
+    assert await asyncio.gather(running, queued) == ["done", "done"]
+    assert ModelScheduler.get_stats()[ModelScheduler.model_key(model)].rejected == 1
+
+
+async def test_token_bucket_spaces_requests():
+    bucket = TokenBucket(rate_per_minute=1200, capacity=1)  # one request per 50 ms
+
+    start = time.monotonic()
+    for _ in range(3):
+        await bucket.acquire()
+
+    assert time.monotonic() - start >= 0.09
+
+
+def test_limits_work_across_event_loops(model):
+    ModelScheduler.initialize(default_limit=RateLimit(max_concurrency=1, requests_per_minute=6000))
+
+    async def run():
+        return await asyncio.gather(*[ModelScheduler.ainvoke(model, model, MESSAGES) for _ in range(3)])
+
+    for _ in range(2):
+        assert [result.content for result in asyncio.run(run())] == ["done"] * 3
+    assert ModelScheduler.get_stats()[ModelScheduler.model_key(model)].completed == 6
@@ -0,0 +1,64 @@
+import io
+
+from PIL import Image
+
+from truffles.tools.list_detector.screenshot import ScreenshotConfig, capture_screenshot
+
+RED, BLUE, GREEN = (255, 0, 0), (0, 0, 255), (0, 128, 0)
+
+# 600 pixels wide and 3000 long, the capture is the upper 1200 pixels: red, then blue from 1000 on
+BANDS = """
+<style>html, body { margin: 0; } div { width: 600px; }</style>
+<div style="height: 1000px; background: rgb(255, 0, 0)"></div>
+<div style="height: 1000px; background: rgb(0, 0, 255)"></div>
+<div style="height: 1000px; background: rgb(0, 128, 0)"></div>
+"""
+
+
+async def show_bands(page):
+    await page.set_viewport_size({"width": 600, "height": 400})
+    await page.set_content(BANDS)
+
+
+def close_to(pixel, color, tolerance: int = 8) -> bool:
+    return all(abs(a - b) <= tolerance for a, b in zip(pixel, color))
+
+
+async def test_captures_the_upper_region_of_the_page(page):
+    await show_bands(page)
+
+    image_bytes, stats = await capture_screenshot(page, ScreenshotConfig(max_side=None))
+
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        assert image.format == "PNG"
+        assert image.size == (stats.width, stats.height) == (600, 1200)
+        image = image.convert("RGB")
+        assert close_to(image.getpixel((300, 10)), RED)
+        assert close_to(image.getpixel((300, 990)), RED)
+        assert close_to(image.getpixel((300, 1010)), BLUE)
+        # the region ends before the green band
+        assert close_to(image.getpixel((300, 1199)), BLUE)
+
+        # the same pixels the full page screenshot has in that region
+        with Image.open(io.BytesIO(await page.screenshot(full_page=True))) as full_page:
+            region = full_page.convert("RGB").crop((0, 0, 600, 1200))
+        assert list(region.getdata()) == list(image.getdata())
+
+    assert stats.bytes == len(image_bytes)
+
+
+async def test_scales_down_and_encodes(page, tmp_path):
+    await show_bands(page)
+
+    image_bytes, stats = await capture_screenshot(page, ScreenshotConfig(format="jpeg", quality=50, max_side=600))
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        assert image.format == "JPEG"
+        assert image.size == (stats.width, stats.height) == (300, 600)
+        assert close_to(image.convert("RGB").getpixel((150, 100)), RED, tolerance=24)
+
+    debug_path = tmp_path / "screenshots" / "list.webp"
+    image_bytes, stats = await capture_screenshot(page, ScreenshotConfig(format="webp", debug_path=str(debug_path)))
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        assert image.format == "WEBP"
+        assert image.size == (600, 1200)
+    assert debug_path.read_bytes() == image_bytes
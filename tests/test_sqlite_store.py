@@ -0,0 +1,80 @@
+import sqlite3
+
+from truffles.context import AttributeMarker, MemoryContextStore, SimpleMarker, SQLiteContextStore
+
+PAGE = "<html><body><ul><li>a</li></ul></body></html>"
+
+
+def stored_rows(path) -> int:
+    connection = sqlite3.connect(path)
+    try:
+        return connection.execute("SELECT COUNT(*) FROM markers").fetchone()[0]
+    finally:
+        connection.close()
+
+
+async def test_round_trip(tmp_path):
+    marker = AttributeMarker(attribute_dict={"class": "product"}, match_mode="contains")
+
+    async with SQLiteContextStore(str(tmp_path / "markers.db")) as store:
+        await store.store_marker(PAGE, "list", marker, marker_id="products")
+        assert await store.get_marker(PAGE, "list") == marker
+        assert await store.get_marker("<p>other page</p>", "list", marker_id="products") == marker
+        assert await store.get_marker(PAGE, "items") is None
+
+    async with SQLiteContextStore(str(tmp_path / "markers.db")) as store:
+        assert await store.get_marker(PAGE, "list") == marker
+
+
+async def test_writes_are_batched_until_flush(tmp_path):
+    path = str(tmp_path / "markers.db")
+    store = SQLiteContextStore(path, batch_size=3)
+
+    await store.store_marker(PAGE, "list", SimpleMarker(selector=".list"))
+    await store.store_marker(PAGE, "item", SimpleMarker(selector=".item"))
+    assert stored_rows(path) == 0
+    assert await store.get_marker(PAGE, "item") == SimpleMarker(selector=".item")
+
+    await store.store_marker(PAGE, "title", SimpleMarker(selector=".title"))
+    assert stored_rows(path) == 3
+
+    await store.store_marker(PAGE, "price", SimpleMarker(selector=".price"))
+    store.flush()
+    assert stored_rows(path) == 4
+    store.close()
+
+
+async def test_context_manager_commits_pending_writes(tmp_path):
+    path = str(tmp_path / "markers.db")
+
+    async with SQLiteContextStore(path) as store:
+        await store.store_marker(PAGE, "list", SimpleMarker(selector=".list"))
+        assert stored_rows(path) == 0
+
+    assert stored_rows(path) == 1
+
+
+async def test_remove_marker_only_removes_matching_markers(tmp_path):
+    marker = SimpleMarker(selector=".list")
+
+    async with SQLiteContextStore(str(tmp_path / "markers.db")) as store:
+        await store.store_marker(PAGE, "list", marker, marker_id="products")
+
+        await store.remove_marker(PAGE, "list", SimpleMarker(selector=".other"), marker_id="products")
+        assert await store.get_marker(PAGE, "list") == marker
+        assert await store.get_marker("<p>other page</p>", "list", marker_id="products") == marker
+
+        await store.remove_marker(PAGE, "list", marker, marker_id="products")
+        assert await store.get_marker(PAGE, "list") is None
+        assert await store.get_marker("<p>other page</p>", "list", marker_id="products") is None
+
+
+async def test_load_memory_store_dump(tmp_path):
+    marker = SimpleMarker(selector=".list")
+    memory_store = MemoryContextStore(fingerprint_mode="structural")
+    await memory_store.store_marker(PAGE, "list", marker, marker_id="products")
+
+    async with SQLiteContextStore(str(tmp_path / "markers.db"), fingerprint_mode="structural") as store:
+        store.load_json(memory_store.to_json())
+        assert await store.get_marker(PAGE.replace(">a<", ">b<"), "list") == marker
+        assert await store.get_marker("<p>other page</p>", "list", marker_id="products") == marker
@@ -0,0 +1,45 @@
+from pathlib import Path
+
+import pytest
+
+import truffles
+from truffles.context import MemoryContextStore, StoreManager
+from truffles.tools.list_detector.strategies.statistical_strategy import StatisticalStrategy
+
+FIXTURES = sorted((Path(__file__).parents[1] / "benchmarks" / "fixtures").glob("*.html"))
+
+IS_EXPECTED_JS = "elements => elements.length === 1 && elements[0].hasAttribute('data-expected-list')"
+
+
+@pytest.mark.parametrize("fixture", FIXTURES, ids=lambda path: path.stem)
+async def test_finds_the_expected_list(page, fixture):
+    await page.set_content(fixture.read_text(encoding="utf-8"))
+    strategy = StatisticalStrategy()
+
+    marker = await strategy.detect(page)
+
+    assert marker is not None
+    assert await page.locator(marker.get_selector()).evaluate_all(IS_EXPECTED_JS)
+    assert 3 <= strategy.last_scores["count"] <= await page.locator("[data-expected-list] > *").count()
+    assert 0 < strategy.last_confidence <= 1
+
+
+async def test_page_without_a_list(page):
+    await page.set_content("<main><h1>About us</h1><p>We sell shoes.</p><p>Since 1999.</p></main>")
+    strategy = StatisticalStrategy()
+
+    assert await strategy.detect(page) is None
+    assert strategy.last_confidence is None
+
+
+async def test_list_detector_returns_the_items(page):
+    StoreManager.initialize(MemoryContextStore())
+    try:
+        await page.set_content((FIXTURES[0].parent / "product_grid.html").read_text(encoding="utf-8"))
+        tpage = await truffles.wrap(page)
+
+        items = await tpage.tools.get_main_list(strategy="statistical")
+        assert len(items) == await page.locator("[data-expected-list] > *").count()
+        assert await items[0].evaluate("item => item.parentElement.hasAttribute('data-expected-list')")
+    finally:
+        StoreManager.reset()
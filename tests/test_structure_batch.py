@@ -0,0 +1,124 @@
+from typing import Any, List
+
+import pytest
+from fakes import FakeChatModel, FakeLocator
+from pydantic import BaseModel
+
+from truffles.models import DefaultModel
+from truffles.tools.structure_locator.structure_locator import LocatorToDictTool
+
+
+class Product(BaseModel):
+    title: str
+
+
+class EditingModel(FakeChatModel):
+    """Fake model handing the entries of every batch response to `edit_items` before they are returned"""
+
+    def edit_items(self, items: List[Any]) -> List[Any]:
+        return items
+
+    def _answer(self, schema: Any, messages: List[Any]) -> Any:
+        response = super()._answer(schema, messages)
+        if schema.__name__.endswith("Batch"):
+            response.items = self.edit_items(list(response.items))
+        return response
+
+
+class MissingItemModel(EditingModel):
+    """Leaves out item 1 of every batch"""
+
+    def edit_items(self, items):
+        return [item for item in items if item.index != 1]
+
+
+class DuplicateItemModel(EditingModel):
+    """Answers item 0 a second time and an item that was not asked for"""
+
+    def edit_items(self, items):
+        duplicate = items[0].model_copy(update={"title": "duplicate"})
+        unknown = items[0].model_copy(update={"index": len(items)})
+        return items + [duplicate, unknown]
+
+
+class IrrelevantItemModel(EditingModel):
+    """Flags item 2 of every batch as irrelevant"""
+
+    def edit_items(self, items):
+        return [item.model_copy(update={"is_relevant": item.index != 2}) for item in items]
+
+
+class MalformedBatchModel(FakeChatModel):
+    """Answers every batch with an entry that does not validate"""
+
+    def _answer(self, schema: Any, messages: List[Any]) -> Any:
+        if schema.__name__.endswith("Batch"):
+            self.calls += 1
+            return schema.model_validate({"items": [{"index": "first"}]})
+        return super()._answer(schema, messages)
+
+
+def use_model(model: FakeChatModel) -> FakeChatModel:
+    DefaultModel.initialize(model, size_overrides={"small": model})
+    return model
+
+
+@pytest.fixture(autouse=True)
+def reset_model():
+    yield
+    DefaultModel.reset()
+
+
+def locators(count: int) -> List[FakeLocator]:
+    return [FakeLocator(index) for index in range(count)]
+
+
+def products(count: int) -> List[Product]:
+    return [Product(title=f"item {index}") for index in range(count)]
+
+
+async def test_results_keep_the_order_of_the_locators():
+    model = use_model(FakeChatModel())
+
+    assert await LocatorToDictTool.execute_many(locators(7), Product, batch_size=3) == products(7)
+    assert model.calls == 3
+
+
+async def test_missing_items_are_converted_one_by_one():
+    model = use_model(MissingItemModel())
+
+    # items 1 and 4 are the second item of their batch
+    assert await LocatorToDictTool.execute_many(locators(7), Product, batch_size=3) == products(7)
+    assert model.calls == 3 + 2
+
+
+async def test_duplicate_and_unknown_items_are_ignored():
+    model = use_model(DuplicateItemModel())
+
+    assert await LocatorToDictTool.execute_many(locators(4), Product, batch_size=2) == products(4)
+    assert model.calls == 2
+
+
+async def test_irrelevant_items_are_none():
+    use_model(IrrelevantItemModel())
+
+    results = await LocatorToDictTool.execute_many(locators(4), Product, batch_size=4)
+    assert results == [Product(title="item 0"), Product(title="item 1"), None, Product(title="item 3")]
+
+    # without the relevance filter the flag is not asked for
+    assert await LocatorToDictTool.execute_many(locators(4), Product, batch_size=4, filter_relevance=False) == (
+        products(4)
+    )
+
+
+async def test_malformed_batches_are_converted_one_by_one():
+    model = use_model(MalformedBatchModel())
+
+    assert await LocatorToDictTool.execute_many(locators(5), Product, batch_size=3) == products(5)
+    # each batch is tried twice before its items are converted on their own
+    assert model.calls == 2 * 2 + 5
+
+
+async def test_batch_size_must_be_positive():
+    with pytest.raises(ValueError):
+        await LocatorToDictTool.execute_many(locators(1), Product, batch_size=0)
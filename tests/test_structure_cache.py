@@ -0,0 +1,93 @@
+from typing import List
+
+import pytest
+from pydantic import BaseModel, field_validator
+
+from truffles.tools.structure_locator.cache import (
+    MemoryStructureCache,
+    StructureCacheManager,
+    structure_cache_key,
+)
+
+
+class Product(BaseModel):
+    title: str
+    price: float
+
+
+class ProductWithTags(BaseModel):
+    title: str
+    price: float
+    tags: List[str] = []
+
+
+@pytest.fixture(autouse=True)
+def cache():
+    cache = MemoryStructureCache()
+    StructureCacheManager.initialize(cache)
+    yield cache
+    StructureCacheManager.reset()
+
+
+def test_key_ignores_whitespace_but_not_the_schema_or_options():
+    key = structure_cache_key(Product, False, "small", "Shoe  \n 9.99")
+
+    assert key == structure_cache_key(Product, False, "small", " Shoe 9.99 ")
+    assert key != structure_cache_key(ProductWithTags, False, "small", "Shoe 9.99")
+    assert key != structure_cache_key(Product, True, "small", "Shoe 9.99")
+    assert key != structure_cache_key(Product, False, "large", "Shoe 9.99")
+    assert key != structure_cache_key(Product, False, "small", "Boot 9.99")
+
+
+async def test_stores_and_validates_results(cache):
+    assert await StructureCacheManager.get_result(Product, False, "small", "Shoe 9.99") == (False, None)
+
+    await StructureCacheManager.store_result(Product, False, "small", "Shoe 9.99", Product(title="Shoe", price=9.99))
+    await StructureCacheManager.store_result(Product, True, "small", "Cookie banner", None)
+
+    assert await StructureCacheManager.get_result(Product, False, "small", "Shoe  9.99") == (
+        True,
+        Product(title="Shoe", price=9.99),
+    )
+    # an irrelevant item is a hit without a result
+    assert await StructureCacheManager.get_result(Product, True, "small", "Cookie banner") == (True, None)
+
+    stats = StructureCacheManager.get_stats()
+    assert (stats.hits, stats.misses, stats.entries) == (2, 1, 2)
+
+
+async def test_invalid_entries_are_removed(cache):
+    class StrictProduct(BaseModel):
+        title: str
+        price: float
+
+        @field_validator("price")
+        @classmethod
+        def positive(cls, value: float) -> float:
+            if value <= 0:
+                raise ValueError("price must be positive")
+            return value
+
+    key = structure_cache_key(StrictProduct, False, "small", "Free sample")
+    await cache.store_entry(key, {"result": {"title": "Free sample", "price": 0}})
+
+    assert await StructureCacheManager.get_result(StrictProduct, False, "small", "Free sample") == (False, None)
+    assert await cache.get_entry(key) is None
+
+
+async def test_json_round_trip(cache):
+    await StructureCacheManager.store_result(Product, False, "small", "Shoe 9.99", Product(title="Shoe", price=9.99))
+
+    StructureCacheManager.initialize(MemoryStructureCache.from_json(cache.to_json(), max_entries=10))
+    assert await StructureCacheManager.get_result(Product, False, "small", "Shoe 9.99") == (
+        True,
+        Product(title="Shoe", price=9.99),
+    )
+
+
+async def test_disabled_without_initialize():
+    StructureCacheManager.reset()
+
+    await StructureCacheManager.store_result(Product, False, "small", "Shoe 9.99", Product(title="Shoe", price=9.99))
+    assert await StructureCacheManager.get_result(Product, False, "small", "Shoe 9.99") == (False, None)
+    assert StructureCacheManager.get_stats() is None
@@ -0,0 +1,71 @@
+from pathlib import Path
+
+import pytest
+from bs4 import BeautifulSoup
+
+from truffles.tools.list_detector.utils import TextIndex, find_elements_with_text
+
+FIXTURES = sorted((Path(__file__).parents[1] / "benchmarks" / "fixtures").glob("*.html"))
+
+NESTED = (
+    "<div><p>Running <b>shoe</b> model</p>"
+    "<p>  Padded   text\n here </p>"
+    "<script>var shoe = 1</script><style>.shoe {}</style>"
+    "<p>ÉCOLE İstanbul</p><!-- shoe comment --></div>"
+)
+
+
+def assert_same_matches(soup: BeautifulSoup, identifiers: list):
+    matches = TextIndex(soup).find(identifiers)
+
+    assert set(matches) == set(identifiers)
+    for identifier in identifiers:
+        assert matches[identifier] == find_elements_with_text(soup, identifier), identifier
+
+
+def expected_list_texts(soup: BeautifulSoup) -> list:
+    """All texts of the items of the expected list, as the LLM would answer them"""
+    wrapper = soup.select_one("[data-expected-list]")
+    return [text for item in wrapper.find_all(recursive=False) for text in item.stripped_strings]
+
+
+@pytest.mark.parametrize("fixture", FIXTURES, ids=lambda path: path.stem)
+def test_matches_find_elements_with_text_on_fixtures(fixture):
+    soup = BeautifulSoup(fixture.read_text(encoding="utf-8"), "html.parser")
+    texts = expected_list_texts(soup)
+    assert texts
+
+    identifiers = set(texts)
+    # case, surrounding whitespace and texts spanning two items do not change the result of either
+    identifiers |= {text.upper() for text in texts[:5]}
+    identifiers |= {f" {text} " for text in texts[:5]}
+    identifiers |= {f"{first} {second}" for first, second in zip(texts[:5], texts[1:6])}
+    # short identifiers match many strings, and several times in some of them
+    identifiers |= {text[:3] for text in texts[:5]} | {"e", "1"}
+
+    assert_same_matches(soup, sorted(identifiers))
+
+
+def test_matches_find_elements_with_text_on_whitespace_and_nested_text():
+    soup = BeautifulSoup(NESTED, "html.parser")
+    identifiers = [
+        "shoe",
+        "Running shoe",
+        "running ",
+        " model",
+        "padded   text",
+        "padded text",
+        "text\n here",
+        "école",
+        "i̇stanbul",
+        "shoe shoe",
+        "",
+        "\x00",
+    ]
+
+    assert_same_matches(soup, identifiers)
+
+    matches = TextIndex(soup).find(["shoe", "Running shoe"])
+    # text split over nested elements is not matched, script and style are skipped, comments are not
+    assert [str(string) for string, _ in matches["shoe"]] == ["shoe", " shoe comment "]
+    assert matches["Running shoe"] == []
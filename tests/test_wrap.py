@@ -0,0 +1,87 @@
+import pytest
+from playwright.async_api import Locator
+
+from truffles.enhanced.locator import TLocator
+from truffles.utils.wrap import LazyDict, LazyList, wrap_collection
+
+
+class _FakeLocatorImpl:
+    _loop = None
+
+
+class FakeLocator(Locator):
+    def __init__(self):
+        super().__init__(_FakeLocatorImpl())
+
+
+def test_eager_wrapping_copies_nested_collections():
+    locator = FakeLocator()
+    wrapped = wrap_collection({"items": [locator, 1], "pair": (locator, "a"), "tags": {"x"}})
+
+    assert isinstance(wrapped["items"], list)
+    assert isinstance(wrapped["items"][0], TLocator)
+    assert isinstance(wrapped["pair"], tuple)
+    assert isinstance(wrapped["pair"][0], TLocator)
+    assert wrapped["tags"] == {"x"}
+
+
+def test_lazy_list_wraps_items_on_access():
+    locator = FakeLocator()
+    items = [locator, [locator], {"nested": locator}, 3]
+    view = wrap_collection(items, lazy=True)
+
+    assert isinstance(view, LazyList)
+    assert len(view) == 4
+    assert isinstance(view[0], TLocator)
+    assert isinstance(view[1], LazyList)
+    assert isinstance(view[1][0], TLocator)
+    assert isinstance(view[2], LazyDict)
+    assert isinstance(view[2]["nested"], TLocator)
+    assert view[-1] == 3
+    assert isinstance(list(view)[0], TLocator)
+
+    # the view does not copy, the items are still the original ones
+    assert view._items is items
+
+
+def test_lazy_list_slices_and_equality():
+    view = wrap_collection((1, 2, 3), lazy=True)
+
+    assert isinstance(view[1:], LazyList)
+    assert view[1:] == [2, 3]
+    assert view == (1, 2, 3)
+    assert view == wrap_collection([1, 2, 3], lazy=True)
+    assert view != [1, 2]
+    assert view.__eq__("123") is NotImplemented
+
+
+def test_lazy_dict_wraps_values_on_access():
+    locator = FakeLocator()
+    view = wrap_collection({"first": locator, "count": 2}, lazy=True)
+
+    assert isinstance(view, LazyDict)
+    assert set(view) == {"first", "count"}
+    assert "first" in view
+    assert isinstance(view["first"], TLocator)
+    assert view["count"] == 2
+    assert view.get("missing") is None
+    with pytest.raises(KeyError):
+        view["missing"]
+
+
+def test_lazy_views_are_read_only():
+    view = wrap_collection([1], lazy=True)
+    with pytest.raises(TypeError):
+        view[0] = 2
+
+    mapping = wrap_collection({"a": 1}, lazy=True)
+    with pytest.raises(TypeError):
+        mapping["a"] = 2
+
+
+def test_sets_are_copied_even_when_lazy():
+    locator = FakeLocator()
+    wrapped = wrap_collection({locator}, lazy=True)
+
+    assert isinstance(wrapped, set)
+    assert isinstance(next(iter(wrapped)), TLocator)